@@ -7,12 +7,39 @@
 
 # =============================================== #
 # ================ INTEGRAÇÕES ================= #
+import argparse
+import gc
+import hashlib
+import itertools
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 import pyarrow.feather as feather
+import pyarrow.parquet as pq
 from pathlib import Path
+from matplotlib.colors import LogNorm
+from dataclasses import dataclass, asdict, field, fields
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
+try:
+    import resource  # Pico de memória do processo (apenas Unix)
+except ImportError:
+    resource = None
 
 # =============================================== #
 # =============== CONFIG INICIAL =============== #
@@ -20,27 +47,2225 @@ import seaborn as sns
 ARQUIVO_CSV = 'vehicles.csv'
 ARQUIVO_FEATHER = 'vehicles.feather'
 
-print(f"\nRafael, iniciando processamento do arquivo {ARQUIVO_CSV}...")
+# Cache de feather (versões endereçadas pelo hash do CSV de origem)
+DIRETORIO_CACHE = Path('.cache_feather')
+MANIFESTO_CACHE = DIRETORIO_CACHE / 'manifesto.json'
+MAX_VERSOES_CACHE = 3
+VERSAO_FORMATO_CACHE = 2
+
+# Ingestão do CSV em blocos
+TAMANHO_CHUNK_CSV = 500_000
+LIMITE_CATEGORIAS = 1000
+
+# Estatísticas: elementos por bloco da passada única (cabe no cache da CPU)
+TAMANHO_BLOCO_ESTATISTICAS = 1 << 16
+
+# Quantis aproximados: itens por nível do sketch (erro de posto ~ log2(n/k)/k no pior caso)
+TAMANHO_SKETCH_QUANTIS = 2000
+
+# Valores distintos: linhas do top-k, precisão do HyperLogLog (2^p registradores,
+# erro padrão ~1.04/sqrt(2^p)) e contadores do Misra-Gries (erro <= n/(m+1))
+TOP_K_PADRAO = 20
+PRECISAO_HLL = 14
+CONTADORES_FREQUENTES = 1000
+
+# Tabelas de contingência sobre códigos de dicionário: máximo de células (linhas x colunas)
+MAX_CELULAS_CONTINGENCIA = 20_000_000
+
+# Boxplot: máximo de outliers desenhados (amostra)
+MAX_OUTLIERS_BOXPLOT = 1000
+
+# Dispersão: acima deste número de linhas o gráfico vira mapa de densidade
+LIMITE_PONTOS_DISPERSAO = 200_000
+CELULAS_POR_POLEGADA = 40
+
+# Histograma: faixas do histograma fino mantido em cache por coluna
+BINS_HISTOGRAMA_BASE = 8192
+MIN_FAIXAS_FINAS = 16
+
+# Limpeza: a partir deste número de linhas, contagem de nulos e preenchimento rodam por coluna em threads
+LINHAS_PARALELO_COLUNAS = 1_000_000
+
+# Gravação: linhas por lote de escrita (também o tamanho dos row groups do Parquet)
+TAMANHO_LOTE_ESCRITA = 1_000_000
+
+# Modo em lote: diretório padrão dos resultados e resolução das figuras salvas
+DIRETORIO_RESULTADOS = 'resultados'
+DPI_FIGURAS_LOTE = 150
+
+# Benchmark: escalas padrão em linhas (100M só quando pedido explicitamente) e versão do JSON
+ESCALAS_BENCHMARK = (10_000, 100_000, 1_000_000)
+VERSAO_FORMATO_BENCHMARK = 2
+
+# Receitas de limpeza (JSON reaplicável)
+VERSAO_FORMATO_RECEITA = 1
+
+# Cache de estatísticas por (versão do dataset, coluna, cálculo)
+MAX_ITENS_CACHE_ESTATISTICAS = 256
+_cache_estatisticas = OrderedDict()
+_trava_cache_estatisticas = threading.Lock()
+_contador_versoes = itertools.count(1)
+
+# Matriz de correlação: linhas por bloco na acumulação das somas
+TAMANHO_BLOCO_CORRELACAO = 65_536
+
+# =============================================== #
+# ============== CACHE DO FEATHER ============== #
+def _hash_arquivo(caminho, tamanho_bloco=8 * 1024 * 1024):
+    """Calcula o hash (blake2b) do conteúdo do arquivo lendo em blocos"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _ler_manifesto():
+    """Lê o manifesto do cache (ou retorna um manifesto vazio)"""
+    try:
+        with open(MANIFESTO_CACHE, encoding='utf-8') as f:
+            manifesto = json.load(f)
+        if manifesto.get('formato') == VERSAO_FORMATO_CACHE:
+            return manifesto
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {'formato': VERSAO_FORMATO_CACHE, 'versoes': {}}
+
+def _salvar_manifesto(manifesto):
+    """Grava o manifesto de forma atômica (arquivo temporário + replace)"""
+    DIRETORIO_CACHE.mkdir(parents=True, exist_ok=True)
+    temporario = MANIFESTO_CACHE.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, MANIFESTO_CACHE)
+
+def _schema_feather(caminho):
+    """Lê apenas o schema do feather (rodapé do arquivo, sem carregar dados)"""
+    with pa.memory_map(str(caminho), 'r') as fonte:
+        schema = pa.ipc.open_file(fonte).schema
+    return {campo.name: str(campo.type) for campo in schema}
+
+def _entrada_valida(entrada):
+    """Confere se o feather da entrada existe e mantém o schema registrado"""
+    caminho = DIRETORIO_CACHE / entrada['arquivo']
+    if not caminho.exists():
+        return False
+    try:
+        return _schema_feather(caminho) == entrada['schema']
+    except (pa.ArrowInvalid, OSError):
+        return False
+
+def _novo_perfil():
+    return {'tipo': None, 'nulos': False, 'minimo': None, 'maximo': None,
+            'inteiro': True, 'float32': True, 'valores': set()}
+
+def _atualizar_perfil(perfil, serie):
+    """Acumula no perfil o tipo, nulos, intervalo, exatidão em float32 e cardinalidade da série"""
+    perfil['nulos'] = perfil['nulos'] or bool(serie.isna().any())
+    valores = serie.dropna()
+    if valores.empty:
+        return perfil
+
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.infer_dtype(valores) == 'boolean':
+        tipo = 'bool'
+    elif pd.api.types.is_numeric_dtype(serie):
+        tipo = 'numerico'
+    else:
+        tipo = 'texto'
+    if perfil['tipo'] is None:
+        perfil['tipo'] = tipo
+    elif perfil['tipo'] != tipo:
+        # Tipos mistos entre blocos viram texto livre (valores já vistos foram convertidos)
+        perfil['tipo'] = 'texto'
+        perfil['valores'] = None
+
+    if tipo == 'numerico':
+        arr = valores.to_numpy(dtype='float64')
+        minimo, maximo = valores.min(), valores.max()  # Exatos também além de 2^53
+        perfil['minimo'] = minimo if perfil['minimo'] is None else min(perfil['minimo'], minimo)
+        perfil['maximo'] = maximo if perfil['maximo'] is None else max(perfil['maximo'], maximo)
+        if perfil['inteiro']:
+            perfil['inteiro'] = bool(np.all(np.mod(arr, 1) == 0))
+        if perfil['float32']:
+            perfil['float32'] = bool(np.all(arr.astype('float32').astype('float64') == arr))
+
+    # Cardinalidade limitada: deixa de rastrear ao passar de LIMITE_CATEGORIAS
+    if perfil['tipo'] == 'texto' and perfil['valores'] is not None:
+        perfil['valores'].update(valores.astype(str).unique())
+        if len(perfil['valores']) > LIMITE_CATEGORIAS:
+            perfil['valores'] = None
+    return perfil
+
+def _perfilar_csv(arquivo_csv, tamanho_chunk):
+    """Primeira passada: percorre o CSV em blocos coletando o perfil de cada coluna"""
+    perfis = {}
+    for chunk in pd.read_csv(arquivo_csv, chunksize=tamanho_chunk, low_memory=False):
+        for coluna in chunk.columns:
+            _atualizar_perfil(perfis.setdefault(coluna, _novo_perfil()), chunk[coluna])
+    return perfis
+
+def _menor_inteiro(minimo, maximo, anulavel=False):
+    """Menor tipo inteiro que comporta [minimo, maximo] (anulável se pedido); float64 se nenhum comporta"""
+    # uint64 só quando nenhum inteiro com sinal comporta
+    tipo = next((t for t in ('int8', 'int16', 'int32', 'int64', 'uint64')
+                 if np.iinfo(t).min <= minimo and maximo <= np.iinfo(t).max), None)
+    if tipo is None:
+        return 'float64'
+    return {'uint64': 'UInt64'}.get(tipo, tipo.capitalize()) if anulavel else tipo
+
+def _inferir_tipos(perfis):
+    """Escolhe o menor tipo seguro para cada coluna a partir do perfil coletado"""
+    tipos = {}
+    for coluna, perfil in perfis.items():
+        if perfil['tipo'] is None:
+            tipos[coluna] = 'float32'  # Coluna inteiramente nula
+        elif perfil['tipo'] == 'numerico':
+            if perfil['inteiro'] and not perfil['nulos']:
+                tipos[coluna] = _menor_inteiro(perfil['minimo'], perfil['maximo'])
+            else:
+                tipos[coluna] = 'float32' if perfil['float32'] else 'float64'
+        elif perfil['tipo'] == 'bool':
+            tipos[coluna] = 'boolean' if perfil['nulos'] else 'bool'  # Sem 'boolean' um bloco nulo apagaria a coluna
+        elif perfil['tipo'] == 'texto' and perfil['valores'] is not None:
+            tipos[coluna] = pd.CategoricalDtype(sorted(perfil['valores']))
+        else:
+            tipos[coluna] = str
+    return tipos
+
+def converter_csv_streaming(arquivo_csv, destino, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """Converte o CSV em feather em blocos: infere um schema compacto e grava lote a lote"""
+    tipos = _inferir_tipos(_perfilar_csv(arquivo_csv, tamanho_chunk))
+    # Colunas de texto/categóricas são lidas como texto para não variar entre blocos
+    tipos_leitura = {c: (t if isinstance(t, pd.CategoricalDtype) else str)
+                     for c, t in tipos.items() if t is str or isinstance(t, pd.CategoricalDtype)}
+
+    escritor = None
+    try:
+        for chunk in pd.read_csv(arquivo_csv, chunksize=tamanho_chunk, dtype=tipos_leitura, low_memory=False):
+            chunk = chunk.astype({c: t for c, t in tipos.items() if c not in tipos_leitura})
+            if escritor is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                # Sem compressão: permite leitura zero-copy via memory map
+                escritor = pa.ipc.new_file(str(destino), schema,
+                                           options=pa.ipc.IpcWriteOptions(compression=None))
+            escritor.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    if escritor is None:  # CSV apenas com cabeçalho
+        pd.read_csv(arquivo_csv, nrows=0).to_feather(destino)
+    return tipos
+
+def _criar_feather(arquivo_csv, destino):
+    """Converte o CSV em feather (via arquivo temporário)"""
+    temporario = destino.with_suffix('.tmp')
+    converter_csv_streaming(arquivo_csv, temporario)
+    os.replace(temporario, destino)
+
+def _despejar_lru(manifesto, manter):
+    """Remove as versões menos usadas recentemente além de MAX_VERSOES_CACHE"""
+    versoes = sorted(manifesto['versoes'].items(), key=lambda item: item[1]['ultimo_acesso'], reverse=True)
+    for hash_origem, entrada in versoes[MAX_VERSOES_CACHE:]:
+        if hash_origem == manter:
+            continue
+        (DIRETORIO_CACHE / entrada['arquivo']).unlink(missing_ok=True)
+        shutil.rmtree(_diretorio_indices(DIRETORIO_CACHE / entrada['arquivo']), ignore_errors=True)
+        del manifesto['versoes'][hash_origem]
+        print(f"🗑️ Versão antiga removida do cache: {entrada['arquivo']}")
+
+def obter_feather_cache(arquivo_csv=ARQUIVO_CSV):
+    """Caminho do feather do conteúdo atual do CSV, recriado só quando a origem muda"""
+    origem = Path(arquivo_csv)
+    info = origem.stat()
+    manifesto = _ler_manifesto()
+    caminho_origem = str(origem.resolve())
+
+    # Caminho rápido: mesmo arquivo, mesmo tamanho e mtime -> sem recalcular o hash
+    hash_origem = next((h for h, e in manifesto['versoes'].items()
+                        if e['origem'] == caminho_origem
+                        and e['tamanho'] == info.st_size
+                        and e['mtime_ns'] == info.st_mtime_ns), None)
+
+    if hash_origem is None or not _entrada_valida(manifesto['versoes'][hash_origem]):
+        print("🔎 Verificando conteúdo do CSV de origem...")
+        hash_origem = _hash_arquivo(origem)
+        entrada = manifesto['versoes'].get(hash_origem)
+
+        if entrada is None or not _entrada_valida(entrada):
+            print("Cache desatualizado ou inexistente. Criando feather a partir do CSV...")
+            DIRETORIO_CACHE.mkdir(parents=True, exist_ok=True)
+            arquivo = f"{hash_origem[:16]}.feather"
+            _criar_feather(origem, DIRETORIO_CACHE / arquivo)
+            entrada = {
+                'arquivo': arquivo,
+                'schema': _schema_feather(DIRETORIO_CACHE / arquivo),
+                'criado_em': time.time(),
+            }
+            manifesto['versoes'][hash_origem] = entrada
+            print("✅ Arquivo feather criado com sucesso!")
+        else:
+            print("✅ Conteúdo inalterado. Reutilizando feather do cache.")
+
+        entrada.update({'origem': caminho_origem, 'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns})
+    else:
+        print("✅ Arquivo feather em cache está atualizado. Carregando...")
+
+    manifesto['versoes'][hash_origem]['ultimo_acesso'] = time.time()
+    _despejar_lru(manifesto, manter=hash_origem)
+    _salvar_manifesto(manifesto)
+    return DIRETORIO_CACHE / manifesto['versoes'][hash_origem]['arquivo']
+
+# =============================================== #
+# ============= DATASET SOB DEMANDA ============ #
+class DatasetColunar:
+    """Dataset sobre o feather (memory map) que lê só as colunas pedidas e as mantém em cache"""
+
+    def __init__(self, caminho, colunas=None, _cache=None):
+        self.caminho = Path(caminho)
+        self._schema = feather.read_table(self.caminho, columns=[], memory_map=True).schema \
+            if _cache is None else _cache['schema']
+        self._cache = _cache if _cache is not None else {'schema': self._schema, 'series': {}, 'linhas': None, 'attrs': {}}
+        self.attrs = self._cache['attrs']
+        nomes = self._schema.names if colunas is None else list(colunas)
+        self.columns = pd.Index(nomes)
+        # Tipos pandas derivados apenas do schema (nenhum dado é lido)
+        self.dtypes = self._schema.empty_table().to_pandas().dtypes[nomes]
+
+    def __len__(self):
+        if self._cache['linhas'] is None:
+            with pa.memory_map(str(self.caminho), 'r') as fonte:
+                leitor = pa.ipc.open_file(fonte)
+                self._cache['linhas'] = sum(leitor.get_batch(i).num_rows for i in range(leitor.num_record_batches))
+        return self._cache['linhas']
+
+    @property
+    def empty(self):
+        return len(self.columns) == 0 or len(self) == 0
+
+    def _carregar(self, colunas):
+        """Lê do disco apenas as colunas que ainda não estão em cache"""
+        series = self._cache['series']
+        faltantes = [c for c in colunas if c not in series]
+        if faltantes:
+            tabela = feather.read_table(self.caminho, columns=faltantes, memory_map=True).to_pandas()
+            for coluna in faltantes:
+                series[coluna] = tabela[coluna]
+        return [series[c] for c in colunas]
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            if chave not in self.columns:
+                raise KeyError(chave)
+            return self._carregar([chave])[0]
+        colunas = list(chave)
+        for coluna in colunas:
+            if coluna not in self.columns:
+                raise KeyError(coluna)
+        return pd.concat(self._carregar(colunas), axis=1)
+
+    def select_dtypes(self, include=None, exclude=None):
+        """Retorna uma visão restrita às colunas dos tipos pedidos (sem ler dados)"""
+        vazio = pd.DataFrame({c: pd.Series(dtype=t) for c, t in self.dtypes.items()})
+        colunas = vazio.select_dtypes(include=include, exclude=exclude).columns
+        return DatasetColunar(self.caminho, colunas, _cache=self._cache)
 
-# Verifica e carrega os dados
-if not Path(ARQUIVO_FEATHER).exists():
-    print("Arquivo feather não encontrado. Criando a partir do CSV...")
+    def copy(self):
+        """Materializa todas as colunas da visão em um DataFrame independente"""
+        df = self[list(self.columns)].copy()
+        df.attrs = dict(self.attrs)  # Mesmos dados, mesma versão
+        return df
+
+def carregar_dados(arquivo=ARQUIVO_CSV):
+    """Prepara o cache feather (se for CSV) e abre o dataset sem carregar colunas"""
+    print(f"\nRafael, iniciando processamento do arquivo {arquivo}...")
+
+    # Verifica e carrega os dados
     try:
-        df = pd.read_csv(ARQUIVO_CSV)
-        df.to_feather(ARQUIVO_FEATHER)
-        print("✅ Arquivo feather criado com sucesso!")
+        df = abrir_dados(arquivo)
+        print(f"\nDataset carregado com {len(df):,} registros e {len(df.columns)} colunas.")
     except Exception as e:
-        print(f"❌ Erro ao processar arquivo CSV: {e}")
+        print(f"❌ Erro ao carregar {arquivo}: {e}")
         exit()
-else:
-    print("✅ Arquivo feather encontrado. Carregando...")
+    return df
+
+# =============================================== #
+# =========== MOTOR DE ESTATÍSTICAS ============ #
+@dataclass
+class ResumoColuna:
+    """Estatísticas de uma coluna numérica calculadas em uma única passada"""
+    coluna: str
+    tipo: str
+    contagem: int
+    nulos: int
+    soma: float
+    media: float
+    desvio_padrao: float
+    minimo: float
+    q1: float
+    mediana: float
+    q3: float
+    maximo: float
+
+    @property
+    def nulos_pct(self):
+        total = self.contagem + self.nulos
+        return 100 * self.nulos / total if total else 0.0
+
+    @property
+    def iqr(self):
+        return self.q3 - self.q1
+
+def _valores_float(serie):
+    """Converte a série para float64 com NaN no lugar de nulos (inclusive tipos anuláveis)"""
+    return serie.to_numpy(dtype='float64', na_value=np.nan)
+
+def _quantis_selecao(valores, quantis):
+    """Quantis com interpolação linear (regra do pandas) via np.partition; `valores` sem NaN"""
+    n = len(valores)
+    if n == 0:
+        return [np.nan] * len(quantis)
+    posicoes = [q * (n - 1) for q in quantis]
+    indices = sorted({int(np.floor(p)) for p in posicoes} | {int(np.ceil(p)) for p in posicoes})
+    particionado = np.partition(valores, indices)
+    resultado = []
+    for p in posicoes:
+        inferior, superior = particionado[int(np.floor(p))], particionado[int(np.ceil(p))]
+        resultado.append(inferior + (superior - inferior) * (p - np.floor(p)))
+    return resultado
+
+def resumir_coluna(serie, tamanho_bloco=TAMANHO_BLOCO_ESTATISTICAS):
+    """ResumoColuna em uma passada por blocos (Welford + Chan), com quartis por seleção"""
+    arr = _valores_float(serie)
+    contagem, media, m2 = 0, 0.0, 0.0
+    minimo, maximo = np.inf, -np.inf
+    for inicio in range(0, len(arr), tamanho_bloco):
+        bloco = arr[inicio:inicio + tamanho_bloco]
+        bloco = bloco[~np.isnan(bloco)]
+        n_bloco = len(bloco)
+        if n_bloco == 0:
+            continue
+        media_bloco = bloco.mean()
+        m2_bloco = np.square(bloco - media_bloco).sum()
+        total = contagem + n_bloco
+        delta = media_bloco - media
+        media += delta * n_bloco / total
+        m2 += m2_bloco + delta * delta * contagem * n_bloco / total
+        contagem = total
+        minimo = min(minimo, bloco.min())
+        maximo = max(maximo, bloco.max())
+
+    validos = arr[~np.isnan(arr)]
+    q1, mediana, q3 = _quantis_selecao(validos, [0.25, 0.5, 0.75])
+    vazio = contagem == 0
+    return ResumoColuna(
+        coluna=serie.name,
+        tipo=str(serie.dtype),
+        contagem=contagem,
+        nulos=len(arr) - contagem,
+        soma=media * contagem,
+        media=np.nan if vazio else media,
+        desvio_padrao=np.sqrt(m2 / (contagem - 1)) if contagem > 1 else np.nan,
+        minimo=np.nan if vazio else minimo,
+        q1=q1,
+        mediana=mediana,
+        q3=q3,
+        maximo=np.nan if vazio else maximo,
+    )
+
+def tabela_estatisticas(df, colunas=None):
+    """Retorna um DataFrame tipado com o ResumoColuna de cada coluna numérica"""
+    if colunas is None:
+        colunas = df.select_dtypes(include='number').columns.tolist()
+    resumos = [obter_resumo(df, c) for c in colunas]
+    tabela = pd.DataFrame([asdict(r) for r in resumos], columns=[f.name for f in fields(ResumoColuna)])
+    tabela['nulos_pct'] = [r.nulos_pct for r in resumos]
+    return tabela.astype({'contagem': 'int64', 'nulos': 'int64'})
+
+# =============================================== #
+# ========= SKETCH DE QUANTIS (KLL) ============ #
+class SketchQuantis:
+    """Sketch de quantis mesclável (estilo KLL) com limite do erro de posto em `erro_rank`"""
+
+    def __init__(self, k=TAMANHO_SKETCH_QUANTIS, semente=0):
+        self.k = k
+        self.niveis = [np.empty(0)]
+        self.contagem = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.erro_absoluto = 0
+        self._rng = np.random.default_rng(semente)
+
+    @property
+    def erro_rank(self):
+        """Limite superior do erro de posto normalizado (fração de n)"""
+        return self.erro_absoluto / self.contagem if self.contagem else 0.0
+
+    def atualizar(self, valores):
+        """Insere um lote de valores (nulos são ignorados)"""
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        outro = SketchQuantis(self.k)
+        outro.contagem = len(valores)
+        outro.media = valores.mean()
+        outro.m2 = np.square(valores - outro.media).sum()
+        outro.minimo, outro.maximo = valores.min(), valores.max()
+        outro.niveis = [valores]
+        return self.mesclar(outro)
+
+    def mesclar(self, outro):
+        """Incorpora outro sketch (ex.: de outro bloco do arquivo) a este"""
+        if outro.contagem == 0:
+            return self
+        total = self.contagem + outro.contagem
+        delta = outro.media - self.media
+        self.media += delta * outro.contagem / total
+        self.m2 += outro.m2 + delta * delta * self.contagem * outro.contagem / total
+        self.contagem = total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.erro_absoluto += outro.erro_absoluto
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self.k:
+                itens = np.sort(itens)
+                sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+                pares = itens[:len(itens) - len(sobra)]
+                promovidos = pares[self._rng.integers(2)::2]
+                self.niveis[nivel] = sobra
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+                self.erro_absoluto += 2 ** nivel
+            nivel += 1
+
+    def quantis(self, quantis):
+        """Quantis aproximados: menor item cujo peso acumulado atinge q·n"""
+        if self.contagem == 0:
+            return [np.nan] * len(quantis)
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(v), 2 ** nivel, dtype='int64') for nivel, v in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind='stable')
+        itens, acumulado = itens[ordem], np.cumsum(pesos[ordem])
+        resultado = []
+        for q in quantis:
+            if q <= 0:
+                resultado.append(self.minimo)
+            elif q >= 1:
+                resultado.append(self.maximo)
+            else:
+                posicao = np.searchsorted(acumulado, q * acumulado[-1], side='left')
+                resultado.append(itens[min(posicao, len(itens) - 1)])
+        return resultado
+
+def sketch_serie(serie, k=TAMANHO_SKETCH_QUANTIS, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """Monta um sketch por bloco da série e mescla todos (memória limitada por bloco)"""
+    sketch = SketchQuantis(k)
+    for inicio in range(0, len(serie), tamanho_chunk):
+        sketch.mesclar(SketchQuantis(k).atualizar(_valores_float(serie.iloc[inicio:inicio + tamanho_chunk])))
+    return sketch
+
+# =============================================== #
+# ====== VALORES DISTINTOS (TOP-K, HLL) ======== #
+def top_k_exato(serie, k=TOP_K_PADRAO):
+    """Top-k por contagem exata (nulos incluídos); retorna (tabela, distintos)"""
+    por_valor = serie.value_counts(dropna=False, sort=False)
+    return _selecionar_top_k(por_valor.index, por_valor.to_numpy(), k, len(serie)), len(por_valor)
+
+def top_k_codificado(codigos, valores, k=TOP_K_PADRAO):
+    """Top-k exato a partir do índice de dicionário: bincount nos códigos, sem hash de valores"""
+    contagens, nulos = contar_codigos(codigos, len(valores))
+    presentes = contagens > 0  # Categorias sem ocorrência não contam como distintas
+    valores, contagens = valores[presentes], contagens[presentes]
+    if nulos:
+        valores = valores.astype(object).append(pd.Index([np.nan], dtype=object))
+        contagens = np.append(contagens, nulos)
+    return _selecionar_top_k(valores, contagens, k, len(codigos)), len(contagens)
+
+def _selecionar_top_k(valores, contagens, k, total):
+    """Tabela dos k maiores de `contagens` (argpartition + ordenação só dos escolhidos)"""
+    if 0 < k < len(contagens):
+        escolhidos = np.argpartition(contagens, len(contagens) - k)[-k:]
+    else:
+        escolhidos = np.arange(len(contagens))
+    escolhidos = escolhidos[np.argsort(-contagens[escolhidos], kind='stable')]
+    return pd.DataFrame({
+        'Valor': valores.take(escolhidos),
+        'Contagem': contagens[escolhidos],
+        'Porcentagem (%)': contagens[escolhidos] / max(total, 1) * 100,
+    })
+
+def _hash_valores(serie):
+    """Hash de 64 bits por valor (estável entre blocos e tipos de coluna)"""
+    return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+
+class HyperLogLog:
+    """Contagem aproximada de distintos com 2^p registradores; erro padrão ~1.04/sqrt(2^p)"""
+
+    def __init__(self, p=PRECISAO_HLL):
+        self.p = p
+        self.registradores = np.zeros(1 << p, dtype=np.uint8)
+
+    @property
+    def erro_padrao(self):
+        return 1.04 / np.sqrt(len(self.registradores))
+
+    def atualizar(self, serie):
+        """Insere os valores não nulos da série"""
+        hashes = _hash_valores(serie.dropna())
+        if len(hashes) == 0:
+            return self
+        bits_restantes = 64 - self.p
+        indices = (hashes >> np.uint64(bits_restantes)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits_restantes) - 1)
+        # floor(log2(resto)) exato via frexp (resto tem no máximo 64 - p <= 53 bits)
+        _, expoentes = np.frexp(resto.astype('float64'))
+        posicoes = np.where(resto > 0, bits_restantes - expoentes + 1, bits_restantes + 1).astype(np.uint8)
+        np.maximum.at(self.registradores, indices, posicoes)
+        return self
+
+    def mesclar(self, outro):
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+
+    def estimar(self):
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -self.registradores.astype(np.int64)))
+        vazios = int(np.count_nonzero(self.registradores == 0))
+        if estimativa <= 2.5 * m and vazios:
+            estimativa = m * np.log(m / vazios)  # Correção para cardinalidades pequenas (contagem linear)
+        return int(round(estimativa))
+
+class ContadorFrequentes:
+    """Resumo Misra-Gries mesclável com até `m` contadores, subestimados em no máximo `erro`"""
+
+    def __init__(self, m=CONTADORES_FREQUENTES):
+        self.m = m
+        self.contadores = pd.Series(dtype='int64')
+        self.total = 0
+        self.nulos = 0
+        self.erro = 0
+
+    def _reduzir(self, contadores):
+        if len(contadores) > self.m:
+            corte = contadores.nlargest(self.m + 1).iloc[-1]
+            contadores = contadores[contadores > corte] - corte
+            self.erro += int(corte)
+        return contadores
+
+    def atualizar(self, serie):
+        """Insere um bloco: contagem exata do bloco mesclada ao resumo"""
+        self.total += len(serie)
+        self.nulos += int(serie.isna().sum())
+        bloco = serie.value_counts(dropna=True, sort=False)
+        bloco = bloco[bloco > 0]  # Categorias sem ocorrência no bloco
+        bloco.index = bloco.index.astype(object)
+        self.contadores = self._reduzir(self.contadores.add(bloco, fill_value=0).astype('int64'))
+        return self
+
+    def mesclar(self, outro):
+        self.total += outro.total
+        self.nulos += outro.nulos
+        self.erro += outro.erro
+        self.contadores = self._reduzir(self.contadores.add(outro.contadores, fill_value=0).astype('int64'))
+        return self
+
+    def itens(self, k=TOP_K_PADRAO):
+        """Os k mais frequentes com limites inferior e superior da contagem real"""
+        topo = self.contadores.nlargest(k)
+        return pd.DataFrame({
+            'Valor': topo.index,
+            'Contagem mínima': topo.to_numpy(),
+            'Contagem máxima': topo.to_numpy() + self.erro,
+        })
+
+def hll_serie(serie, p=PRECISAO_HLL, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """HyperLogLog da série, bloco a bloco (memória fixa de 2^p bytes)"""
+    hll = HyperLogLog(p)
+    for inicio in range(0, len(serie), tamanho_chunk):
+        hll.atualizar(serie.iloc[inicio:inicio + tamanho_chunk])
+    return hll
+
+def frequentes_serie(serie, m=CONTADORES_FREQUENTES, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """Resumo Misra-Gries da série, bloco a bloco (memória limitada a m contadores + um bloco)"""
+    contador = ContadorFrequentes(m)
+    for inicio in range(0, len(serie), tamanho_chunk):
+        contador.atualizar(serie.iloc[inicio:inicio + tamanho_chunk])
+    return contador
+
+# =============================================== #
+# ========= CACHE DE ESTATÍSTICAS ============== #
+def versao_dataset(df):
+    """Retorna a versão do dataset, atribuindo uma nova se ainda não houver"""
+    if 'versao_dataset' not in df.attrs:
+        df.attrs['versao_dataset'] = next(_contador_versoes)
+    return df.attrs['versao_dataset']
+
+def nova_versao(df):
+    """Marca o dataset como alterado: resultados em cache deixam de valer para ele"""
+    df.attrs['versao_dataset'] = next(_contador_versoes)
+    return df
+
+def memorizar(df, coluna, chave, calcular):
+    """Reutiliza o resultado de `calcular()` enquanto a versão do dataset não mudar"""
+    indice = (versao_dataset(df), coluna, chave)
+    with _trava_cache_estatisticas:  # Chamado também pelas threads do preenchimento por coluna
+        if indice in _cache_estatisticas:
+            _cache_estatisticas.move_to_end(indice)
+            return _cache_estatisticas[indice]
+    resultado = calcular()  # Fora da trava: o cálculo pode memorizar outros itens
+    with _trava_cache_estatisticas:
+        _cache_estatisticas[indice] = resultado
+        while len(_cache_estatisticas) > MAX_ITENS_CACHE_ESTATISTICAS:
+            _cache_estatisticas.popitem(last=False)
+    return resultado
+
+def obter_resumo(df, coluna):
+    """ResumoColuna memorizado por coluna e versão do dataset"""
+    return memorizar(df, coluna, 'resumo', lambda: resumir_coluna(df[coluna]))
+
+def obter_sketch(df, coluna, k=TAMANHO_SKETCH_QUANTIS):
+    """SketchQuantis memorizado por coluna e versão do dataset"""
+    return memorizar(df, coluna, ('sketch', k), lambda: sketch_serie(df[coluna], k))
+
+def obter_histograma_base(df, coluna, log=False, bins=None, minimo=None, maximo=None):
+    """HistogramaBase memorizado; usa base restrita ao intervalo quando ele é estreito demais"""
+    base = memorizar(df, coluna, ('histograma', log), lambda: histograma_base(df[coluna], log))
+    if base is None or bins is None:
+        return base
+    inicio, fim = _intervalo_transformado(base, minimo, maximo)
+    if (fim - inicio) / bins >= MIN_FAIXAS_FINAS * base.largura:
+        return base
+    return memorizar(df, coluna, ('histograma', log, inicio, fim),
+                     lambda: histograma_base(df[coluna], log, intervalo=(inicio, fim)))
+
+def obter_hll(df, coluna, p=PRECISAO_HLL):
+    """HyperLogLog memorizado por coluna e versão do dataset"""
+    return memorizar(df, coluna, ('hll', p), lambda: hll_serie(df[coluna], p))
+
+def obter_frequentes(df, coluna, m=CONTADORES_FREQUENTES):
+    """Resumo Misra-Gries memorizado por coluna e versão do dataset"""
+    return memorizar(df, coluna, ('frequentes', m), lambda: frequentes_serie(df[coluna], m))
+
+def obter_resumo_aproximado(df, coluna, k=TAMANHO_SKETCH_QUANTIS):
+    """ResumoColuna com quartis do sketch e o limite do erro de posto"""
+    sketch = obter_sketch(df, coluna, k)
+    q1, mediana, q3 = sketch.quantis([0.25, 0.5, 0.75])
+    vazio = sketch.contagem == 0
+    resumo = ResumoColuna(
+        coluna=coluna,
+        tipo=str(df.dtypes[coluna]),
+        contagem=sketch.contagem,
+        nulos=len(df) - sketch.contagem,
+        soma=sketch.media * sketch.contagem,
+        media=np.nan if vazio else sketch.media,
+        desvio_padrao=np.sqrt(sketch.m2 / (sketch.contagem - 1)) if sketch.contagem > 1 else np.nan,
+        minimo=np.nan if vazio else sketch.minimo,
+        q1=q1,
+        mediana=mediana,
+        q3=q3,
+        maximo=np.nan if vazio else sketch.maximo,
+    )
+    return resumo, sketch.erro_rank
+
+# =============================================== #
+# ========== ÍNDICE DE DICIONÁRIO ============== #
+def codificar_serie(serie):
+    """Códigos int32 (-1 = nulo) e valores distintos da série; categóricas reaproveitam os próprios códigos"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy().astype(np.int32), pd.Index(serie.cat.categories)
+    codigos, valores = pd.factorize(serie)
+    return codigos.astype(np.int32), pd.Index(valores)
+
+def _diretorio_indices(caminho_feather):
+    """Diretório dos índices de dicionário, ao lado do feather"""
+    caminho_feather = Path(caminho_feather)
+    return caminho_feather.parent / f"{caminho_feather.stem}.indices"
+
+def _indice_persistido(dataset, coluna):
+    """Índice da coluna gravado ao lado do feather, refeito se o feather mudar"""
+    diretorio = _diretorio_indices(dataset.caminho)
+    info = dataset.caminho.stat()
+    carimbo = {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    arquivo_carimbo = diretorio / 'origem.json'
+    if diretorio.exists() and (not arquivo_carimbo.exists() or json.loads(arquivo_carimbo.read_text()) != carimbo):
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    nome = hashlib.blake2b(str(coluna).encode('utf-8'), digest_size=8).hexdigest()
+    arquivo_codigos = diretorio / f"{nome}.codigos.npy"
+    arquivo_valores = diretorio / f"{nome}.valores.feather"
+    if arquivo_codigos.exists() and arquivo_valores.exists():
+        valores = feather.read_table(arquivo_valores).column('valor').to_pandas()
+        return np.load(arquivo_codigos, mmap_mode='r'), pd.Index(valores)
+
+    codigos, valores = codificar_serie(dataset[coluna])
+    diretorio.mkdir(parents=True, exist_ok=True)
+    arquivo_carimbo.write_text(json.dumps(carimbo))
+    temporario = arquivo_codigos.with_suffix('.tmp')
+    with open(temporario, 'wb') as destino:
+        np.save(destino, codigos)
+    os.replace(temporario, arquivo_codigos)
+    temporario = arquivo_valores.with_suffix('.tmp')
+    feather.write_feather(pd.DataFrame({'valor': valores}), temporario, compression='uncompressed')
+    os.replace(temporario, arquivo_valores)
+    return codigos, valores
+
+def obter_indice(df, coluna):
+    """(códigos, valores) da coluna, memorizado por versão; persistido quando o dataset é o feather em cache"""
+    if isinstance(df, SessaoLimpeza):
+        return df.indice(coluna)
+    if isinstance(df, DatasetColunar):
+        return memorizar(df, coluna, 'indice', lambda: _indice_persistido(df, coluna))
+    return memorizar(df, coluna, 'indice', lambda: codificar_serie(df[coluna]))
+
+def contar_codigos(codigos, n_valores):
+    """Contagem por código (posição = código) e quantidade de nulos"""
+    contagens = np.bincount(np.asarray(codigos) + 1, minlength=n_valores + 1)
+    return contagens[1:], int(contagens[0])
+
+def contingencia(codigos_a, n_a, codigos_b, n_b):
+    """Tabela de contingência densa (n_a x n_b) por bincount; pares com algum nulo ficam de fora"""
+    if n_a * n_b > MAX_CELULAS_CONTINGENCIA:
+        raise ValueError(f"Tabela de contingência grande demais ({n_a:,} x {n_b:,} categorias)")
+    validos = (codigos_a >= 0) & (codigos_b >= 0)
+    pares = codigos_a[validos].astype(np.int64) * n_b + codigos_b[validos]
+    return np.bincount(pares, minlength=n_a * n_b).reshape(n_a, n_b)
+
+def cramer_v(tabela):
+    """V de Cramér (0 a 1) de uma tabela de contingência; linhas/colunas vazias são ignoradas"""
+    tabela = tabela[tabela.sum(axis=1) > 0][:, tabela.sum(axis=0) > 0].astype('float64')
+    n = tabela.sum()
+    if n == 0 or min(tabela.shape) < 2:
+        return np.nan
+    esperado = np.outer(tabela.sum(axis=1), tabela.sum(axis=0)) / n
+    qui2 = ((tabela - esperado) ** 2 / esperado).sum()
+    return float(np.sqrt(qui2 / n / (min(tabela.shape) - 1)))
+
+def classificar_associacao(v):
+    """Classifica o V de Cramér pelos limiares usados na associação categórica (0.1/0.3/0.5)"""
+    if v >= 0.5:
+        return 'Forte'
+    if v >= 0.3:
+        return 'Moderada'
+    if v >= 0.1:
+        return 'Fraca'
+    return 'Insignificante'
+
+# =============================================== #
+# ============== MOTOR DE FAIXAS =============== #
+def bordas_por_intervalo(minimo, maximo, intervalo):
+    """Bordas de `minimo` a `maximo` de `intervalo` em `intervalo` (última faixa truncada no máximo)"""
+    quantidade = int(np.ceil((maximo - minimo) / intervalo))
+    bordas = minimo + intervalo * np.arange(quantidade + 1, dtype='float64')
+    bordas[-1] = maximo
+    return bordas
+
+def bordas_por_quantis(serie, n_faixas):
+    """Bordas que dividem os valores em `n_faixas` faixas de contagem aproximadamente igual"""
+    arr = _valores_float(serie)
+    validos = arr[~np.isnan(arr)]
+    return np.unique(_quantis_selecao(validos, np.linspace(0, 1, n_faixas + 1)))
+
+def contar_por_faixas(serie, bordas, ultima_aberta=False):
+    """Contagem por faixas [início, fim), a última fechada, com searchsorted + bincount"""
+    bordas = np.asarray(bordas, dtype='float64')
+    arr = _valores_float(serie)
+    n_faixas = len(bordas) - 1
+
+    indices = np.searchsorted(bordas, arr, side='right') - 1
+    indices[arr == bordas[-1]] = n_faixas - 1  # Última faixa inclui o máximo
+    total_faixas = n_faixas + 1 if ultima_aberta else n_faixas
+    validos = (indices >= 0) & (indices < total_faixas) & ~np.isnan(arr)
+    contagens = np.bincount(indices[validos], minlength=total_faixas)
+
+    inicios = bordas[:-1].tolist()
+    fins = bordas[1:].tolist()
+    if ultima_aberta:
+        inicios.append(bordas[-1])
+        fins.append(np.inf)
+    formato = ',.0f' if np.all(np.mod(bordas, 1) == 0) else ',.2f'
+    rotulos = [f"acima de {inicio:{formato}}" if np.isinf(fim) else f"{inicio:{formato}} a {fim:{formato}}"
+               for inicio, fim in zip(inicios, fins)]
+
+    return pd.DataFrame({
+        'Faixa': rotulos,
+        'Início': inicios,
+        'Fim': fins,
+        'Contagem': contagens,
+        'Porcentagem (%)': contagens / len(arr) * 100 if len(arr) else 0.0
+    })
+
+# =============================================== #
+# ============ MOTOR DE CORRELAÇÃO ============= #
+def _pares_empatados(*chaves):
+    """Soma de t(t-1)/2 sobre os grupos de valores iguais consecutivos (chaves já ordenadas)"""
+    n = len(chaves[0])
+    if n == 0:
+        return 0
+    mudou = np.zeros(n, dtype=bool)
+    mudou[0] = True
+    for chave in chaves:
+        mudou[1:] |= chave[1:] != chave[:-1]
+    tamanhos = np.diff(np.append(np.flatnonzero(mudou), n))
+    return int((tamanhos * (tamanhos - 1) // 2).sum())
+
+def _contar_inversoes(seq):
+    """Conta pares i < j com seq[i] > seq[j] bit a bit, do mais alto ao mais baixo, em O(n log n)"""
+    n = len(seq)
+    if n < 2:
+        return 0
+    atual = seq.astype('int64')
+    posicoes = np.arange(n)
+    # Cada posição pertence a um grupo contíguo [inicio, fim) de valores com os mesmos bits já vistos,
+    # na ordem original; um par invertido se separa no primeiro bit em que difere (1 antes de 0)
+    inicio = np.zeros(n, dtype='int64')
+    fim = np.full(n, n, dtype='int64')
+    inversoes = 0
+    for bit in range(int(atual.max()).bit_length() - 1, -1, -1):
+        um = (atual >> bit) & 1
+        uns = np.concatenate(([0], np.cumsum(um)))  # uns[k] = bits 1 nas posições < k
+        uns_antes = uns[posicoes] - uns[inicio]
+        zero = um == 0
+        inversoes += int(uns_antes[zero].sum())
+
+        # Partição estável de cada grupo (zeros e depois uns), em O(n) pelas contagens acumuladas
+        divisa = fim - (uns[fim] - uns[inicio])
+        destino = np.where(zero, posicoes - uns_antes, divisa + uns_antes)
+        ordem = np.empty(n, dtype='int64')
+        ordem[destino] = posicoes
+        novo_inicio, novo_fim = np.where(zero, inicio, divisa), np.where(zero, divisa, fim)
+        atual, inicio, fim = atual[ordem], novo_inicio[ordem], novo_fim[ordem]
+    return inversoes
+
+def kendall_tau_b(x, y):
+    """Tau-b de Kendall em O(n log n) com empates; pares com nulo são descartados"""
+    x, y = _valores_float(pd.Series(x)), _valores_float(pd.Series(y))
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    n = len(x)
+    if n < 2:
+        return np.nan
+
+    # Postos densos inteiros deixam as chaves compactas
+    rx = np.unique(x, return_inverse=True)[1].ravel()
+    ry = np.unique(y, return_inverse=True)[1].ravel()
+    ordem = np.lexsort((ry, rx))
+    rx, ry = rx[ordem], ry[ordem]
+
+    total = n * (n - 1) // 2
+    empates_x = _pares_empatados(rx)
+    empates_xy = _pares_empatados(rx, ry)
+    contagem_y = np.bincount(ry)
+    empates_y = int((contagem_y * (contagem_y - 1) // 2).sum())
+    trocas = _contar_inversoes(ry)
+
+    denominador = np.sqrt(float(total - empates_x) * float(total - empates_y))
+    if denominador == 0:
+        return np.nan
+    return (total - empates_x - empates_y + empates_xy - 2 * trocas) / denominador
+
+def _spearman_par(x, y):
+    """Spearman de um par, reordenando os postos apenas nas linhas válidas para ambos"""
+    validos = ~(np.isnan(x) | np.isnan(y))
+    if validos.sum() < 2:
+        return np.nan
+    rx = pd.Series(x[validos]).rank().to_numpy()
+    ry = pd.Series(y[validos]).rank().to_numpy()
+    return np.corrcoef(rx, ry)[0, 1]
+
+def _correlacao_par(tarefa):
+    """Correlação de um par de colunas (nível de módulo para uso no pool de processos)"""
+    metodo, x, y = tarefa
+    return kendall_tau_b(x, y) if metodo == 'kendall' else _spearman_par(x, y)
+
+def _pearson_blocado(matriz, tamanho_bloco):
+    """Pearson de todos os pares por blocos de linhas, com nulos tratados par a par"""
+    p = matriz.shape[1]
+    validos_coluna = (~np.isnan(matriz)).sum(axis=0)
+    # Centraliza pela média da coluna para reduzir cancelamento numérico
+    medias = np.where(validos_coluna > 0, np.nansum(matriz, axis=0) / np.maximum(validos_coluna, 1), 0.0)
+    n, sx, sxx, sxy = (np.zeros((p, p)) for _ in range(4))
+    for inicio in range(0, len(matriz), tamanho_bloco):
+        bloco = matriz[inicio:inicio + tamanho_bloco] - medias
+        valido = ~np.isnan(bloco)
+        v = valido.astype('float64')
+        b0 = np.where(valido, bloco, 0.0)
+        n += v.T @ v
+        sx += b0.T @ v          # sx[i, j]: soma de x_i onde i e j são válidos
+        sxx += (b0 * b0).T @ v
+        sxy += b0.T @ b0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n
+        resultado = cov / np.sqrt(var_i * var_i.T)
+    return np.clip(resultado, -1.0, 1.0)
+
+def matriz_correlacao(df, colunas=None, metodo='pearson', processos=None,
+                      tamanho_bloco=TAMANHO_BLOCO_CORRELACAO):
+    """Matriz de correlação (pearson/spearman/kendall) das colunas numéricas, nulos par a par"""
+    if colunas is None:
+        colunas = df.select_dtypes(include='number').columns.tolist()
+    dados = np.column_stack([_valores_float(df[c]) for c in colunas]) if colunas else np.empty((0, 0))
+    p = len(colunas)
+    nulos = np.isnan(dados)
+
+    if metodo == 'kendall':
+        pares = [(i, j) for i in range(p) for j in range(i + 1, p)]
+        resultado = np.eye(p)
+    else:
+        base = pd.DataFrame(dados).rank().to_numpy() if metodo == 'spearman' else dados
+        resultado = _pearson_blocado(base, tamanho_bloco)
+        pares = []
+        if metodo == 'spearman':
+            tem_nulos = nulos.any(axis=0)
+            pares = [(i, j) for i in range(p) for j in range(i + 1, p)
+                     if (tem_nulos[i] or tem_nulos[j]) and not np.array_equal(nulos[:, i], nulos[:, j])]
+
+    tarefas = [(metodo, dados[:, i], dados[:, j]) for i, j in pares]
+    if processos and processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            valores = list(pool.map(_correlacao_par, tarefas))
+    else:
+        valores = [_correlacao_par(t) for t in tarefas]
+    for (i, j), valor in zip(pares, valores):
+        resultado[i, j] = resultado[j, i] = valor
+
+    return pd.DataFrame(resultado, index=colunas, columns=colunas)
+
+def classificar_correlacao(corr):
+    """Classifica a força do coeficiente pelos limiares usados na comparação (0.3/0.5/0.7)"""
+    if abs(corr) >= 0.7:
+        return 'Forte'
+    if abs(corr) >= 0.5:
+        return 'Moderada'
+    if abs(corr) >= 0.3:
+        return 'Fraca'
+    return 'Insignificante'
+
+def pares_mais_fortes(matriz, minimo=0.0):
+    """Lista os pares da matriz ordenados pelo valor absoluto do coeficiente"""
+    colunas = matriz.columns
+    linhas = []
+    for i in range(len(colunas)):
+        for j in range(i + 1, len(colunas)):
+            corr = matriz.iat[i, j]
+            if not np.isnan(corr) and abs(corr) >= minimo:
+                linhas.append({
+                    'Campo 1': colunas[i],
+                    'Campo 2': colunas[j],
+                    'Coeficiente': corr,
+                    'Força': classificar_correlacao(corr),
+                    'Direção': 'negativa' if corr < 0 else 'positiva'
+                })
+    tabela = pd.DataFrame(linhas, columns=['Campo 1', 'Campo 2', 'Coeficiente', 'Força', 'Direção'])
+    ordem = tabela['Coeficiente'].abs().sort_values(ascending=False).index
+    return tabela.loc[ordem].reset_index(drop=True)
+
+def benchmark_kendall(tamanhos=(10_000, 100_000, 1_000_000), semente=0):
+    """Compara tempo e resultado do Kendall O(n log n) com o caminho do pandas (que exige scipy)"""
+    rng = np.random.default_rng(semente)
+    print("\n⏱️ BENCHMARK KENDALL (pandas x O(n log n)):")
+    for n in tamanhos:
+        x = rng.integers(0, n // 10 + 2, n).astype('float64')  # Com empates
+        y = x + rng.normal(0, n / 20, n)
+        y[rng.random(n) < 0.01] = np.nan
+        dados = pd.DataFrame({'x': x, 'y': y})
+
+        inicio = time.perf_counter()
+        obtido = kendall_tau_b(dados['x'], dados['y'])
+        tempo_rapido = time.perf_counter() - inicio
+
+        try:
+            inicio = time.perf_counter()
+            esperado = dados.corr(method='kendall').iloc[0, 1]
+            tempo_pandas = time.perf_counter() - inicio
+        except ImportError:
+            print(f"• n={n:>10,}: rápido {tempo_rapido:8.3f}s | pandas indisponível (requer scipy)")
+            continue
+
+        print(f"• n={n:>10,}: pandas {tempo_pandas:8.3f}s | rápido {tempo_rapido:8.3f}s "
+              f"| {tempo_pandas / tempo_rapido:6.1f}x | diferença {abs(esperado - obtido):.2e}")
+
+# =============================================== #
+# ========== RESUMO PARA O BOXPLOT ============= #
+# ax.bxp aceita orientation= só a partir do matplotlib 3.10; antes, vert=
+BXP_COM_ORIENTATION = tuple(int(p) for p in matplotlib.__version__.split('.')[:2]) >= (3, 10)
+
+def _orientacao_bxp(vertical):
+    """Argumento de orientação do ax.bxp para a versão instalada do matplotlib"""
+    if BXP_COM_ORIENTATION:
+        return {'orientation': 'vertical' if vertical else 'horizontal'}
+    return {'vert': vertical}
+
+def limites_iqr(df, coluna, fator=1.5, aproximado=False):
+    """(inferior, superior, erro de posto) de Q1 - fator·IQR a Q3 + fator·IQR, quartis exatos ou do sketch"""
+    if aproximado:
+        resumo, erro_posto = obter_resumo_aproximado(df, coluna)
+    else:
+        resumo, erro_posto = obter_resumo(df, coluna), 0.0
+    return resumo.q1 - fator * resumo.iqr, resumo.q3 + fator * resumo.iqr, erro_posto
+
+def resumo_boxplot(serie, fator, limite_inferior, limite_superior, aproximado=False,
+                   max_outliers=MAX_OUTLIERS_BOXPLOT, semente=0):
+    """Estatísticas no formato do Axes.bxp com amostra de outliers; retorna também o total deles"""
+    arr = _valores_float(serie)
+    dados = arr[(arr >= limite_inferior) & (arr <= limite_superior)]
+    if len(dados) == 0:
+        return None, 0
+
+    if aproximado:
+        q1, mediana, q3 = SketchQuantis().atualizar(dados).quantis([0.25, 0.5, 0.75])
+    else:
+        q1, mediana, q3 = _quantis_selecao(dados, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    # Bigodes vão até o valor mais extremo dentro de Q1 - fator·IQR e Q3 + fator·IQR
+    dentro = (dados >= q1 - fator * iqr) & (dados <= q3 + fator * iqr)
+    outliers = dados[~dentro]
+    total_outliers = len(outliers)
+    if total_outliers > max_outliers:
+        rng = np.random.default_rng(semente)
+        amostra = rng.choice(outliers, max_outliers - 2, replace=False)
+        outliers = np.concatenate([amostra, [outliers.min(), outliers.max()]])
+
+    return {
+        'label': '',
+        'q1': q1,
+        'med': mediana,
+        'q3': q3,
+        'whislo': dados[dentro].min(),
+        'whishi': dados[dentro].max(),
+        'mean': dados.mean(),
+        'fliers': outliers,
+    }, total_outliers
+
+# =============================================== #
+# ========= RASTERIZAÇÃO DA DISPERSÃO ========== #
+def rasterizar_densidade(x, y, bins_x, bins_y, log_x=False, log_y=False):
+    """Grade 2D de contagens dos pontos; em escala log, células uniformes em log10"""
+    x, y = _valores_float(pd.Series(x)), _valores_float(pd.Series(y))
+    validos = ~(np.isnan(x) | np.isnan(y))
+    if log_x:
+        validos &= x > 0
+    if log_y:
+        validos &= y > 0
+    x, y = x[validos], y[validos]
+    if log_x:
+        x = np.log10(x)
+    if log_y:
+        y = np.log10(y)
+
+    def _indices(valores, bins):
+        inicio, fim = (valores.min(), valores.max()) if len(valores) else (0.0, 1.0)
+        if fim == inicio:
+            inicio, fim = inicio - 0.5, fim + 0.5
+        indices = ((valores - inicio) / (fim - inicio) * bins).astype('int64')
+        return np.minimum(indices, bins - 1), np.linspace(inicio, fim, bins + 1)
+
+    ix, bordas_x = _indices(x, bins_x)
+    iy, bordas_y = _indices(y, bins_y)
+    contagens = np.bincount(ix * bins_y + iy, minlength=bins_x * bins_y).reshape(bins_x, bins_y)
+    return contagens, (10 ** bordas_x if log_x else bordas_x), (10 ** bordas_y if log_y else bordas_y)
+
+# =============================================== #
+# ========= REGRESSÃO LINEAR EM BLOCOS ========= #
+@dataclass
+class ResultadoRegressao:
+    """Reta de mínimos quadrados obtida das estatísticas suficientes"""
+    n: int
+    inclinacao: float
+    intercepto: float
+    r2: float
+    erro_padrao: float
+    media_x: float
+    sxx: float
+
+    def prever(self, xs):
+        return self.intercepto + self.inclinacao * np.asarray(xs, dtype='float64')
+
+    def banda_confianca(self, xs, z=1.96):
+        """Intervalo de confiança analítico da reta (aproximação normal, adequada para n grande)"""
+        xs = np.asarray(xs, dtype='float64')
+        margem = z * self.erro_padrao * np.sqrt(1 / self.n + (xs - self.media_x) ** 2 / self.sxx)
+        ajuste = self.prever(xs)
+        return ajuste - margem, ajuste + margem
+
+def regressao_linear_streaming(x, y, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """Ajuste OLS em uma passada por blocos; pares com nulo são ignorados"""
+    x, y = pd.Series(x), pd.Series(y)
+    deslocamento = None
+    n = sx = sy = sxx = syy = sxy = 0.0
+    for inicio in range(0, len(x), tamanho_chunk):
+        bx = _valores_float(x.iloc[inicio:inicio + tamanho_chunk])
+        by = _valores_float(y.iloc[inicio:inicio + tamanho_chunk])
+        validos = ~(np.isnan(bx) | np.isnan(by))
+        bx, by = bx[validos], by[validos]
+        if len(bx) == 0:
+            continue
+        if deslocamento is None:
+            deslocamento = (bx.mean(), by.mean())
+        bx, by = bx - deslocamento[0], by - deslocamento[1]
+        n += len(bx)
+        sx += bx.sum()
+        sy += by.sum()
+        sxx += bx @ bx
+        syy += by @ by
+        sxy += bx @ by
+
+    if n < 3:
+        return None
+    mx, my = sx / n, sy / n
+    sxx_c = sxx - n * mx * mx
+    syy_c = syy - n * my * my
+    sxy_c = sxy - n * mx * my
+    if sxx_c <= 0:
+        return None
+    inclinacao = sxy_c / sxx_c
+    residuos = max(syy_c - inclinacao * sxy_c, 0.0)
+    return ResultadoRegressao(
+        n=int(n),
+        inclinacao=inclinacao,
+        intercepto=(deslocamento[1] + my) - inclinacao * (deslocamento[0] + mx),
+        r2=sxy_c ** 2 / (sxx_c * syy_c) if syy_c > 0 else np.nan,
+        erro_padrao=np.sqrt(residuos / (n - 2)),
+        media_x=deslocamento[0] + mx,
+        sxx=sxx_c,
+    )
+
+# =============================================== #
+# ============ MOTOR DE HISTOGRAMA ============= #
+@dataclass
+class HistogramaBase:
+    """Histograma fino de uma coluna (em log10 quando `log`), base para rebinagem e KDE"""
+    bordas: np.ndarray
+    contagens: np.ndarray
+    log: bool
+    total: int
+    desvio_padrao: float
+
+    @property
+    def largura(self):
+        return self.bordas[1] - self.bordas[0]
+
+    @property
+    def centros(self):
+        return (self.bordas[:-1] + self.bordas[1:]) / 2
+
+def histograma_base(serie, log=False, bins=BINS_HISTOGRAMA_BASE, intervalo=None):
+    """Histograma fino em uma passada, sobre a coluna inteira ou só sobre `intervalo`"""
+    arr = _valores_float(serie)
+    arr = arr[~np.isnan(arr)]
+    if log:
+        arr = np.log10(arr[arr > 0])
+    if len(arr) == 0:
+        return None
+    inicio, fim = intervalo if intervalo is not None else (arr.min(), arr.max())
+    if fim == inicio:
+        inicio, fim = inicio - 0.5, fim + 0.5
+    dentro = arr[(arr >= inicio) & (arr <= fim)] if intervalo is not None else arr
+    indices = np.minimum(((dentro - inicio) / (fim - inicio) * bins).astype('int64'), bins - 1)
+    return HistogramaBase(
+        bordas=np.linspace(inicio, fim, bins + 1),
+        contagens=np.bincount(indices, minlength=bins),
+        log=log,
+        total=len(arr),
+        desvio_padrao=arr.std(ddof=1) if len(arr) > 1 else 0.0,
+    )
+
+def _intervalo_transformado(base, minimo, maximo):
+    """Limites pedidos na escala da base (log10 quando aplicável), com padrão na base"""
+    transformar = np.log10 if base.log else (lambda v: v)
+    inicio = transformar(minimo) if minimo is not None and (minimo > 0 or not base.log) else base.bordas[0]
+    fim = transformar(maximo) if maximo is not None and (maximo > 0 or not base.log) else base.bordas[-1]
+    if fim <= inicio:
+        fim = inicio + base.largura
+    return inicio, fim
+
+def rebinar_histograma(base, bins, minimo=None, maximo=None):
+    """Histograma de `bins` faixas derivado da base; retorna bordas (escala original) e contagens"""
+    inicio, fim = _intervalo_transformado(base, minimo, maximo)
+    indices = np.floor((base.centros - inicio) / (fim - inicio) * bins).astype('int64')
+    dentro = (indices >= 0) & (indices < bins)
+    contagens = np.bincount(indices[dentro], weights=base.contagens[dentro], minlength=bins)
+    bordas = np.linspace(inicio, fim, bins + 1)
+    return (10 ** bordas if base.log else bordas), contagens
+
+def kde_binada(base):
+    """KDE gaussiana sobre a grade da base (convolução via FFT, banda pela regra de Scott)"""
+    banda = base.desvio_padrao * base.total ** (-1 / 5)
+    if banda <= 0:
+        return None
+    meia_largura = min(int(np.ceil(4 * banda / base.largura)), len(base.contagens))
+    deslocamentos = np.arange(-meia_largura, meia_largura + 1) * base.largura
+    nucleo = np.exp(-0.5 * (deslocamentos / banda) ** 2) / (banda * np.sqrt(2 * np.pi))
+    tamanho = len(base.contagens) + len(nucleo) - 1
+    n_fft = 1 << (tamanho - 1).bit_length()
+    convolucao = np.fft.irfft(np.fft.rfft(base.contagens, n_fft) * np.fft.rfft(nucleo, n_fft), n_fft)
+    densidade = convolucao[meia_largura:meia_largura + len(base.contagens)] / base.total
+    centros = base.centros
+    return (10 ** centros if base.log else centros), np.maximum(densidade, 0.0)
+
+# =============================================== #
+# ============ SESSÃO DE LIMPEZA =============== #
+def mascara_criterio(serie, criterio, limite=None, limites_iqr=None):
+    """Máscara (numpy) das linhas removidas pelo critério 'nulos', 'acima', 'abaixo' ou 'iqr'"""
+    if criterio == 'nulos':
+        return serie.isna().to_numpy()
+    valores = _valores_float(serie)
+    if criterio == 'acima':
+        return valores > limite
+    if criterio == 'abaixo':
+        return valores < limite
+    if criterio == 'iqr':
+        limite_inf, limite_sup = limites_iqr
+        return (valores < limite_inf) | (valores > limite_sup)
+    raise ValueError(f"Critério desconhecido: {criterio}")
+
+def _converter_tipo(serie, novo_tipo):
+    """Converte a série para um dos tipos oferecidos em alterar_tipo"""
+    if novo_tipo in ('int64', 'float64'):
+        numeros = pd.to_numeric(serie, errors='coerce')
+        if novo_tipo == 'int64' and numeros.isna().any():
+            # Valores não numéricos/nulos viram <NA> em vez de quebrar a conversão
+            return np.trunc(numeros).astype('Int64')
+        return numeros.astype(novo_tipo)
+    return serie.astype(novo_tipo)
+
+def tipo_otimizado(serie):
+    """Menor representação segura da série: (tipo, perfil); tipo None se a coluna for toda nula"""
+    perfil = _atualizar_perfil(_novo_perfil(), serie)
+    if perfil['tipo'] == 'numerico':
+        if perfil['inteiro']:
+            return _menor_inteiro(perfil['minimo'], perfil['maximo'], anulavel=perfil['nulos']), perfil
+        return ('float32' if perfil['float32'] else 'float64'), perfil
+    if perfil['tipo'] == 'bool':
+        return ('boolean' if perfil['nulos'] else 'bool'), perfil
+    if perfil['tipo'] == 'texto':
+        return ('category' if perfil['valores'] is not None else 'string[pyarrow]'), perfil
+    return None, perfil
+
+def _memoria_estimada(serie, perfil, tipo):
+    """Bytes estimados da série convertida para `tipo`"""
+    n = len(serie)
+    if tipo == 'category':
+        categorias = pd.Index(sorted(perfil['valores']))
+        return n * (1 if len(categorias) < 128 else 2) + categorias.memory_usage(deep=True)
+    if tipo == 'string[pyarrow]':
+        return int(serie.dropna().astype(str).str.len().sum()) + 4 * (n + 1) + (n + 7) // 8
+    dtype = pd.api.types.pandas_dtype(tipo)
+    mascara_nulos = n if isinstance(dtype, pd.api.extensions.ExtensionDtype) else 0  # Int*/boolean anuláveis
+    return n * dtype.itemsize + mascara_nulos
+
+NOMES_PREENCHIMENTO = {'media': 'média', 'mediana': 'mediana', 'moda': 'moda'}
+
+def _valor_preenchimento(serie, metodo):
+    """Valor global de preenchimento de uma série: média, mediana ou moda"""
+    if metodo == 'media':
+        return serie.mean()
+    if metodo == 'mediana':
+        return serie.median()
+    contagens = serie.value_counts()
+    return contagens.index[0] if len(contagens) else np.nan
+
+def _preenchimento_por_grupo(series, codigos, metodo):
+    """Tabela (código do grupo x coluna) de valores de preenchimento a partir de pares (coluna, série)"""
+    valores = {}
+    for coluna, serie in series:  # Uma série por vez: sem juntar as colunas num DataFrame
+        if metodo in ('media', 'mediana'):
+            valores[coluna] = serie.groupby(codigos).agg('mean' if metodo == 'media' else 'median')
+            continue
+        contagens = serie.groupby(codigos).value_counts()  # Ordenadas por grupo, maior primeiro
+        primeiros = contagens[contagens > 0].groupby(level=0).head(1)
+        valores[coluna] = pd.Series(primeiros.index.get_level_values(1), index=primeiros.index.get_level_values(0))
+    return pd.DataFrame(valores)
+
+def _formatar_valor(valor):
+    return f"{valor:.2f}" if isinstance(valor, (int, float, np.number)) else f"'{valor}'"
+
+def _filtro_fundivel(operacao):
+    """Filtros que não dependem do estado atual podem ser combinados em uma só máscara"""
+    return operacao['tipo'] == 'filtro' and operacao['criterio'] in ('nulos', 'acima', 'abaixo')
+
+def _descrever_filtro(operacao):
+    """Descrição legível de um filtro de linhas"""
+    descricao = {
+        'nulos': "com valores nulos",
+        'acima': f"com valores acima de {operacao.get('limite')}",
+        'abaixo': f"com valores abaixo de {operacao.get('limite')}",
+        'iqr': f"outliers (IQR{' aproximado' if operacao.get('aproximado') else ''})",
+    }[operacao['criterio']]
+    return f"{descricao} na coluna '{operacao['coluna']}'"
+
+def _mensagem_filtro(operacao, removidas):
+    """Linha de log de um filtro de linhas"""
+    return f"Removidas {removidas} linhas {_descrever_filtro(operacao)}"
+
+def contar_sobreposicao(mascaras):
+    """Linhas por máscara, exclusivas de cada uma, total combinado e sobreposição"""
+    cobertura = np.zeros(len(mascaras[0]), dtype=np.uint8)
+    for mascara in mascaras:
+        cobertura += mascara
+    unicas = cobertura == 1
+    por_mascara = [int(m.sum()) for m in mascaras]
+    exclusivas = [int((m & unicas).sum()) for m in mascaras]
+    return por_mascara, exclusivas, int((cobertura > 0).sum()), int((cobertura > 1).sum())
+
+class SessaoLimpeza:
+    """Sessão de limpeza como plano de operações sobre o original, sem cópias até materializar"""
+
+    def __init__(self, original):
+        self.original = original
+        self.operacoes = []
+        self._desfeitas = []
+        self.attrs = {'versao_dataset': versao_dataset(original)}
+        self._versoes = [self.attrs['versao_dataset']]
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        self._mascara = None  # None = todas as linhas
+        self._sobrescritas = {}
+        self._removidas = []
+        self._mascaras = {}  # Máscaras de filtro do estado atual, por operação
+        self._versao_mascaras = None
+        self.log = []
+
+    # ---------- visão atual (sem materializar) ----------
+    @property
+    def columns(self):
+        return pd.Index([c for c in self.original.columns if c not in self._removidas])
+
+    @property
+    def dtypes(self):
+        return pd.Series({c: (self._sobrescritas[c].dtype if c in self._sobrescritas else self.original.dtypes[c])
+                          for c in self.columns}, dtype=object)
+
+    def __len__(self):
+        return len(self.original) if self._mascara is None else int(self._mascara.sum())
+
+    def _coluna_completa(self, coluna):
+        """Coluna atual sem aplicar a máscara (mesmo comprimento do original)"""
+        if coluna in self._removidas:
+            raise KeyError(coluna)
+        return self._sobrescritas[coluna] if coluna in self._sobrescritas else self.original[coluna]
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            serie = self._coluna_completa(chave)
+            return serie if self._mascara is None else serie[self._mascara]
+        return pd.concat([self[c] for c in chave], axis=1)
+
+    def select_dtypes(self, include=None, exclude=None):
+        """DataFrame vazio apenas com as colunas dos tipos pedidos (sem ler dados)"""
+        vazio = pd.DataFrame({c: pd.Series(dtype=t) for c, t in self.dtypes.items()})
+        return vazio.select_dtypes(include=include, exclude=exclude)
+
+    def _por_coluna(self, funcao, colunas):
+        """Aplica `funcao` a cada coluna; em datasets grandes, em paralelo (threads)"""
+        if len(colunas) > 1 and len(self) >= LINHAS_PARALELO_COLUNAS:
+            with ThreadPoolExecutor() as executor:
+                return list(executor.map(funcao, colunas))
+        return [funcao(coluna) for coluna in colunas]
+
+    def contar_nulos(self, colunas=None):
+        """Nulos por coluna nas linhas visíveis, sem copiar as colunas filtradas"""
+        colunas = list(self.columns if colunas is None else colunas)
+
+        def contar(coluna):
+            nulos = self._coluna_completa(coluna).isna().to_numpy()
+            return int(nulos.sum() if self._mascara is None else (nulos & self._mascara).sum())
+
+        return pd.Series(self._por_coluna(contar, colunas), index=colunas, dtype='int64')
+
+    def memoria_colunas(self, colunas=None):
+        """Bytes ocupados por coluna (colunas completas, incluindo linhas filtradas)"""
+        colunas = list(self.columns if colunas is None else colunas)
+        return pd.Series({c: int(self._coluna_completa(c).memory_usage(deep=True, index=False)) for c in colunas},
+                         dtype='int64')
+
+    def propor_tipos(self):
+        """Tipos mais compactos por coluna com a memória atual e a estimada após a conversão"""
+        def avaliar(coluna):
+            # Coluna completa: o tipo precisa comportar também as linhas já filtradas
+            serie = self._coluna_completa(coluna)
+            tipo, perfil = tipo_otimizado(serie)
+            if tipo is None or tipo == str(serie.dtype):
+                return None
+            if tipo == 'string[pyarrow]' and getattr(serie.dtype, 'storage', None) == 'pyarrow':
+                return None  # Já é texto Arrow
+            atual = serie.memory_usage(deep=True, index=False)
+            estimada = _memoria_estimada(serie, perfil, tipo)
+            return (coluna, str(serie.dtype), tipo, atual / 1024**2, estimada / 1024**2) if estimada < atual else None
+
+        linhas = [r for r in self._por_coluna(avaliar, list(self.columns)) if r is not None]
+        tabela = pd.DataFrame(linhas, columns=['Coluna', 'Tipo atual', 'Tipo proposto',
+                                               'Memória atual (MB)', 'Memória estimada (MB)'])
+        tabela['Economia (%)'] = (1 - tabela['Memória estimada (MB)'] / tabela['Memória atual (MB)']) * 100
+        return tabela
+
+    def _indice_completo(self, coluna):
+        """Índice de dicionário da coluna completa (o do original, se ela não foi alterada)"""
+        if coluna in self._sobrescritas:
+            return memorizar(self, coluna, 'indice_completo', lambda: codificar_serie(self._sobrescritas[coluna]))
+        return obter_indice(self.original, coluna)
+
+    def indice(self, coluna):
+        """Índice de dicionário das linhas visíveis"""
+        def calcular():
+            codigos, valores = self._indice_completo(coluna)
+            return (codigos if self._mascara is None else codigos[self._mascara]), valores
+        return memorizar(self, coluna, 'indice', calcular)
+
+    def _valor_e_nulos(self, coluna, metodo):
+        """Valor global de preenchimento e nulos visíveis; a moda sai dos códigos do índice"""
+        if metodo == 'moda':
+            codigos, valores = self.indice(coluna)
+            contagens, nulos = contar_codigos(codigos, len(valores))
+            return (valores[contagens.argmax()] if contagens.any() else np.nan), nulos
+        visivel = self[coluna]
+        return _valor_preenchimento(visivel, metodo), int(visivel.isna().sum())
+
+    def _moda_por_grupo(self, codigos_grupo, n_grupos, coluna):
+        """Moda da coluna por código de grupo via contingência (NaN em grupos sem valores)"""
+        codigos, valores = self.indice(coluna)
+        tabela = contingencia(codigos_grupo, n_grupos, codigos, len(valores))
+        melhores = tabela.argmax(axis=1)
+        encontrados = tabela[np.arange(n_grupos), melhores] > 0
+        return pd.Series(valores.take(melhores).astype(object), dtype=object).where(encontrados)
+
+    def _preencher_coluna(self, coluna, valor):
+        """Preenche os nulos da coluna no lugar (o original, compartilhado, é copiado uma única vez)"""
+        serie = self._sobrescritas.get(coluna)
+        if serie is None:
+            serie = self._coluna_completa(coluna).copy()
+        if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(serie.dtype):
+            preenchimento = valor[serie.isna()] if isinstance(valor, pd.Series) else pd.Series([valor])
+            if (preenchimento.astype('float64').dropna() % 1 != 0).any():
+                serie = serie.astype('float64')  # Int* anulável não aceita média/mediana fracionária
+        serie.fillna(valor, inplace=True)
+        self._sobrescritas[coluna] = serie
+
+    def _preencher(self, colunas, metodo, grupo=None):
+        """Preenche os nulos das colunas (por grupo, com `grupo`); retorna [(coluna, nulos, valor)]"""
+        if grupo is None:
+            def tarefa(coluna):
+                valor, nulos = self._valor_e_nulos(coluna, metodo)
+                self._preencher_coluna(coluna, valor)
+                return coluna, nulos, valor
+            return self._por_coluna(tarefa, colunas)
+
+        codigos, grupos = self._indice_completo(grupo)
+        visiveis = codigos if self._mascara is None else codigos[self._mascara]
+        tabela = None
+        if metodo == 'moda':
+            try:
+                tabela = pd.DataFrame({c: self._moda_por_grupo(visiveis, len(grupos), c) for c in colunas})
+            except ValueError:
+                pass  # Contingência grande demais: segue pelo groupby
+        if tabela is None:
+            tabela = _preenchimento_por_grupo(((c, self[c]) for c in colunas), visiveis, metodo)
+            tabela = tabela[tabela.index >= 0]  # Código -1 = grupo nulo
+
+        def tarefa(coluna):
+            valor, nulos = self._valor_e_nulos(coluna, metodo)
+            por_grupo = np.full(len(grupos) + 1, valor, dtype=object)  # Última posição atende o código -1
+            encontrados = tabela[coluna].dropna()
+            por_grupo[encontrados.index.to_numpy()] = encontrados.to_numpy(dtype=object)
+            linhas = pd.Series(por_grupo[codigos], index=self._coluna_completa(coluna).index)
+            if pd.api.types.is_numeric_dtype(self.dtypes[coluna]):
+                linhas = linhas.astype('float64')
+            self._preencher_coluna(coluna, linhas)
+            return coluna, nulos, valor
+        return self._por_coluna(tarefa, colunas)
+
+    # ---------- plano de operações ----------
+    def mascara_filtro(self, operacao):
+        """Linhas visíveis que um filtro removeria (numpy, comprimento do original), calculada uma vez por estado"""
+        if self._versao_mascaras != self.attrs['versao_dataset']:
+            self._mascaras, self._versao_mascaras = {}, self.attrs['versao_dataset']
+        chave = json.dumps(operacao, sort_keys=True, default=str)
+        if chave not in self._mascaras:
+            self._mascaras[chave] = self._calcular_mascara_filtro(operacao)
+        return self._mascaras[chave]
+
+    def _calcular_mascara_filtro(self, operacao):
+        coluna = operacao['coluna']
+        limites = None
+        if operacao['criterio'] == 'iqr':
+            limites = limites_iqr(self, coluna, operacao.get('fator', 1.5), operacao.get('aproximado', False))[:2]
+        remover = mascara_criterio(self._coluna_completa(coluna), operacao['criterio'],
+                                   operacao.get('limite'), limites)
+        return remover if self._mascara is None else remover & self._mascara
+
+    def previa_filtros(self, filtros):
+        """Tabela de linhas removidas por critério e exclusivas, total e sobreposição, sem copiar dados"""
+        por_filtro, exclusivas, total, sobreposicao = contar_sobreposicao([self.mascara_filtro(f) for f in filtros])
+        tabela = pd.DataFrame({
+            'Critério': [_descrever_filtro(f) for f in filtros],
+            'Linhas removidas': por_filtro,
+            'Exclusivas': exclusivas,
+        })
+        return tabela, total, sobreposicao
+
+    def _remover_linhas(self, remover):
+        """Aplica uma máscara de remoção (já restrita às linhas visíveis); retorna quantas linhas saíram"""
+        removidas = int(remover.sum())
+        if removidas:
+            self._mascara = ~remover if self._mascara is None else self._mascara & ~remover
+        return removidas
+
+    def _executar(self, operacao):
+        """Aplica uma operação ao estado atual e retorna a mensagem de log"""
+        tipo = operacao['tipo']
+        coluna = operacao.get('coluna')
+
+        if tipo == 'filtro':
+            remover = self.mascara_filtro(operacao)
+            return _mensagem_filtro(operacao, self._remover_linhas(remover))
+
+        if tipo == 'filtro_combinado':
+            # Todos os critérios avaliados sobre o mesmo estado e removidos de uma vez
+            remover = np.zeros(len(self.original), dtype=bool)
+            for filtro in operacao['filtros']:
+                remover |= self.mascara_filtro(filtro)
+            removidas = self._remover_linhas(remover)
+            criterios = '; '.join(_descrever_filtro(f) for f in operacao['filtros'])
+            return f"Removidas {removidas} linhas por {len(operacao['filtros'])} critérios combinados ({criterios})"
+
+        if tipo == 'tipo':
+            serie = self._coluna_completa(coluna)
+            if self._mascara is not None and operacao['novo_tipo'] == 'int64':
+                # Linhas já excluídas não podem impedir a conversão
+                serie = serie.where(self._mascara, 0)
+            self._sobrescritas[coluna] = _converter_tipo(serie, operacao['novo_tipo'])
+            return f"Coluna '{coluna}' convertida para {self._sobrescritas[coluna].dtype}"
+
+        if tipo == 'otimizar_tipos':
+            tipos = operacao['tipos']
+            convertidas = self._por_coluna(lambda c: self._coluna_completa(c).astype(tipos[c]), list(tipos))
+            self._sobrescritas.update(zip(tipos, convertidas))
+            return f"Tipos otimizados em {len(tipos)} colunas: " + ', '.join(f"{c} → {t}" for c, t in tipos.items())
+
+        if tipo == 'remover_colunas':
+            for c in operacao['colunas']:
+                self._sobrescritas.pop(c, None)
+            self._removidas.extend(c for c in operacao['colunas'] if c not in self._removidas)
+            return f"Excluídas as colunas: {', '.join(map(str, operacao['colunas']))}"
+
+        if tipo == 'preencher':
+            metodo, grupo = operacao.get('metodo', 'media'), operacao.get('grupo')
+            resultados = self._preencher(operacao.get('colunas') or [coluna], metodo, grupo)
+            rotulo = NOMES_PREENCHIMENTO[metodo] + (f" por '{grupo}'" if grupo else "")
+            if len(resultados) == 1:
+                coluna, nulos, valor = resultados[0]
+                detalhe = f" por '{grupo}'" if grupo else f" ({_formatar_valor(valor)})"
+                return f"Preenchidos {nulos} nulos com {NOMES_PREENCHIMENTO[metodo]}{detalhe} na coluna '{coluna}'"
+            total = sum(nulos for _, nulos, _ in resultados)
+            detalhes = ', '.join(f"{c} ({nulos})" for c, nulos, _ in resultados)
+            return f"Preenchidos {total} nulos com {rotulo} em {len(resultados)} colunas: {detalhes}"
+
+        raise ValueError(f"Operação desconhecida: {tipo}")
+
+    def aplicar(self, operacao):
+        """Acrescenta a operação ao plano; retorna a mensagem de log"""
+        try:
+            mensagem = self._executar(operacao)  # Calculada sob a versão anterior
+        except Exception:
+            self._reaplicar()  # Uma falha no meio (ex.: várias colunas) não deixa o estado pela metade
+            raise
+        self.attrs['versao_dataset'] = next(_contador_versoes)
+        self._mascaras = {}
+        self.operacoes.append(operacao)
+        self._versoes.append(self.attrs['versao_dataset'])
+        self._desfeitas.clear()
+        self.log.append(mensagem)
+        return mensagem
+
+    def _filtrar_fundidos(self, operacoes):
+        """Aplica filtros consecutivos sem dependência de estado em uma única passada"""
+        acumulado = np.zeros(len(self.original), dtype=bool)
+        mensagens = []
+        for operacao in operacoes:
+            remover = self.mascara_filtro(operacao)
+            novas = remover & ~acumulado
+            acumulado |= remover
+            mensagens.append(_mensagem_filtro(operacao, int(novas.sum())))
+        self._remover_linhas(acumulado)
+        return mensagens
+
+    def _executar_lote(self, operacoes, versoes):
+        """Executa o plano; versoes[i] é a versão do estado anterior à operação i"""
+        mensagens = []
+        i = 0
+        while i < len(operacoes):
+            self.attrs['versao_dataset'] = versoes[i]  # Reaproveita as estatísticas em cache
+            fim = i
+            while fim < len(operacoes) and _filtro_fundivel(operacoes[fim]):
+                fim += 1
+            if fim - i > 1:
+                mensagens.extend(self._filtrar_fundidos(operacoes[i:fim]))
+                i = fim
+            else:
+                mensagens.append(self._executar(operacoes[i]))
+                i += 1
+        self.attrs['versao_dataset'] = versoes[-1]
+        return mensagens
+
+    def aplicar_lote(self, operacoes):
+        """Acrescenta várias operações ao plano em uma execução (filtros consecutivos fundidos)"""
+        versoes = [self.attrs['versao_dataset']] + [next(_contador_versoes) for _ in operacoes]
+        mensagens = self._executar_lote(operacoes, versoes)
+        self.operacoes.extend(operacoes)
+        self._versoes.extend(versoes[1:])
+        self._desfeitas.clear()
+        self.log.extend(mensagens)
+        return mensagens
+
+    def _reaplicar(self):
+        """Reconstrói o estado aplicando o plano sobre o original"""
+        self._reiniciar_estado()
+        self.log = self._executar_lote(self.operacoes, self._versoes)
+
+    def desfazer(self):
+        """Remove a última operação do plano; retorna-a (ou None se não houver)"""
+        if not self.operacoes:
+            return None
+        operacao = self.operacoes.pop()
+        self._desfeitas.append((operacao, self._versoes.pop()))
+        self._reaplicar()
+        return operacao
+
+    def refazer(self):
+        """Reaplica a última operação desfeita; retorna-a (ou None se não houver)"""
+        if not self._desfeitas:
+            return None
+        operacao, versao = self._desfeitas.pop()
+        self.log.append(self._executar(operacao))
+        self.attrs['versao_dataset'] = versao
+        self.operacoes.append(operacao)
+        self._versoes.append(versao)
+        return operacao
+
+    def materializar(self):
+        """Monta o DataFrame resultante (índice reiniciado)"""
+        df = pd.DataFrame({c: self[c].reset_index(drop=True) for c in self.columns})
+        df.attrs['versao_dataset'] = self.attrs['versao_dataset']
+        return df
+
+# =============================================== #
+# =========== GRAVAÇÃO DO DATASET ============== #
+FORMATOS_SAIDA = {'.feather': 'feather', '.arrow': 'feather', '.parquet': 'parquet', '.csv': 'csv'}
+
+def _lotes_arrow(df, schema, tamanho_lote=TAMANHO_LOTE_ESCRITA):
+    """Converte o DataFrame em RecordBatches de até `tamanho_lote` linhas, sob demanda"""
+    for inicio in range(0, len(df), tamanho_lote):
+        yield pa.RecordBatch.from_pandas(df.iloc[inicio:inicio + tamanho_lote], schema=schema, preserve_index=False)
+
+def schema_texto(schema):
+    """Schema para CSV: o CSV não tem dicionários, então categorias são gravadas como texto"""
+    return pa.schema([pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                      for f in schema])
+
+def gravar_dataset(df, destino, formato=None, compressao=None, particao=None, tamanho_lote=TAMANHO_LOTE_ESCRITA,
+                   sobrescrever=False):
+    """Grava o DataFrame lote a lote em feather, Parquet ou CSV, opcionalmente particionado"""
+    formato = formato or FORMATOS_SAIDA.get(Path(destino).suffix.lower(), 'feather')
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    lotes = _lotes_arrow(df, schema, tamanho_lote)
+
+    if particao is not None:
+        if formato == 'csv':
+            raise ValueError("Particionamento disponível apenas para feather e Parquet")
+        formato_ds = ds.ParquetFileFormat() if formato == 'parquet' else ds.IpcFileFormat()
+        if formato == 'parquet':
+            opcoes = formato_ds.make_write_options(compression=compressao or 'snappy', write_statistics=True)
+        else:
+            opcoes = formato_ds.make_write_options(compression=compressao)
+        ds.write_dataset(
+            lotes, destino, schema=schema, format=formato_ds, file_options=opcoes,
+            partitioning=ds.partitioning(pa.schema([schema.field(particao)]), flavor='hive'),
+            max_rows_per_group=tamanho_lote,
+            existing_data_behavior='delete_matching' if sobrescrever else 'error',
+        )
+    elif formato == 'parquet':
+        with pq.ParquetWriter(destino, schema, compression=compressao or 'snappy', write_statistics=True) as escritor:
+            for lote in lotes:
+                escritor.write_batch(lote)
+    elif formato == 'csv':
+        # Mesmo formato do to_csv original (aspas só quando necessário), gravado em blocos
+        with open(destino, 'w', newline='', encoding='utf-8') as arquivo:
+            for inicio in range(0, len(df), tamanho_lote):
+                df.iloc[inicio:inicio + tamanho_lote].to_csv(arquivo, header=inicio == 0, index=False)
+            if len(df) == 0:
+                df.to_csv(arquivo, index=False)
+    else:
+        with pa.ipc.new_file(destino, schema, options=pa.ipc.IpcWriteOptions(compression=compressao)) as escritor:
+            for lote in lotes:
+                escritor.write_batch(lote)
+    return destino
+
+# =============================================== #
+# ====== LEITURA COM FILTROS (PUSHDOWN) ======== #
+def abrir_fonte(caminho):
+    """Dataset Arrow sobre um feather, um Parquet ou um diretório particionado (Hive)"""
+    caminho = Path(caminho)
+    if caminho.is_dir():
+        formato = 'parquet' if next(caminho.rglob('*.parquet'), None) is not None else 'ipc'
+        return ds.dataset(caminho, format=formato, partitioning='hive')
+    return ds.dataset(caminho, format='parquet' if caminho.suffix.lower() == '.parquet' else 'ipc')
+
+def _filtro_empurravel(operacao):
+    """Filtros que viram expressão Arrow (o IQR depende de quantis do estado atual)"""
+    if operacao['tipo'] == 'filtro_combinado':
+        return all(_filtro_fundivel(f) for f in operacao['filtros'])
+    return _filtro_fundivel(operacao)
+
+def expressao_manter(filtros):
+    """Expressão Arrow das linhas mantidas pelos filtros (nulo nunca é 'acima' nem 'abaixo')"""
+    expressao = None
+    for filtro in filtros:
+        campo = ds.field(filtro['coluna'])
+        nulo = campo.is_null(nan_is_null=True)
+        if filtro['criterio'] == 'nulos':
+            manter = ~nulo
+        elif filtro['criterio'] == 'acima':
+            manter = (campo <= filtro['limite']) | nulo
+        else:
+            manter = (campo >= filtro['limite']) | nulo
+        expressao = manter if expressao is None else expressao & manter
+    return expressao
+
+def ler_com_filtros(fonte, colunas=None, filtros=None, intervalo=None):
+    """Lê só as colunas e linhas pedidas, com os filtros aplicados no scanner do Arrow"""
+    fonte = abrir_fonte(fonte) if not isinstance(fonte, ds.Dataset) else fonte
+    expressao = expressao_manter(filtros or [])
+    if intervalo is not None:
+        coluna, minimo, maximo = intervalo
+        faixa = (ds.field(coluna) >= minimo) & (ds.field(coluna) <= maximo)
+        expressao = faixa if expressao is None else expressao & faixa
+    return fonte.to_table(columns=colunas, filter=expressao).to_pandas()
+
+def abrir_dados(caminho, colunas=None, filtros=None, intervalo=None):
+    """Abre CSV (via cache feather), feather, Parquet ou diretório Hive"""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == '.csv':
+        caminho = obter_feather_cache(str(caminho))
+    if colunas is None and not filtros and intervalo is None \
+            and caminho.is_file() and caminho.suffix.lower() != '.parquet':
+        return DatasetColunar(caminho)
+    return ler_com_filtros(caminho, colunas, filtros, intervalo)
+
+# =============================================== #
+# ============ RECEITAS DE LIMPEZA ============= #
+def exportar_receita(operacoes, caminho, origem=None):
+    """Grava o plano de operações de uma sessão como receita JSON reaplicável"""
+    receita = {
+        'versao': VERSAO_FORMATO_RECEITA,
+        'origem': origem,
+        'criada_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'operacoes': list(operacoes),
+    }
+    Path(caminho).write_text(json.dumps(receita, indent=2, ensure_ascii=False), encoding='utf-8')
+    return caminho
+
+def carregar_receita(caminho):
+    """Lê uma receita JSON e valida o formato; retorna a lista de operações"""
+    receita = json.loads(Path(caminho).read_text(encoding='utf-8'))
+    if receita.get('versao') != VERSAO_FORMATO_RECEITA:
+        raise ValueError(f"Versão de receita não suportada: {receita.get('versao')}")
+    return receita['operacoes']
+
+def _colunas_da_receita(operacoes):
+    """Colunas que a receita precisa encontrar no dataset"""
+    colunas = []
+    for operacao in operacoes:
+        if operacao['tipo'] == 'filtro_combinado':
+            colunas.extend(c for c in _colunas_da_receita(operacao['filtros']) if c not in colunas)
+            continue
+        colunas_operacao = operacao.get('colunas', [operacao.get('coluna')]) + list(operacao.get('tipos', {}))
+        for coluna in colunas_operacao + [operacao.get('grupo')]:
+            if coluna is not None and coluna not in colunas:
+                colunas.append(coluna)
+    return colunas
+
+def separar_filtros_empurraveis(operacoes):
+    """Divide a receita em (filtros para a leitura, operações restantes)"""
+    empurrados, restantes, bloqueado = [], [], False
+    for operacao in operacoes:
+        if not bloqueado and _filtro_empurravel(operacao):
+            empurrados.extend(operacao.get('filtros', [operacao]))
+        else:
+            bloqueado = bloqueado or operacao['tipo'] != 'remover_colunas'
+            restantes.append(operacao)
+    return empurrados, restantes
+
+def aplicar_receita(arquivo_receita, arquivo_entrada, destino=None):
+    """Reaplica uma receita de limpeza sem interação e salva o resultado"""
+    inicio = time.perf_counter()
+    operacoes = carregar_receita(arquivo_receita)
+    caminho = Path(arquivo_entrada)
+    if caminho.suffix.lower() == '.csv':
+        caminho = obter_feather_cache(str(caminho))
+    fonte = abrir_fonte(caminho)
+    ausentes = [c for c in _colunas_da_receita(operacoes) if c not in fonte.schema.names]
+    if ausentes:
+        raise ValueError(f"Colunas da receita ausentes em {arquivo_entrada}: {', '.join(map(str, ausentes))}")
+
+    empurrados, restantes = separar_filtros_empurraveis(operacoes)
+    removidas = {c for op in restantes if op['tipo'] == 'remover_colunas' for c in op['colunas']}
+    usadas = set(_colunas_da_receita([op for op in restantes if op['tipo'] != 'remover_colunas']))
+    colunas = [c for c in fonte.schema.names if c not in removidas or c in usadas]
+
+    dados = ler_com_filtros(fonte, colunas, empurrados)
+    if empurrados:
+        print(f"• Leitura filtrada: {fonte.count_rows() - len(dados)} linhas descartadas por {len(empurrados)} filtro(s)")
+    sessao = SessaoLimpeza(dados)
+    for mensagem in sessao.aplicar_lote(restantes):
+        print(f"• {mensagem}")
+    if destino is None:
+        destino = f"{Path(arquivo_entrada).stem}_limpo.feather"
+    gravar_dataset(sessao.materializar(), destino)
+    print(f"✅ Receita aplicada em {time.perf_counter() - inicio:.2f}s: {len(sessao):,} linhas salvas em {destino}")
+    return destino
+
+# =============================================== #
+# =============== API DE ANÁLISE =============== #
+# Cálculos sem input/print: as telas do menu e o modo em lote só formatam o resultado
+@dataclass
+class ResultadoCorrelacao:
+    """Coeficiente entre dois campos: correlação (numéricos) ou V de Cramér (categóricos)"""
+    campo1: str
+    campo2: str
+    metodo: str
+    coeficiente: float
+    pares: int
+    covariancia: float = None
+    combinacoes: pd.DataFrame = None  # Só no V de Cramér: combinações mais frequentes
+    categorias: tuple = None          # Só no V de Cramér: categorias de cada campo
+
+    @property
+    def forca(self):
+        if np.isnan(self.coeficiente):
+            return None
+        classificar = classificar_associacao if self.metodo == 'cramer' else classificar_correlacao
+        return classificar(self.coeficiente)
+
+    def tabela(self):
+        return pd.DataFrame([{
+            'Campo 1': self.campo1,
+            'Campo 2': self.campo2,
+            'Método': self.metodo,
+            'Coeficiente': self.coeficiente,
+            'Força': self.forca,
+            'Pares': self.pares,
+            'Covariância': self.covariancia,
+        }])
+
+def calcular_correlacao(df, campo1, campo2, metodo='pearson', k=TOP_K_PADRAO // 2):
+    """Correlação entre dois campos; V de Cramér se algum deles não for numérico"""
+    if not all(pd.api.types.is_numeric_dtype(df.dtypes[c]) for c in (campo1, campo2)):
+        codigos1, valores1 = obter_indice(df, campo1)
+        codigos2, valores2 = obter_indice(df, campo2)
+        tabela = contingencia(codigos1, len(valores1), codigos2, len(valores2))
+        combinacoes = _selecionar_top_k(pd.RangeIndex(tabela.size), tabela.ravel(), k, tabela.sum())
+        combinacoes = combinacoes[combinacoes['Contagem'] > 0].rename(columns={'Valor': 'Combinação'})
+        combinacoes['Combinação'] = [f"{valores1[i // len(valores2)]} × {valores2[i % len(valores2)]}"
+                                     for i in combinacoes['Combinação']]
+        return ResultadoCorrelacao(campo1, campo2, 'cramer', cramer_v(tabela), int(tabela.sum()),
+                                   combinacoes=combinacoes.reset_index(drop=True),
+                                   categorias=(len(valores1), len(valores2)))
+
+    if metodo not in ('pearson', 'spearman', 'kendall'):
+        raise ValueError(f"Método de correlação desconhecido: {metodo}")
+    if metodo == 'kendall':
+        coeficiente = kendall_tau_b(df[campo1], df[campo2])  # O(n log n) em vez de O(n²)
+    else:
+        coeficiente = matriz_correlacao(df, [campo1, campo2], metodo).iat[0, 1]
+    x, y = _valores_float(df[campo1]), _valores_float(df[campo2])
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    covariancia = float((x - x.mean()) @ (y - y.mean()) / (len(x) - 1)) if len(x) > 1 else np.nan
+    return ResultadoCorrelacao(campo1, campo2, metodo, coeficiente, int(validos.sum()), covariancia)
+
+def calcular_faixas(df, coluna, modo='intervalo', minimo=None, maximo=None, intervalo=None,
+                    faixas=4, bordas=None, ultima_aberta=False):
+    """Contagem por faixas nos modos 'intervalo', 'quantis' ou 'bordas'"""
+    if modo == 'quantis':
+        bordas = bordas_por_quantis(df[coluna], faixas)
+        if len(bordas) < 2:
+            raise ValueError("A coluna não tem valores distintos suficientes para formar faixas por quantis")
+    elif modo == 'bordas':
+        bordas = np.asarray(bordas, dtype='float64')
+        if len(bordas) < 2 or not np.all(np.diff(bordas) > 0):
+            raise ValueError("Informe ao menos 2 bordas em ordem estritamente crescente")
+    elif modo == 'intervalo':
+        stats = obter_resumo(df, coluna)
+        minimo = stats.minimo if minimo is None else minimo
+        maximo = stats.maximo if maximo is None else maximo
+        if intervalo is None or intervalo <= 0:
+            raise ValueError("O intervalo deve ser maior que zero")
+        if maximo <= minimo:
+            raise ValueError(f"O valor máximo deve ser maior que o mínimo ({minimo})")
+        bordas = bordas_por_intervalo(minimo, maximo, intervalo)
+    else:
+        raise ValueError(f"Modo de faixas desconhecido: {modo}")
+    return contar_por_faixas(df[coluna], bordas, ultima_aberta)
+
+def mascara_outliers(df, coluna, fator=1.5, aproximado=False):
+    """Máscara (numpy) das linhas fora de Q1 - fator·IQR e Q3 + fator·IQR, com os limites usados"""
+    limite_inferior, limite_superior, _ = limites_iqr(df, coluna, fator, aproximado)
+    mascara = mascara_criterio(df[coluna], 'iqr', limites_iqr=(limite_inferior, limite_superior))
+    return mascara, (limite_inferior, limite_superior)
+
+@dataclass
+class ContagemValores:
+    """Valores mais frequentes de uma coluna e quantidade de distintos"""
+    modo: str
+    tabela: pd.DataFrame
+    distintos: int = None  # Exato (nulo conta como valor) ou estimado no hll; None no Misra-Gries
+    nulos: int = None      # No modo exato os nulos aparecem na própria tabela
+    erro: float = 0.0      # hll: erro padrão relativo; frequentes: erro máximo das contagens
+    total: int = 0
+
+def contar_valores(df, coluna, modo='exato', k=TOP_K_PADRAO):
+    """Valores distintos nos modos 'exato' (top-k), 'hll' ou 'frequentes'"""
+    if modo == 'hll':
+        hll = obter_hll(df, coluna)
+        tabela = pd.DataFrame({'Valor': [], 'Contagem': []})
+        return ContagemValores(modo, tabela, int(hll.estimar()), int(df[coluna].isna().sum()),
+                               hll.erro_padrao, len(df))
+    if modo == 'frequentes':
+        contador = obter_frequentes(df, coluna)
+        return ContagemValores(modo, contador.itens(k if k > 0 else contador.m), None, int(contador.nulos),
+                               int(contador.erro), int(contador.total))
+    if modo != 'exato':
+        raise ValueError(f"Modo de valores distintos desconhecido: {modo}")
+    if pd.api.types.is_numeric_dtype(df.dtypes[coluna]):
+        tabela, distintos = top_k_exato(df[coluna], k)
+    else:
+        tabela, distintos = top_k_codificado(*obter_indice(df, coluna), k)
+    return ContagemValores(modo, tabela, int(distintos), total=len(df))
+
+@dataclass
+class ResultadoBoxplot:
+    """Resumo do boxplot (formato do Axes.bxp) com os limites e o total de outliers"""
+    coluna: str
+    fator: float
+    resumo: ResumoColuna
+    caixa: dict
+    total_outliers: int
+    limite_inferior: float
+    limite_superior: float
+    personalizados: bool = False
+    aproximado: bool = False
+    erro_posto: float = 0.0
+
+    def tabela(self):
+        return pd.DataFrame([{
+            'Coluna': self.coluna,
+            'Q1': self.caixa['q1'],
+            'Mediana': self.caixa['med'],
+            'Q3': self.caixa['q3'],
+            'Média': self.caixa['mean'],
+            'Bigode inferior': self.caixa['whislo'],
+            'Bigode superior': self.caixa['whishi'],
+            'Limite inferior': self.limite_inferior,
+            'Limite superior': self.limite_superior,
+            'Outliers': self.total_outliers,
+        }])
+
+def calcular_boxplot(df, coluna, fator=1.5, minimo=None, maximo=None, aproximado=False):
+    """Boxplot de `coluna` entre `minimo` e `maximo` (padrão: limites do IQR)"""
+    if aproximado:
+        stats, erro_posto = obter_resumo_aproximado(df, coluna)
+    else:
+        stats, erro_posto = obter_resumo(df, coluna), 0.0
+    limite_inferior = minimo if minimo is not None else max(0, stats.q1 - fator * stats.iqr)
+    limite_superior = maximo if maximo is not None else stats.q3 + fator * stats.iqr
+    caixa, total_outliers = resumo_boxplot(df[coluna], fator, limite_inferior, limite_superior, aproximado)
+    if caixa is None:
+        raise ValueError("Nenhum valor dentro dos limites informados")
+    return ResultadoBoxplot(coluna, fator, stats, caixa, total_outliers, limite_inferior, limite_superior,
+                            minimo is not None or maximo is not None, aproximado, erro_posto)
+
+@dataclass
+class ResultadoHistograma:
+    """Histograma rebinado a partir da base fina em cache"""
+    coluna: str
+    base: HistogramaBase
+    bordas: np.ndarray
+    contagens: np.ndarray
+    minimo: float = None
+    maximo: float = None
+
+    @property
+    def fora(self):
+        """Valores válidos fora do intervalo pedido"""
+        return self.base.total - int(round(self.contagens.sum()))
+
+    def tabela(self):
+        return pd.DataFrame({
+            'Início': self.bordas[:-1],
+            'Fim': self.bordas[1:],
+            'Contagem': np.round(self.contagens).astype('int64'),
+            'Porcentagem (%)': self.contagens / self.base.total * 100,
+        })
+
+def calcular_histograma(df, coluna, bins=10, minimo=None, maximo=None, log_x=False):
+    """Histograma de `bins` faixas (uniformes em log10 com `log_x`); mudar bins/limites custa O(bins)"""
+    base = obter_histograma_base(df, coluna, log_x, bins, minimo, maximo)
+    if base is None:
+        raise ValueError("Nenhum valor válido para o histograma")
+    bordas, contagens = rebinar_histograma(base, bins, minimo, maximo)
+    return ResultadoHistograma(coluna, base, bordas, contagens, minimo, maximo)
+
+@dataclass
+class ResultadoDispersao:
+    """Correlação, reta de regressão e (opcional) grade de densidade de dois campos"""
+    x: str
+    y: str
+    correlacao: float
+    ajuste: ResultadoRegressao = None
+    contagens: np.ndarray = None
+    bordas_x: np.ndarray = None
+    bordas_y: np.ndarray = None
+
+    def tabela(self):
+        linha = {'X': self.x, 'Y': self.y, 'Correlação': self.correlacao}
+        if self.contagens is not None:
+            linha['Pontos'] = int(self.contagens.sum())
+        if self.ajuste is not None:
+            linha.update({'Inclinação': self.ajuste.inclinacao, 'Intercepto': self.ajuste.intercepto,
+                          'R²': self.ajuste.r2, 'Erro padrão': self.ajuste.erro_padrao, 'n': self.ajuste.n})
+        return pd.DataFrame([linha])
+
+def calcular_dispersao(df, x, y, bins=None, log=False, regressao=True):
+    """Correlação e reta OLS de `y` contra `x`; com `bins`, também a grade de densidade"""
+    resultado = ResultadoDispersao(x, y, matriz_correlacao(df, [x, y]).iat[0, 1])
+    if regressao:
+        resultado.ajuste = regressao_linear_streaming(df[x], df[y])
+    if bins is not None:
+        resultado.contagens, resultado.bordas_x, resultado.bordas_y = rasterizar_densidade(
+            df[x], df[y], bins[0], bins[1], log_x=log, log_y=log)
+    return resultado
+
+# =============================================== #
+# ============ DESENHO DOS GRÁFICOS ============ #
+# Desenham no eixo recebido; quem chama decide entre plt.show() (menu) e savefig (lote)
+def desenhar_faixas(ax, tabela, coluna):
+    """Barras da contagem por faixas"""
+    ax.bar(tabela['Faixa'], tabela['Contagem'], color=sns.color_palette('viridis', len(tabela)))
+    ax.set_title(f"Distribuição de registros por faixas de {coluna}")
+    ax.set_xlabel("Faixas de valores")
+    ax.set_ylabel("Número de registros")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+def desenhar_histograma(ax, resultado, cor='blue', densidade=False, acumulado=False, log_y=False):
+    """Degraus do histograma (contagem ou densidade, simples ou acumulado) com a KDE binada opcional"""
+    base, bordas, contagens = resultado.base, resultado.bordas, resultado.contagens
+    larguras = np.diff(np.log10(bordas) if base.log else bordas)
+    if acumulado:
+        valores = np.cumsum(contagens) / (base.total if densidade else 1)
+    else:
+        valores = contagens / (base.total * larguras) if densidade else contagens
+    ax.stairs(valores, bordas, fill=True, color=cor, alpha=0.6)
+    ax.stairs(valores, bordas, color=cor)
+
+    if densidade:
+        curva = kde_binada(base)
+        if curva is not None:
+            xs, ys = curva
+            if acumulado:
+                ys = np.cumsum(ys) * base.largura
+            ax.plot(xs, ys, color=cor, linewidth=2)
+
+    if base.log:
+        ax.set_xscale('log')
+    if log_y:
+        ax.set_yscale('log')
+    if resultado.minimo is not None or resultado.maximo is not None:
+        ax.set_xlim(left=resultado.minimo, right=resultado.maximo)
+
+    titulo = f"Histograma de {resultado.coluna}"
+    if densidade:
+        titulo += " com Densidade"
+    if acumulado:
+        titulo += " Acumulado"
+    ax.set_title(titulo)
+    ax.set_xlabel(resultado.coluna + (" (log)" if base.log else ""))
+    ax.set_ylabel(("Densidade" if densidade else "Contagem") + (" (log)" if log_y else ""))
+
+def desenhar_boxplot(ax, resultado, orientacao='v', visualizacao='1'):
+    """Boxplot do resumo; visualização 1 padrão, 2 log, 3 zoom no IQR, 4 sem outliers"""
+    stats, coluna = resultado.resumo, resultado.coluna
+    valores_em_y = orientacao == "h"
+    ax.bxp([resultado.caixa], **_orientacao_bxp(valores_em_y),
+           showfliers=visualizacao != "4", patch_artist=True, widths=0.5,
+           boxprops={'facecolor': 'skyblue'}, medianprops={'color': 'black'},
+           flierprops={'marker': 'o', 'markersize': 4, 'alpha': 0.5})
+
+    if visualizacao == "2":
+        (ax.set_yscale if valores_em_y else ax.set_xscale)('log')
+        (ax.set_ylabel if valores_em_y else ax.set_xlabel)(f"{coluna} (escala logarítmica)")
+        titulo = f"Boxplot LOGARÍTMICO de '{coluna}'"
+    elif visualizacao == "3":
+        (ax.set_ylim if valores_em_y else ax.set_xlim)(0, stats.q3 + 5 * stats.iqr)
+        titulo = f"Boxplot de '{coluna}' (Zoom IQR)"
+    else:
+        titulo = f"Boxplot de '{coluna}'"
+
+    # Linhas de referência
+    linewidth = 2.5 if visualizacao != "3" else 3.0
+    linha = ax.axhline if valores_em_y else ax.axvline
+    for valor, cor, estilo, espessura, rotulo in [
+            (resultado.limite_superior, 'gray', '-.', 1, 'Lim Sup'),
+            (stats.q3, 'green', '--', linewidth, 'Q3'),
+            (stats.media, 'purple', ':', linewidth + 0.5, 'Média'),
+            (stats.mediana, 'orange', '-', linewidth + 0.5, 'Mediana'),
+            (stats.q1, 'red', '--', linewidth, 'Q1'),
+            (resultado.limite_inferior, 'gray', '-.', 1, 'Lim Inf')]:
+        linha(valor, color=cor, linestyle=estilo, linewidth=espessura, label=f'{rotulo}: {valor:,.2f}')
+
+    if resultado.personalizados:
+        titulo += "\n(Limites personalizados)"
+    if resultado.aproximado:
+        titulo += f"\n(Quantis aproximados, erro de posto ≤ {resultado.erro_posto:.3%})"
+    ax.set_title(f"{titulo}\n(IQR: {stats.iqr:.2f}, Limites: {resultado.fator}×IQR)", fontsize=12)
+    ax.legend(bbox_to_anchor=(1.02, 1), loc='upper left', borderaxespad=0.)
+
+def desenhar_densidade(ax, resultado):
+    """Mapa de densidade rasterizado da dispersão (células vazias transparentes)"""
+    malha = ax.pcolormesh(resultado.bordas_x, resultado.bordas_y, np.ma.masked_equal(resultado.contagens.T, 0),
+                          norm=LogNorm(), cmap='viridis')
+    ax.figure.colorbar(malha, ax=ax, label="Pontos por célula (escala log)")
+
+def desenhar_regressao(ax, ajuste, log=False):
+    """Reta OLS com a banda de confiança de 95%, no intervalo atual do eixo X"""
+    x_min, x_max = ax.get_xlim()
+    xs = (np.geomspace if log and x_min > 0 else np.linspace)(x_min, x_max, 200)
+    inferior, superior = ajuste.banda_confianca(xs)
+    ax.plot(xs, ajuste.prever(xs), color='red', linestyle='--',
+            label=f"y = {ajuste.inclinacao:,.4g}·x + {ajuste.intercepto:,.4g} (R² = {ajuste.r2:.3f})")
+    ax.fill_between(xs, inferior, superior, color='red', alpha=0.15, label="IC 95% da reta")
+    ax.set_xlim(x_min, x_max)
+    ax.legend(loc='upper left')
+
+def desenhar_matriz_correlacao(ax, matriz, metodo):
+    """Mapa de calor da matriz de correlação (valores anotados até 12 colunas)"""
+    sns.heatmap(matriz, ax=ax, vmin=-1, vmax=1, cmap='coolwarm', annot=len(matriz) <= 12, fmt='.2f')
+    ax.set_title(f"Matriz de correlação ({metodo.upper()})")
 
-try:
-    df = pd.read_feather(ARQUIVO_FEATHER)
-    print(f"\nDataset carregado com {len(df):,} registros e {len(df.columns)} colunas.")
-except Exception as e:
-    print(f"❌ Erro ao carregar arquivo feather: {e}")
-    exit()
 # =============================================== #
 # ================== FUNÇÕES =================== #
 def estatisticas_colunas(df):
@@ -49,21 +2274,22 @@ def estatisticas_colunas(df):
     Retorna estatísticas para colunas numéricas (int/float)
     com formatação legível
     """
-    numericas = df.select_dtypes(include=['int64', 'float64'])
+    colunas = df.select_dtypes(include='number').columns.tolist()
     
-    if numericas.empty:
+    if not colunas:
         print("\n⚠️ Nenhuma coluna numérica encontrada!")
         return
     
+    tabela = tabela_estatisticas(df, colunas)
     estatisticas = pd.DataFrame({
-        'Coluna': numericas.columns,
-        'Tipo': numericas.dtypes.values,
-        'Média': numericas.mean(),
-        'Mediana': numericas.median(),
-        'Desvio Padrão': numericas.std(),
-        'Mínimo': numericas.min(),
-        'Máximo': numericas.max(),
-        'Nulos (%)': (numericas.isnull().mean() * 100).round(2)
+        'Coluna': tabela['coluna'],
+        'Tipo': tabela['tipo'],
+        'Média': tabela['media'],
+        'Mediana': tabela['mediana'],
+        'Desvio Padrão': tabela['desvio_padrao'],
+        'Mínimo': tabela['minimo'],
+        'Máximo': tabela['maximo'],
+        'Nulos (%)': tabela['nulos_pct'].round(2)
     })
     
     # Configura formatação
@@ -75,6 +2301,7 @@ def estatisticas_colunas(df):
     print("="*50)
     
     pd.reset_option('display.float_format')
+    return tabela
 
 def comparacao_campos(df):
     """Analisa a relação entre dois campos com seleção de método estatístico"""
@@ -108,16 +2335,22 @@ def comparacao_campos(df):
         except ValueError:
             print("❌ Por favor, digite apenas números.")
 
+    # Campo não numérico: associação entre categorias em vez de correlação
+    if not all(pd.api.types.is_numeric_dtype(df.dtypes[c]) for c in [campo1, campo2]):
+        associacao_categorica(df, campo1, campo2)
+        return
+
     # Configuração inicial para métodos
     metodo_nome = 'pearson'
     metodo_desc = "📈 Análise de relação LINEAR (Pearson)"
     
     # Seleção do coeficiente para variáveis numéricas
+    resultado = calcular_correlacao(df, campo1, campo2)
     if all(pd.api.types.is_numeric_dtype(df[c]) for c in [campo1, campo2]):
         print("\n" + "="*50)
         print("🧮 MÉTODO DE ANÁLISE ESTATÍSTICA:")
         print("1. Pearson [Padrão]")
-        print(f"   • Covariância: {df[[campo1, campo2]].cov().iloc[0,1]:,.2f}")
+        print(f"   • Covariância: {resultado.covariancia:,.2f}")
         print("   • Interpretação covariância:")
         print("     - Valor positivo: As variáveis tendem a aumentar juntas")
         print("     - Valor negativo: Uma variável aumenta quando a outra diminui")
@@ -154,7 +2387,9 @@ def comparacao_campos(df):
 
     # ANÁLISE NUMÉRICA x NUMÉRICA
     if all(pd.api.types.is_numeric_dtype(df[c]) for c in [campo1, campo2]):
-        corr = df[[campo1, campo2]].corr(method=metodo_nome).iloc[0,1] 
+        if metodo_nome != resultado.metodo:
+            resultado = calcular_correlacao(df, campo1, campo2, metodo_nome)
+        corr = resultado.coeficiente
         print(f"\n🔍 COEFICIENTE ({metodo_nome.upper()}): {corr:.2f}")
     
     # Leitura personalizada para cada método (VERSÃO COMPLETA E APRIMORADA)
@@ -253,6 +2488,87 @@ def comparacao_campos(df):
         pd.options.display.float_format = '{:,.2f}'.format
         print(stats.to_string(float_format='{:,.2f}'.format))
         pd.reset_option('display.float_format')
+
+def associacao_categorica(df, campo1, campo2):
+    """Associação entre dois campos categóricos (V de Cramér) pela contingência dos códigos"""
+    try:
+        resultado = calcular_correlacao(df, campo1, campo2)
+    except ValueError as e:
+        print(f"❌ {e}. Escolha campos com menos categorias.")
+        return
+    v = resultado.coeficiente
+    
+    print("\n" + "="*50)
+    print(f"🔗 Associação entre categorias (V de Cramér) entre '{campo1}' e '{campo2}':")
+    print(f"\n🔍 COEFICIENTE (CRAMÉR): {v:.2f}")
+    if np.isnan(v):
+        print("   • Categorias insuficientes para medir associação")
+    elif v >= 0.5:
+        print(f"   'Forte associação': conhecer {campo1} praticamente determina {campo2}")
+    elif v >= 0.3:
+        print("   'Associação moderada' entre as categorias")
+    elif v >= 0.1:
+        print("   'Associação fraca' entre as categorias")
+    else:
+        print("   'Associação insignificante': as categorias parecem independentes")
+    print(f"ℹ️ {resultado.pares:,} pares sem nulos, {resultado.categorias[0]} x {resultado.categorias[1]} categorias")
+    
+    # Combinações mais frequentes (seleção parcial na tabela de contingência)
+    print("\n📋 COMBINAÇÕES MAIS FREQUENTES:")
+    print(resultado.combinacoes.to_string(index=False, formatters={'Porcentagem (%)': '{:.2f}'.format}))
+
+def correlacao_todas_colunas(df):
+    """Calcula a matriz de correlação entre todas as colunas numéricas e lista os pares mais fortes"""
+    print("\n" + "="*50)
+    print("🧮 MATRIZ DE CORRELAÇÃO (TODAS AS COLUNAS NUMÉRICAS)")
+    
+    colunas = df.select_dtypes(include='number').columns.tolist()
+    if len(colunas) < 2:
+        print("❌ É necessário ter pelo menos 2 colunas numéricas!")
+        return
+    
+    print("\n1. Pearson [Padrão]")
+    print("2. Spearman")
+    print("3. Kendall")
+    metodos = {'1': 'pearson', '2': 'spearman', '3': 'kendall'}
+    metodo = metodos.get(input("▶ Digite o número do método (Enter para Pearson padrão): ") or '1')
+    if metodo is None:
+        print("❌ Opção inválida!")
+        return
+    
+    processos = None
+    if metodo != 'pearson':
+        try:
+            processos = int(input(f"▶ Processos paralelos (Enter para 1, máximo sugerido {os.cpu_count()}): ") or 1)
+        except ValueError:
+            print("⚠️ Valor inválido. Usando 1 processo.")
+            processos = 1
+    
+    try:
+        minimo = float(input("▶ Listar pares com |coeficiente| a partir de (padrão=0.3): ") or 0.3)
+    except ValueError:
+        print("⚠️ Valor inválido. Usando 0.3.")
+        minimo = 0.3
+    
+    inicio = time.perf_counter()
+    matriz = matriz_correlacao(df, colunas, metodo, processos)
+    duracao = time.perf_counter() - inicio
+    ranking = pares_mais_fortes(matriz, minimo)
+    
+    pd.options.display.float_format = '{:,.2f}'.format
+    print("\n" + "="*50)
+    print(f"🔍 PARES MAIS FORTES ({metodo.upper()}, |coeficiente| ≥ {minimo}):")
+    if ranking.empty:
+        print("ℹ️ Nenhum par atinge o limite informado.")
+    else:
+        print(ranking.to_string(index=False))
+    print(f"\n⏱️ {len(colunas)} colunas, {len(colunas) * (len(colunas) - 1) // 2} pares em {duracao:.2f}s")
+    
+    if input("\n▶ Mostrar a matriz completa? (s/n): ").lower() == 's':
+        print(matriz.to_string())
+    print("="*50)
+    pd.reset_option('display.float_format')
+
 """
 def plotar_boxplot(df):
     #Gera boxplot com opções de transformação logarítmica e zoom
@@ -371,7 +2687,7 @@ def plotar_boxplot(df):
     print("📊 CONFIGURAÇÃO DO BOXPLOT")
     
     # 1. Seleção da coluna
-    colunas_numericas = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    colunas_numericas = df.select_dtypes(include='number').columns.tolist()
     print("\n🔢 COLUNAS NUMÉRICAS DISPONÍVEIS:")
     for i, col in enumerate(colunas_numericas, 1):
         print(f"{i}. {col}")
@@ -383,13 +2699,21 @@ def plotar_boxplot(df):
         print("❌ Seleção inválida!")
         return
 
+    # Quantis exatos ou aproximados (sketch, uma passada e mesclável por blocos)
+    aproximado = input("▶ Usar quantis aproximados (recomendado para colunas muito grandes)? (s/n, padrão=n): ").lower() == 's'
+    if aproximado:
+        stats, erro_rank = obter_resumo_aproximado(df, coluna)
+    else:
+        stats, erro_rank = obter_resumo(df, coluna), 0.0
+
     # Mostrar estatísticas básicas para referência
-    stats = df[coluna].describe()
     print(f"\nℹ️ Estatísticas de '{coluna}':")
-    print(f"• Mínimo: {stats['min']:,.2f}")
-    print(f"• Máximo: {stats['max']:,.2f}")
-    print(f"• Média: {stats['mean']:,.2f}")
-    print(f"• Mediana: {stats['50%']:,.2f}")
+    print(f"• Mínimo: {stats.minimo:,.2f}")
+    print(f"• Máximo: {stats.maximo:,.2f}")
+    print(f"• Média: {stats.media:,.2f}")
+    print(f"• Mediana: {stats.mediana:,.2f}")
+    if aproximado:
+        print(f"• Quantis aproximados: erro de posto ≤ {erro_rank:.3%}")
 
     # 2. Configurações básicas
     print("\n⚙️ CONFIGURAÇÕES BÁSICAS:")
@@ -399,10 +2723,10 @@ def plotar_boxplot(df):
     # Configuração de limites personalizados
     print("\n🔘 LIMITES PERSONALIZADOS (deixe em branco para usar valores calculados)")
     try:
-        min_personalizado = input(f"▶ Valor mínimo (sugerido: {stats['min']:.2f}): ")
+        min_personalizado = input(f"▶ Valor mínimo (sugerido: {stats.minimo:.2f}): ")
         min_personalizado = float(min_personalizado) if min_personalizado else None
         
-        max_personalizado = input(f"▶ Valor máximo (sugerido: {stats['max']:.2f}): ")
+        max_personalizado = input(f"▶ Valor máximo (sugerido: {stats.maximo:.2f}): ")
         max_personalizado = float(max_personalizado) if max_personalizado else None
     except ValueError:
         print("❌ Valor inválido! Usando limites calculados automaticamente.")
@@ -420,96 +2744,47 @@ def plotar_boxplot(df):
             print("⚠️ Digite números válidos")
             largura, altura = 10, 6
 
-    # 3. Tipo de visualização
-    print("\n🔍 MELHORIA DE VISUALIZAÇÃO:")
-    print("1. Padrão (recomendado para dados uniformes)")
-    print("2. Escala logarítmica (recomendado para outliers extremos)")
-    print("3. Zoom na área interquartil (foco no núcleo dos dados)")
-    print("4. Retirar outliers da visualização")
-    escolha_visualizacao = input("▶ Escolha (1/2/3/4): ") or "1"
-
-    # Cálculos estatísticos
-    q1 = df[coluna].quantile(0.25)
-    q3 = df[coluna].quantile(0.75)
-    iqr = q3 - q1
-    mediana = df[coluna].median()
-    media = df[coluna].mean()
-    
-    # Usa limites personalizados ou calculados
-    limite_inferior = min_personalizado if min_personalizado is not None else max(0, q1 - fator * iqr)
-    limite_superior = max_personalizado if max_personalizado is not None else q3 + fator * iqr
-
-    # Plotagem
-    plt.figure(figsize=(largura, altura), tight_layout=True)
-    sns.set_style("whitegrid")
-    
-    # Filtra os dados dentro dos limites
-    dados_filtrados = df[(df[coluna] >= limite_inferior) & (df[coluna] <= limite_superior)][coluna]
-    
-    showfliers = escolha_visualizacao != "4"
-    if orientacao == "h":
-        ax = sns.boxplot(y=dados_filtrados, whis=fator, color="skyblue", showfliers=showfliers)
-    else:
-        ax = sns.boxplot(x=dados_filtrados, whis=fator, color="skyblue", showfliers=showfliers)
-
-    # Aplica a melhoria escolhida
-    if escolha_visualizacao == "2":
-        if orientacao == "h":
-            plt.yscale('log')
-            plt.ylabel(f"{coluna} (escala logarítmica)")
-        else:
-            plt.xscale('log')
-            plt.xlabel(f"{coluna} (escala logarítmica)")
-        titulo = f"Boxplot LOGARÍTMICO de '{coluna}'"
-    elif escolha_visualizacao == "3":
-        limite_superior_zoom = q3 + 5 * iqr
-        if orientacao == "h":
-            plt.ylim(0, limite_superior_zoom)
-        else:
-            plt.xlim(0, limite_superior_zoom)
-        titulo = f"Boxplot de '{coluna}' (Zoom IQR)"
-    else:
-        titulo = f"Boxplot de '{coluna}'"
+    # 3. Tipo de visualização
+    print("\n🔍 MELHORIA DE VISUALIZAÇÃO:")
+    print("1. Padrão (recomendado para dados uniformes)")
+    print("2. Escala logarítmica (recomendado para outliers extremos)")
+    print("3. Zoom na área interquartil (foco no núcleo dos dados)")
+    print("4. Retirar outliers da visualização")
+    escolha_visualizacao = input("▶ Escolha (1/2/3/4): ") or "1"
 
-    # Linhas de referência
-    linewidth = 2.5 if escolha_visualizacao != "3" else 3.0
-    if orientacao == "h":
-        plt.axhline(limite_superior, color='gray', linestyle='-.', linewidth=1, label=f'Lim Sup: {limite_superior:,.2f}')
-        plt.axhline(q3, color='green', linestyle='--', linewidth=linewidth, label=f'Q3: {q3:,.2f}')
-        plt.axhline(media, color='purple', linestyle=':', linewidth=linewidth+0.5, label=f'Média: {media:,.2f}')
-        plt.axhline(mediana, color='orange', linestyle='-', linewidth=linewidth+0.5, label=f'Mediana: {mediana:,.2f}')
-        plt.axhline(q1, color='red', linestyle='--', linewidth=linewidth, label=f'Q1: {q1:,.2f}')
-        plt.axhline(limite_inferior, color='gray', linestyle='-.', linewidth=1, label=f'Lim Inf: {limite_inferior:,.2f}')
-    else:
-        plt.axvline(limite_superior, color='gray', linestyle='-.', linewidth=1, label=f'Lim Sup: {limite_superior:,.2f}')
-        plt.axvline(q3, color='green', linestyle='--', linewidth=linewidth, label=f'Q3: {q3:,.2f}')
-        plt.axvline(media, color='purple', linestyle=':', linewidth=linewidth+0.5, label=f'Média: {media:,.2f}')
-        plt.axvline(mediana, color='orange', linestyle='-', linewidth=linewidth+0.5, label=f'Mediana: {mediana:,.2f}')
-        plt.axvline(q1, color='red', linestyle='--', linewidth=linewidth, label=f'Q1: {q1:,.2f}')
-        plt.axvline(limite_inferior, color='gray', linestyle='-.', linewidth=1, label=f'Lim Inf: {limite_inferior:,.2f}')
-
-    # Adiciona informação sobre os limites usados
-    if min_personalizado is not None or max_personalizado is not None:
-        titulo += "\n(Limites personalizados)"
+    # Resumo dos dados dentro dos limites: o desenho não depende do número de linhas
+    try:
+        resultado = calcular_boxplot(df, coluna, fator, min_personalizado, max_personalizado, aproximado)
+    except ValueError as e:
+        print(f"❌ {e}!")
+        return
     
-    plt.title(f"{titulo}\n(IQR: {iqr:.2f}, Limites: {fator}×IQR)", fontsize=12)
-    plt.legend(bbox_to_anchor=(1.02, 1), loc='upper left', borderaxespad=0.)
+    if escolha_visualizacao != "4" and resultado.total_outliers > len(resultado.caixa['fliers']):
+        print(f"ℹ️ Exibindo amostra de {len(resultado.caixa['fliers']):,} de {resultado.total_outliers:,} outliers")
+
+    # Plotagem
+    plt.figure(figsize=(largura, altura), tight_layout=True)
+    sns.set_style("whitegrid")
+    desenhar_boxplot(plt.gca(), resultado, orientacao, escolha_visualizacao)
     plt.show()
-    
 
 def tratamento_limpeza(df_original): 
-    df = df_original.copy()
-    log_operacoes = []
+    sessao = SessaoLimpeza(df_original)  # Sem cópia: as operações formam um plano
     
     while True:
         print("\n" + "="*50)
         print("🧹 MENU DE TRATAMENTO/LIMPEZA")
         print("="*50)
+        print(f"📊 Dataset atual: {len(sessao):,} linhas, {len(sessao.columns)} colunas, {len(sessao.operacoes)} operações")
         print("1. Excluir linhas")
         print("2. Alterar tipo de dados")
         print("3. Excluir colunas")
         print("4. Tratar valores nulos")
         print("5. Salvar dataset modificado")
+        print("6. Desfazer última operação")
+        print("7. Refazer operação desfeita")
+        print("8. Ver operações realizadas")
+        print("9. Aplicar alterações e voltar (sem salvar)")
         print("0. Voltar ao menu principal (descartar alterações)")
         
         opcao = input("\n▶ Escolha uma opção: ")
@@ -517,31 +2792,72 @@ def tratamento_limpeza(df_original):
         if opcao == '0':
             return None  # Descarta alterações
         elif opcao == '1':
-            df, log = excluir_linhas(df)
-            log_operacoes.extend(log)
+            excluir_linhas(sessao)
         elif opcao == '2':
-            df, log = alterar_tipo(df)
-            log_operacoes.extend(log)
+            alterar_tipo(sessao)
         elif opcao == '3':
-            df, log = excluir_colunas(df)
-            log_operacoes.extend(log)
+            excluir_colunas(sessao)
         elif opcao == '4':
-            df, log = tratar_nulos(df)
-            log_operacoes.extend(log)
+            tratar_nulos(sessao)
         elif opcao == '5':
-            salvar_dataset(df, log_operacoes)
+            df = sessao.materializar()
+            salvar_dataset(df, sessao.log, sessao.operacoes)
             return df
+        elif opcao == '6':
+            if sessao.desfazer() is None:
+                print("ℹ️ Nenhuma operação para desfazer")
+            else:
+                print(f"↩️ Operação desfeita. Dataset: {len(sessao):,} linhas")
+        elif opcao == '7':
+            if sessao.refazer() is None:
+                print("ℹ️ Nenhuma operação para refazer")
+            else:
+                print(f"↪️ Operação refeita: {sessao.log[-1]}")
+        elif opcao == '8':
+            print("\n📝 OPERAÇÕES NO PLANO:")
+            for i, mensagem in enumerate(sessao.log, 1):
+                print(f"{i}. {mensagem}")
+            if not sessao.log:
+                print("ℹ️ Nenhuma operação realizada")
+        elif opcao == '9':
+            return sessao.materializar()
         else:
             print("❌ Opção inválida!")
 
-def excluir_linhas(df):
-    log = []
+def excluir_linhas(sessao):
+    # Reúne um ou mais critérios; cada máscara é calculada uma única vez
+    filtros = []
+    while True:
+        filtro = escolher_filtro(sessao)
+        if filtro is not None:
+            filtros.append(filtro)
+        if input("\n▶ Adicionar outro critério de exclusão? (s/n): ").lower() != 's':
+            break
+    if not filtros:
+        return
+
+    tabela, total, sobreposicao = sessao.previa_filtros(filtros)
+    print("\n🔍 PRÉVIA DA EXCLUSÃO (nenhum dado copiado ainda):")
+    print(tabela.to_string(index=False))
+    if len(filtros) > 1:
+        print(f"🔁 Linhas atingidas por mais de um critério: {sobreposicao}")
+    print(f"🧮 Total a remover: {total} de {len(sessao)} linhas ({total/len(sessao):.1%})")
     
+    if input("▶ Confirmar exclusão? (s/n): ").lower() != 's':
+        print("ℹ️ Exclusão cancelada")
+        return
+
+    operacao = filtros[0] if len(filtros) == 1 else {'tipo': 'filtro_combinado', 'filtros': filtros}
+    sessao.aplicar(operacao)
+    print(f"\n✅ {sessao.log[-1]}")
+    print(f"📊 Dataset resultante: {len(sessao)} linhas")
+
+def escolher_filtro(sessao):
     # Mostra colunas numéricas para seleção
-    numericas = df.select_dtypes(include=['int64', 'float64']).columns
+    numericas = sessao.select_dtypes(include='number').columns
     print("\n🔢 COLUNAS NUMÉRICAS DISPONÍVEIS:")
     for i, col in enumerate(numericas, 1):
-        print(f"{i}. {col} (Tipo: {df[col].dtype})")
+        print(f"{i}. {col} (Tipo: {sessao.dtypes[col]})")
     
     # Validação da seleção da coluna
     while True:
@@ -567,133 +2883,195 @@ def excluir_linhas(df):
             break
         print("❌ Opção inválida. Digite 1, 2, 3 ou 4")
 
-    linhas_removidas = 0
+    operacao = {'tipo': 'filtro', 'coluna': coluna}
     
     if criterio == '1':
-        linhas_removidas = df[coluna].isna().sum()
-        if linhas_removidas > 0:
-            df = df.dropna(subset=[coluna])
-            log.append(f"Removidas {linhas_removidas} linhas com valores nulos na coluna '{coluna}'")
-        else:
+        operacao['criterio'] = 'nulos'
+        if not sessao.mascara_filtro(operacao).any():
             print("⚠️ Nenhum valor nulo encontrado nesta coluna.")
+            return None
     
-    elif criterio == '2':
-        while True:
-            try:
-                limite = float(input("▶ Digite o valor limite superior: "))
-                linhas_removidas = len(df[df[coluna] > limite])
-                if linhas_removidas > 0:
-                    df = df[df[coluna] <= limite]
-                    log.append(f"Removidas {linhas_removidas} linhas com valores acima de {limite} na coluna '{coluna}'")
-                    break
-                print("⚠️ Nenhum valor acima do limite encontrado. Tente um valor maior.")
-            except ValueError:
-                print("❌ Por favor, digite um número válido.")
-    
-    elif criterio == '3':
+    elif criterio in ['2', '3']:
+        acima = criterio == '2'
+        operacao['criterio'] = 'acima' if acima else 'abaixo'
         while True:
             try:
-                limite = float(input("▶ Digite o valor limite inferior: "))
-                linhas_removidas = len(df[df[coluna] < limite])
-                if linhas_removidas > 0:
-                    df = df[df[coluna] >= limite]
-                    log.append(f"Removidas {linhas_removidas} linhas com valores abaixo de {limite} na coluna '{coluna}'")
+                operacao['limite'] = float(input(f"▶ Digite o valor limite {'superior' if acima else 'inferior'}: "))
+                if sessao.mascara_filtro(operacao).any():
                     break
-                print("⚠️ Nenhum valor abaixo do limite encontrado. Tente um valor menor.")
+                print(f"⚠️ Nenhum valor {'acima' if acima else 'abaixo'} do limite encontrado. Tente um valor {'maior' if acima else 'menor'}.")
             except ValueError:
                 print("❌ Por favor, digite um número válido.")
     
     elif criterio == '4':
-        q1 = df[coluna].quantile(0.25)
-        q3 = df[coluna].quantile(0.75)
-        iqr = q3 - q1
-        limite_inf = q1 - 1.5*iqr
-        limite_sup = q3 + 1.5*iqr
-        linhas_removidas = len(df[(df[coluna] < limite_inf) | (df[coluna] > limite_sup)])
-        if linhas_removidas > 0:
-            df = df[(df[coluna] >= limite_inf) & (df[coluna] <= limite_sup)]
-            log.append(f"Removidas {linhas_removidas} linhas outliers (IQR) na coluna '{coluna}'")
-        else:
+        operacao['criterio'] = 'iqr'
+        operacao['fator'] = 1.5
+        operacao['aproximado'] = input("▶ Usar quantis aproximados (recomendado para colunas muito grandes)? (s/n, padrão=n): ").lower() == 's'
+        if operacao['aproximado']:
+            _, erro_rank = obter_resumo_aproximado(sessao, coluna)
+            print(f"ℹ️ Quantis aproximados: erro de posto ≤ {erro_rank:.3%}")
+        if not sessao.mascara_filtro(operacao).any():
             print("⚠️ Nenhum outlier encontrado usando o método IQR")
+            return None
 
-    if linhas_removidas > 0:
-        print(f"\n✅ Total de linhas removidas: {linhas_removidas}")
-        print(f"📊 Dataset resultante: {len(df)} linhas")
-    else:
-        print("\nℹ️ Nenhuma linha foi removida")
-    
-    return df, log
+    return operacao
 
-def salvar_dataset(df, log_operacoes):
+def salvar_dataset(df, log_operacoes, operacoes=None):
     print("\n" + "="*50)
     print("💾 SALVAR DATASET MODIFICADO")
     
     sufixo = input("▶ Digite o sufixo para o novo arquivo (ex: 'clean' para 'vehicles_clean.feather'): ")
-    formato = input("▶ Formato de saída (1-feather, 2-csv): ") or "1"
+    formato = {'1': 'feather', '2': 'csv', '3': 'parquet'}.get(input("▶ Formato de saída (1-feather, 2-csv, 3-parquet): ") or "1", 'feather')
+    
+    compressao = None
+    if formato != 'csv':
+        print("ℹ️ Sem compressão o feather pode ser aberto via memory map, sem cópia")
+        compressao = {'2': 'zstd', '3': 'lz4'}.get(input("▶ Compressão (1-nenhuma, 2-zstd, 3-lz4, padrão=1): "))
+        if compressao is None and formato == 'parquet':
+            compressao = 'none'  # No Parquet, sem compressão explícita o padrão é snappy
+    
+    particao = None
+    if formato != 'csv':
+        print("\n🗂️ PARTICIONAR POR COLUNA (estilo Hive, um diretório por valor):")
+        candidatas = [c for c in df.columns if df[c].dtype == 'category' or pd.api.types.is_integer_dtype(df[c])]
+        for i, col in enumerate(candidatas, 1):
+            print(f"{i}. {col}")
+        escolha = input("▶ Número da coluna de partição (Enter = arquivo único): ")
+        if escolha.isdigit() and 1 <= int(escolha) <= len(candidatas):
+            particao = candidatas[int(escolha) - 1]
     
     nome_base = ARQUIVO_FEATHER.split('.')[0]
-    novo_nome = f"{nome_base}_{sufixo}.{'feather' if formato == '1' else 'csv'}"
+    novo_nome = f"{nome_base}_{sufixo}" if particao else f"{nome_base}_{sufixo}.{formato}"
     
-    if formato == '1':
-        df.to_feather(novo_nome)
-    else:
-        df.to_csv(novo_nome, index=False)
+    sobrescrever = False
+    if particao and Path(novo_nome).exists():
+        if input(f"⚠️ O diretório '{novo_nome}' já existe. Sobrescrever as partições existentes? (s/n): ").lower() != 's':
+            print("❌ Gravação cancelada.")
+            return
+        sobrescrever = True
+    
+    inicio = time.perf_counter()
+    try:
+        gravar_dataset(df, novo_nome, formato, compressao, particao, sobrescrever=sobrescrever)
+    except (pa.ArrowException, ValueError, OSError) as e:
+        print(f"❌ Erro ao salvar: {e}")
+        return
+    print(f"⏱️ Gravado em {time.perf_counter() - inicio:.2f}s")
     
     print("\n📝 LOG DE OPERAÇÕES REALIZADAS:")
     for operacao in log_operacoes:
         print(f"• {operacao}")
     
     print(f"\n✅ Dataset salvo como: {novo_nome}")
+    
+    if operacoes and input("▶ Exportar receita de limpeza para reaplicar em novos arquivos? (s/n): ").lower() == 's':
+        receita = exportar_receita(operacoes, f"{nome_base}_{sufixo}.receita.json", origem=ARQUIVO_CSV)
+        print(f"📜 Receita salva como: {receita}")
+        print(f"   Reaplicar: python {Path(sys.argv[0]).name} --aplicar-receita {receita} <novo.csv> [saida.feather]")
+
+def excluir_colunas(sessao):
+    print("\n📋 COLUNAS DISPONÍVEIS:")
+    for i, col in enumerate(sessao.columns, 1):
+        print(f"{i}. {col} (Tipo: {sessao.dtypes[col]})")
+    
+    try:
+        selecao = input("\n▶ Números das colunas a excluir (separados por vírgula): ")
+        indices = [int(x) - 1 for x in selecao.split(',') if x.strip()]
+        colunas = [sessao.columns[i] for i in indices if 0 <= i < len(sessao.columns)]
+    except ValueError:
+        print("❌ Por favor, digite apenas números.")
+        return
+    
+    if not colunas:
+        print("\nℹ️ Nenhuma coluna foi excluída")
+        return
+    
+    sessao.aplicar({'tipo': 'remover_colunas', 'colunas': colunas})
+    print(f"\n✅ {len(colunas)} coluna(s) excluída(s). Restam {len(sessao.columns)} colunas.")
 
-def alterar_tipo(df):
-    log = []
+def alterar_tipo(sessao):
+    print("\n🔧 ALTERAR TIPOS DE DADOS")
+    print("1. Converter uma coluna")
+    print("2. Otimizar tipos de todas as colunas (economia de memória)")
+    if input("▶ Escolha o modo (padrão=1): ") == '2':
+        otimizar_tipos(sessao)
+        return
+    
     print("\n📋 COLUNAS DISPONÍVEIS:")
-    for i, col in enumerate(df.columns, 1):
-        print(f"{i}. {col} (Tipo atual: {df[col].dtype})")
+    for i, col in enumerate(sessao.columns, 1):
+        print(f"{i}. {col} (Tipo atual: {sessao.dtypes[col]})")
     
     col_idx = int(input("\n▶ Selecione a coluna para conversão: ")) - 1
-    coluna = df.columns[col_idx]
+    coluna = sessao.columns[col_idx]
     
     print("\n📝 TIPOS DISPONÍVEIS:")
     print("1. Inteiro (int64)")
     print("2. Decimal (float64)")
     print("3. Texto (object)")
     print("4. Categórico (category)")
-    novo_tipo = input("▶ Escolha o novo tipo: ")
+    novo_tipo = {'1': 'int64', '2': 'float64', '3': 'object', '4': 'category'}.get(input("▶ Escolha o novo tipo: "))
+    if novo_tipo is None:
+        print("❌ Opção inválida!")
+        return
     
     try:
-        if novo_tipo == '1':
-            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('int64')
-        elif novo_tipo == '2':
-            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
-        elif novo_tipo == '3':
-            df[coluna] = df[coluna].astype('object')
-        elif novo_tipo == '4':
-            df[coluna] = df[coluna].astype('category')
-        
-        log.append(f"Coluna '{coluna}' convertida para {df[coluna].dtype}")
-        print(f"✅ Tipo alterado com sucesso para {df[coluna].dtype}")
+        sessao.aplicar({'tipo': 'tipo', 'coluna': coluna, 'novo_tipo': novo_tipo})
+        print(f"✅ Tipo alterado com sucesso para {sessao.dtypes[coluna]}")
+    except Exception as e:
+        print(f"❌ Erro na conversão: {e}")
+
+def otimizar_tipos(sessao):
+    print("\n🔍 Analisando o menor tipo seguro de cada coluna...")
+    proposta = sessao.propor_tipos()
+    if proposta.empty:
+        print("✅ Todas as colunas já estão no menor tipo seguro")
+        return
+    
+    print("\n📉 CONVERSÕES PROPOSTAS:")
+    print(proposta.to_string(index=False, float_format='{:.2f}'.format))
+    atual, estimada = proposta['Memória atual (MB)'].sum(), proposta['Memória estimada (MB)'].sum()
+    print(f"\n💾 Estimativa: {atual:.2f} MB → {estimada:.2f} MB ({atual / max(estimada, 1e-9):.1f}x menor)")
+    
+    if input("▶ Aplicar todas as conversões? (s/n): ").lower() != 's':
+        print("ℹ️ Nenhum tipo alterado")
+        return
+    
+    try:
+        sessao.aplicar({'tipo': 'otimizar_tipos', 'tipos': dict(zip(proposta['Coluna'], proposta['Tipo proposto']))})
     except Exception as e:
         print(f"❌ Erro na conversão: {e}")
+        return
     
-    return df, log
+    depois = sessao.memoria_colunas(proposta['Coluna']) / 1024**2
+    print("\n✅ MEMÓRIA POR COLUNA:")
+    for coluna, antes in zip(proposta['Coluna'], proposta['Memória atual (MB)']):
+        print(f"• {coluna}: {antes:.2f} MB → {depois[coluna]:.2f} MB (-{antes - depois[coluna]:.2f} MB)")
+    print(f"💾 Total economizado: {atual - depois.sum():.2f} MB")
 
-def tratar_nulos(df):
-    log = []
+def tratar_nulos(sessao):
     print("\n🧹 TRATAMENTO DE VALORES NULOS")
     
-    colunas_com_nulos = df.columns[df.isnull().any()].tolist()
+    nulos_por_coluna = sessao.contar_nulos()  # Uma passada por coluna, sem cópias
+    colunas_com_nulos = nulos_por_coluna[nulos_por_coluna > 0].index.tolist()
     if not colunas_com_nulos:
         print("✅ Nenhuma coluna com valores nulos encontrada!")
-        return df, log
+        return
     
     print("\n📋 COLUNAS COM VALORES NULOS:")
     for i, col in enumerate(colunas_com_nulos, 1):
-        nulos = df[col].isnull().sum()
-        print(f"{i}. {col} ({nulos} nulos, {nulos/len(df):.1%})")
+        nulos = nulos_por_coluna[col]
+        print(f"{i}. {col} ({nulos} nulos, {nulos/len(sessao):.1%})")
     
-    col_idx = int(input("\n▶ Selecione a coluna para tratamento: ")) - 1
-    coluna = colunas_com_nulos[col_idx]
+    selecao = input("\n▶ Selecione as colunas para tratamento (números separados por vírgula, Enter = todas): ")
+    try:
+        indices = [int(x) - 1 for x in selecao.split(',') if x.strip()]
+    except ValueError:
+        print("❌ Por favor, digite apenas números.")
+        return
+    colunas = [colunas_com_nulos[i] for i in indices if 0 <= i < len(colunas_com_nulos)] if indices else colunas_com_nulos
+    if not colunas:
+        print("❌ Nenhuma coluna válida selecionada.")
+        return
     
     print("\n⚙️ MÉTODOS DE TRATAMENTO:")
     print("1. Remover linhas com nulos")
@@ -702,19 +3080,48 @@ def tratar_nulos(df):
     print("4. Preencher com moda (categóricas)")
     metodo = input("▶ Escolha o método: ")
     
-    nulos_antes = df[coluna].isnull().sum()
-    
     if metodo == '1':
-        df = df.dropna(subset=[coluna])
-        log.append(f"Removidas {nulos_antes} linhas com nulos na coluna '{coluna}'")
-    elif metodo == '2' and pd.api.types.is_numeric_dtype(df[coluna]):
-        fill_value = df[coluna].mean()
-        df[coluna] = df[coluna].fillna(fill_value)
-        log.append(f"Preenchidos {nulos_antes} nulos com média ({fill_value:.2f}) na coluna '{coluna}'")
-    # [...] outros métodos
+        filtros = [{'tipo': 'filtro', 'coluna': c, 'criterio': 'nulos'} for c in colunas]
+        sessao.aplicar(filtros[0] if len(filtros) == 1 else {'tipo': 'filtro_combinado', 'filtros': filtros})
+    elif metodo in ['2', '3', '4']:
+        metodo = {'2': 'media', '3': 'mediana', '4': 'moda'}[metodo]
+        if metodo != 'moda':
+            ignoradas = [c for c in colunas if not pd.api.types.is_numeric_dtype(sessao.dtypes[c])]
+            if ignoradas:
+                print(f"⚠️ Colunas não numéricas ignoradas: {', '.join(ignoradas)}")
+            colunas = [c for c in colunas if c not in ignoradas]
+            if not colunas:
+                return
+        
+        # Preenchimento por grupo (ex: mediana do preço por fabricante)
+        candidatas = [c for c in sessao.select_dtypes(exclude='number').columns if c not in colunas]
+        grupo = None
+        if candidatas:
+            print("\n🏷️ COLUNAS PARA AGRUPAR O PREENCHIMENTO:")
+            for i, col in enumerate(candidatas, 1):
+                print(f"{i}. {col}")
+            escolha = input("▶ Número da coluna de agrupamento (Enter = valor global): ")
+            if escolha.isdigit() and 1 <= int(escolha) <= len(candidatas):
+                grupo = candidatas[int(escolha) - 1]
+        
+        operacao = {'tipo': 'preencher', 'metodo': metodo}
+        if len(colunas) == 1:
+            operacao['coluna'] = colunas[0]
+        else:
+            operacao['colunas'] = colunas
+        if grupo is not None:
+            operacao['grupo'] = grupo
+        try:
+            sessao.aplicar(operacao)
+        except (TypeError, ValueError) as e:
+            print(f"❌ Erro no preenchimento: {e}")
+            return
+    else:
+        print("❌ Opção inválida!")
+        return
     
-    print(f"\n✅ {nulos_antes} valores nulos tratados na coluna '{coluna}'")
-    return df, log
+    print(f"\n✅ {nulos_por_coluna[colunas].sum()} valores nulos tratados em {len(colunas)} coluna(s)")
+    print(f"📝 {sessao.log[-1]}")
 
 def plotar_dispersao(df):
     """Gera gráfico de dispersão entre duas variáveis com personalização"""
@@ -722,7 +3129,7 @@ def plotar_dispersao(df):
     print("📊 GRÁFICO DE DISPERSÃO")
     
     # Seleção das colunas numéricas
-    numericas = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numericas = df.select_dtypes(include='number').columns.tolist()
     
     if len(numericas) < 2:
         print("❌ É necessário ter pelo menos 2 colunas numéricas!")
@@ -768,15 +3175,20 @@ def plotar_dispersao(df):
         except ValueError:
             print("⚠️ Digite números válidos")
     
-    # Configurações de pontos
-    print("\n● Configuração dos pontos:")
-    print("   - Tamanho (1-100):\n     Padrão=20 | Use 5-15 para muitos pontos, 30+ para poucos")
-    print("   - Opacidade (0.1-1.0):\n     Padrão=0.7 | Use valores baixos (0.2-0.5) para datasets grandes")
-    print("   - Cores disponíveis: blue, red, green, purple, orange, etc.")
-    
-    cor = input("▶ Cor dos pontos (padrão=blue): ") or "blue"
-    tamanho = float(input("▶ Tamanho (1-100, padrão=20): ") or 20)
-    opacidade = float(input("▶ Opacidade (0.1-1.0, padrão=0.7): ") or 0.7)
+    # Muitos pontos: mapa de densidade rasterizado em vez de desenhar cada linha
+    rasterizado = len(df) > LIMITE_PONTOS_DISPERSAO
+    if rasterizado:
+        print(f"\nℹ️ {len(df):,} linhas (acima de {LIMITE_PONTOS_DISPERSAO:,}): usando mapa de densidade")
+    else:
+        # Configurações de pontos
+        print("\n● Configuração dos pontos:")
+        print("   - Tamanho (1-100):\n     Padrão=20 | Use 5-15 para muitos pontos, 30+ para poucos")
+        print("   - Opacidade (0.1-1.0):\n     Padrão=0.7 | Use valores baixos (0.2-0.5) para datasets grandes")
+        print("   - Cores disponíveis: blue, red, green, purple, orange, etc.")
+        
+        cor = input("▶ Cor dos pontos (padrão=blue): ") or "blue"
+        tamanho = float(input("▶ Tamanho (1-100, padrão=20): ") or 20)
+        opacidade = float(input("▶ Opacidade (0.1-1.0, padrão=0.7): ") or 0.7)
     
     # Escala logarítmica
     print("\n● Escala logarítmica:")
@@ -804,18 +3216,31 @@ def plotar_dispersao(df):
     x_label = input(f"▶ Rótulo do eixo X (deixe em branco para '{x_col}'): ") or x_col
     y_label = input(f"▶ Rótulo do eixo Y (deixe em branco para '{y_col}'): ") or y_col
     
+    # Correlação, reta e (se rasterizado) grade de densidade em uma chamada da API
+    bins = (int(largura * CELULAS_POR_POLEGADA), int(altura * CELULAS_POR_POLEGADA)) if rasterizado else None
+    resultado = calcular_dispersao(df, x_col, y_col, bins, log_scale, regressao)
+    
     # Criar o gráfico
     plt.figure(figsize=(largura, altura))
     sns.set_style("whitegrid")
+    ax = plt.gca()
     
-    if regressao:
-        sns.regplot(x=x_col, y=y_col, data=df, 
-                   scatter_kws={'color': cor, 's': tamanho, 'alpha': opacidade},
-                   line_kws={'color': 'red', 'linestyle': '--'})
+    if rasterizado:
+        desenhar_densidade(ax, resultado)
     else:
-        sns.scatterplot(x=x_col, y=y_col, data=df, 
+        sns.scatterplot(x=x_col, y=y_col, data=df[[x_col, y_col]], 
                        color=cor, s=tamanho, alpha=opacidade)
     
+    # Reta de regressão a partir das estatísticas suficientes (sem bootstrap)
+    if regressao:
+        ajuste = resultado.ajuste
+        if ajuste is None:
+            print("⚠️ Dados insuficientes para ajustar a regressão.")
+        else:
+            desenhar_regressao(ax, ajuste, log_scale)
+            print(f"\n📈 Regressão: {y_col} = {ajuste.inclinacao:,.4f} × {x_col} + {ajuste.intercepto:,.4f}")
+            print(f"   • R²: {ajuste.r2:.4f} | n = {ajuste.n:,}")
+    
     # Aplicar escala log se selecionado
     if log_scale:
         if pd.api.types.is_numeric_dtype(df[x_col]):
@@ -833,13 +3258,11 @@ def plotar_dispersao(df):
     # Adicionar grid
     plt.grid(True, linestyle='--', alpha=0.7)
     
-    # Mostrar correlação se for numérico
-    if pd.api.types.is_numeric_dtype(df[x_col]) and pd.api.types.is_numeric_dtype(df[y_col]):
-        corr = df[[x_col, y_col]].corr().iloc[0,1]
-        plt.text(0.95, 0.95, f"Correlação: {corr:.2f}", 
-                transform=plt.gca().transAxes,
-                ha='right', va='top',
-                bbox=dict(facecolor='white', alpha=0.8))
+    # Mostrar correlação
+    plt.text(0.95, 0.95, f"Correlação: {resultado.correlacao:.2f}", 
+            transform=ax.transAxes,
+            ha='right', va='top',
+            bbox=dict(facecolor='white', alpha=0.8))
     
     # Ajustar layout
     plt.tight_layout()
@@ -851,7 +3274,7 @@ def plotar_histograma(df):
     print("📊 HISTOGRAMA DE CONTAGEM (CONFIGURAÇÃO MANUAL)")
     
     # Seleção da coluna
-    colunas_numericas = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    colunas_numericas = df.select_dtypes(include='number').columns.tolist()
     
     if not colunas_numericas:
         print("❌ Nenhuma coluna numérica encontrada!")
@@ -869,12 +3292,12 @@ def plotar_histograma(df):
         return
 
     # Mostrar estatísticas rápidas para referência
-    stats = df[coluna].describe()
+    stats = obter_resumo(df, coluna)
     print(f"\nℹ️ Estatísticas rápidas de '{coluna}':")
-    print(f"• Mínimo: {stats['min']:,.2f}")
-    print(f"• Máximo: {stats['max']:,.2f}")
-    print(f"• Média: {stats['mean']:,.2f}")
-    print(f"• Mediana: {stats['50%']:,.2f}")
+    print(f"• Mínimo: {stats.minimo:,.2f}")
+    print(f"• Máximo: {stats.maximo:,.2f}")
+    print(f"• Média: {stats.media:,.2f}")
+    print(f"• Mediana: {stats.mediana:,.2f}")
 
     # Configurações básicas
     print("\n⚙️ CONFIGURAÇÕES BÁSICAS:")
@@ -885,8 +3308,8 @@ def plotar_histograma(df):
 
     # Configurações de faixa de valores
     print("\n🔢 LIMITES DO EIXO X (Deixe em branco para automático):")
-    min_x = input(f"▶ Valor mínimo (atual {stats['min']:,.2f}): ")
-    max_x = input(f"▶ Valor máximo (atual {stats['max']:,.2f}): ")
+    min_x = input(f"▶ Valor mínimo (atual {stats.minimo:,.2f}): ")
+    max_x = input(f"▶ Valor máximo (atual {stats.maximo:,.2f}): ")
     
     try:
         min_x = float(min_x) if min_x else None
@@ -908,44 +3331,28 @@ def plotar_histograma(df):
     acumulado = input("▶ Histograma acumulado? (s/n): ").lower() == 's'
     mostrar_stats = input("▶ Mostrar estatísticas? (s/n): ").lower() == 's'
 
+    # Histograma derivado da base fina em cache: mudar bins/limites/escala custa O(bins)
+    try:
+        resultado = calcular_histograma(df, coluna, bins, min_x, max_x, log_x=escala in ['3','4'])
+    except ValueError as e:
+        print(f"❌ {e}!")
+        return
+    if resultado.fora > 0:
+        print(f"ℹ️ {resultado.fora:,} valores fora do intervalo exibido")
+    
     # Plotagem
     plt.figure(figsize=(largura, altura))
     sns.set_style("whitegrid")
-    
-    ax = sns.histplot(
-        data=df, 
-        x=coluna, 
-        bins=bins, 
-        color=cor,
-        kde=densidade,
-        cumulative=acumulado,
-        stat='density' if densidade else 'count',
-        log_scale=(True if escala in ['3','4'] else False, 
-                  True if escala in ['2','4'] else False)
-    )
-    
-    # Aplicar limites do eixo X se especificados
-    if min_x is not None or max_x is not None:
-        ax.set_xlim(left=min_x, right=max_x)
-    
-    # Título e labels
-    titulo = f"Histograma de {coluna}"
-    if densidade:
-        titulo += " com Densidade"
-    if acumulado:
-        titulo += " Acumulado"
-    
-    plt.title(titulo)
-    plt.xlabel(coluna + (" (log)" if escala in ['3','4'] else ""))
-    plt.ylabel(("Densidade" if densidade else "Contagem") + (" (log)" if escala in ['2','4'] else ""))
+    ax = plt.gca()
+    desenhar_histograma(ax, resultado, cor, densidade, acumulado, log_y=escala in ['2','4'])
 
     # Estatísticas se solicitado
     if mostrar_stats:
-        stats_text = (f"Mínimo: {stats['min']:,.2f}\n"
-                     f"Máximo: {stats['max']:,.2f}\n"
-                     f"Média: {stats['mean']:,.2f}\n"
-                     f"Mediana: {stats['50%']:,.2f}\n"
-                     f"Std: {stats['std']:,.2f}")
+        stats_text = (f"Mínimo: {stats.minimo:,.2f}\n"
+                     f"Máximo: {stats.maximo:,.2f}\n"
+                     f"Média: {stats.media:,.2f}\n"
+                     f"Mediana: {stats.mediana:,.2f}\n"
+                     f"Std: {stats.desvio_padrao:,.2f}")
         
         plt.text(0.95, 0.95, stats_text,
                 transform=ax.transAxes,
@@ -973,12 +3380,44 @@ def valores_distintos(df):
     try:
         col_idx = int(input("\n▶ Selecione o número da coluna: ")) - 1
         coluna = df.columns[col_idx]
-        
-        print(f"\n📊 Valores distintos na coluna '{coluna}':")
-        print(df[coluna].value_counts(dropna=False).to_string())
-        
     except (ValueError, IndexError):
         print("❌ Seleção inválida!")
+        return
+    
+    print("\n⚙️ MODOS:")
+    print("1. Mais frequentes, contagem exata (padrão)")
+    print("2. Quantidade aproximada de distintos (HyperLogLog, memória fixa)")
+    print("3. Mais frequentes aproximados (Misra-Gries, memória limitada)")
+    modo = input("▶ Escolha o modo: ") or "1"
+    
+    if modo == '2':
+        contagem = contar_valores(df, coluna, 'hll')
+        print(f"\n📊 Valores distintos na coluna '{coluna}': ~{contagem.distintos:,} "
+              f"(erro padrão ±{contagem.erro:.2%}, {2 ** PRECISAO_HLL:,} bytes de memória)")
+        if contagem.nulos:
+            print(f"ℹ️ Além de {contagem.nulos:,} nulos")
+        return
+    
+    try:
+        k = int(input(f"▶ Quantos valores exibir (padrão={TOP_K_PADRAO}, 0 = todos): ") or TOP_K_PADRAO)
+    except ValueError:
+        print("❌ Valor inválido. Usando o padrão.")
+        k = TOP_K_PADRAO
+    
+    if modo == '3':
+        contagem = contar_valores(df, coluna, 'frequentes', k)
+        print(f"\n📊 Valores mais frequentes na coluna '{coluna}' (aproximado, até {CONTADORES_FREQUENTES} contadores):")
+        print(contagem.tabela.to_string(index=False))
+        print(f"ℹ️ Contagens reais entre mínima e máxima (erro ≤ {contagem.erro:,} de {contagem.total:,} linhas); "
+              f"{contagem.nulos:,} nulos")
+        return
+    
+    contagem = contar_valores(df, coluna, 'exato', k)
+    tabela, distintos = contagem.tabela, contagem.distintos
+    print(f"\n📊 Valores distintos na coluna '{coluna}': {distintos:,}")
+    if len(tabela) < distintos:
+        print(f"ℹ️ Mostrando os {len(tabela)} mais frequentes de {distintos:,} ({distintos - len(tabela):,} ocultos)")
+    print(tabela.to_string(index=False, formatters={'Porcentagem (%)': '{:.2f}'.format}))
 
 def agrupar_por_faixas(df):
     """Agrupa registros por faixas de valores de uma coluna numérica"""
@@ -986,7 +3425,7 @@ def agrupar_por_faixas(df):
     print("📊 AGRUPAMENTO POR FAIXAS DE VALORES")
     
     # Selecionar apenas colunas numéricas
-    colunas_numericas = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    colunas_numericas = df.select_dtypes(include='number').columns.tolist()
     
     if not colunas_numericas:
         print("❌ Nenhuma coluna numérica encontrada no dataset!")
@@ -1004,43 +3443,74 @@ def agrupar_por_faixas(df):
         return
     
     # Mostrar estatísticas básicas para referência
-    stats = df[coluna].describe()
+    stats = obter_resumo(df, coluna)
     print(f"\nℹ️ Estatísticas de '{coluna}':")
-    print(f"• Mínimo: {stats['min']:,.0f}")
-    print(f"• Máximo: {stats['max']:,.0f}")
-    print(f"• Média: {stats['mean']:,.0f}")
-    print(f"• Mediana: {stats['50%']:,.0f}")
+    print(f"• Mínimo: {stats.minimo:,.0f}")
+    print(f"• Máximo: {stats.maximo:,.0f}")
+    print(f"• Média: {stats.media:,.0f}")
+    print(f"• Mediana: {stats.mediana:,.0f}")
     
     # Obter configurações do usuário
     print("\n⚙️ CONFIGURAÇÃO DAS FAIXAS:")
+    print("1. Intervalo fixo entre mínimo e máximo (padrão)")
+    print("2. Quantis (faixas com quantidades semelhantes de registros)")
+    print("3. Bordas personalizadas")
+    modo = input("▶ Escolha o tipo de faixa (1/2/3): ") or "1"
     
-    # Validação do valor mínimo
-    while True:
-        try:
-            minimo = float(input(f"▶ Valor mínimo (sugerido: {stats['min']:.2f}): ") or stats['min'])
-            break
-        except ValueError:
-            print("❌ Por favor, digite um número válido.")
+    if modo == '2':
+        while True:
+            try:
+                n_faixas = int(input("▶ Quantidade de faixas (ex: 4 para quartis, 10 para decis): ") or 4)
+                if n_faixas > 0:
+                    break
+                print("❌ A quantidade deve ser maior que zero")
+            except ValueError:
+                print("❌ Por favor, digite um número inteiro válido.")
+        parametros = {'modo': 'quantis', 'faixas': n_faixas}
     
-    # Validação do valor máximo
-    while True:
-        try:
-            maximo = float(input(f"▶ Valor máximo (sugerido: {stats['max']:.2f}): ") or stats['max'])
-            if maximo > minimo:
-                break
-            print(f"❌ O valor máximo deve ser maior que o mínimo ({minimo})")
-        except ValueError:
-            print("❌ Por favor, digite um número válido.")
+    elif modo == '3':
+        while True:
+            try:
+                texto = input("▶ Bordas em ordem crescente, separadas por vírgula (ex: 0,1000,5000,20000): ")
+                bordas = np.array([float(x) for x in texto.split(',') if x.strip()])
+                if len(bordas) >= 2 and np.all(np.diff(bordas) > 0):
+                    break
+                print("❌ Informe ao menos 2 bordas em ordem estritamente crescente")
+            except ValueError:
+                print("❌ Por favor, digite apenas números.")
+        parametros = {'modo': 'bordas', 'bordas': bordas}
     
-    # Validação do intervalo
-    while True:
-        try:
-            intervalo = float(input("▶ Intervalo de cada faixa (ex: 50 para faixas de 50 em 50): "))
-            if intervalo > 0:
+    else:
+        # Validação do valor mínimo
+        while True:
+            try:
+                minimo = float(input(f"▶ Valor mínimo (sugerido: {stats.minimo:.2f}): ") or stats.minimo)
                 break
-            print("❌ O intervalo deve ser maior que zero")
-        except ValueError:
-            print("❌ Por favor, digite um número válido.")
+            except ValueError:
+                print("❌ Por favor, digite um número válido.")
+        
+        # Validação do valor máximo
+        while True:
+            try:
+                maximo = float(input(f"▶ Valor máximo (sugerido: {stats.maximo:.2f}): ") or stats.maximo)
+                if maximo > minimo:
+                    break
+                print(f"❌ O valor máximo deve ser maior que o mínimo ({minimo})")
+            except ValueError:
+                print("❌ Por favor, digite um número válido.")
+        
+        # Validação do intervalo
+        while True:
+            try:
+                intervalo = float(input("▶ Intervalo de cada faixa (ex: 50 para faixas de 50 em 50): "))
+                if intervalo > 0:
+                    break
+                print("❌ O intervalo deve ser maior que zero")
+            except ValueError:
+                print("❌ Por favor, digite um número válido.")
+        parametros = {'modo': 'intervalo', 'minimo': minimo, 'maximo': maximo, 'intervalo': intervalo}
+    
+    ultima_aberta = input("▶ Agrupar valores acima da última borda em uma faixa aberta? (s/n, padrão=n): ").lower() == 's'
     
     # Perguntar sobre a quantidade de linhas a serem exibidas ANTES de processar
     try:
@@ -1049,38 +3519,13 @@ def agrupar_por_faixas(df):
         print("❌ Valor inválido. Mostrando todas as linhas.")
         max_rows = 0
     
-    # Criar as faixas
-    faixas = []
-    inicio = minimo
-    
-    while inicio < maximo:
-        fim = inicio + intervalo
-        # Garante que a última faixa não ultrapasse o máximo
-        if fim > maximo:
-            fim = maximo
-        faixas.append((inicio, fim))
-        inicio = fim
-    
-    # Contar registros em cada faixa
-    resultados = []
-    for i, (inicio_faixa, fim_faixa) in enumerate(faixas):
-        if i == len(faixas) - 1:
-            # Última faixa inclui o valor máximo
-            condicao = (df[coluna] >= inicio_faixa) & (df[coluna] <= fim_faixa)
-        else:
-            condicao = (df[coluna] >= inicio_faixa) & (df[coluna] < fim_faixa)
-        
-        contagem = len(df[condicao])
-        porcentagem = (contagem / len(df)) * 100
-        
-        resultados.append({
-            'Faixa': f"{inicio_faixa:,.0f} a {fim_faixa:,.0f}",
-            'Contagem': contagem,
-            'Porcentagem (%)': porcentagem
-        })
-    
-    # Criar DataFrame com os resultados
-    df_resultados = pd.DataFrame(resultados)
+    # Contar registros em cada faixa (uma única passada sobre a coluna)
+    try:
+        df_resultados = calcular_faixas(df, coluna, ultima_aberta=ultima_aberta, **parametros)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    df_resultados = df_resultados[['Faixa', 'Contagem', 'Porcentagem (%)']]
     
     # Configurar formatação para melhor visualização
     pd.options.display.float_format = '{:,.2f}'.format
@@ -1107,14 +3552,503 @@ def agrupar_por_faixas(df):
     # Opção para plotar gráfico
     if input("\n▶ Deseja visualizar um gráfico? (s/n): ").lower() == 's':
         plt.figure(figsize=(12, 6))
-        sns.barplot(x='Faixa', y='Contagem', data=df_resultados, palette='viridis')
-        plt.title(f"Distribuição de registros por faixas de {coluna}")
-        plt.xlabel("Faixas de valores")
-        plt.ylabel("Número de registros")
-        plt.xticks(rotation=45, ha='right')
+        desenhar_faixas(plt.gca(), df_resultados, coluna)
         plt.tight_layout()
         plt.show()
 
+def carregar_dataset_filtrado():
+    """Carrega um dataset salvo lendo só as colunas e linhas pedidas (filtros na leitura)"""
+    print("\n" + "="*50)
+    print("📂 CARREGAR DATASET SALVO COM FILTROS")
+    
+    caminho = input("▶ Arquivo ou diretório (feather, parquet ou partições Hive): ").strip()
+    try:
+        fonte = abrir_fonte(caminho)
+    except (pa.ArrowException, OSError, ValueError) as e:
+        print(f"❌ Não foi possível abrir '{caminho}': {e}")
+        return None
+    
+    nomes = fonte.schema.names
+    print("\n📋 COLUNAS DISPONÍVEIS:")
+    for i, col in enumerate(nomes, 1):
+        print(f"{i}. {col} (Tipo: {fonte.schema.field(col).type})")
+    selecao = input("\n▶ Colunas a carregar (números separados por vírgula, Enter = todas): ")
+    try:
+        colunas = [nomes[int(x) - 1] for x in selecao.split(',') if x.strip()] or None
+    except (ValueError, IndexError):
+        print("❌ Seleção inválida!")
+        return None
+    
+    # Mesmos critérios do excluir_linhas, avaliados pelo scanner
+    filtros = []
+    intervalo = None
+    while input("\n▶ Adicionar filtro de linhas? (s/n): ").lower() == 's':
+        try:
+            coluna = nomes[int(input("▶ Número da coluna do filtro: ")) - 1]
+        except (ValueError, IndexError):
+            print("❌ Seleção inválida!")
+            continue
+        print("1. Excluir valores nulos/NaN")
+        print("2. Excluir valores acima de X")
+        print("3. Excluir valores abaixo de X")
+        print("4. Manter apenas um intervalo [mínimo, máximo] (ex: faixa de análise)")
+        criterio = input("▶ Escolha o critério: ")
+        try:
+            if criterio == '1':
+                filtros.append({'tipo': 'filtro', 'coluna': coluna, 'criterio': 'nulos'})
+            elif criterio in ['2', '3']:
+                limite = float(input("▶ Valor limite: "))
+                filtros.append({'tipo': 'filtro', 'coluna': coluna,
+                                'criterio': 'acima' if criterio == '2' else 'abaixo', 'limite': limite})
+            elif criterio == '4':
+                intervalo = (coluna, float(input("▶ Valor mínimo: ")), float(input("▶ Valor máximo: ")))
+            else:
+                print("❌ Opção inválida!")
+        except ValueError:
+            print("❌ Por favor, digite um número válido.")
+    
+    inicio = time.perf_counter()
+    try:
+        df = ler_com_filtros(fonte, colunas, filtros, intervalo)
+    except (pa.ArrowException, ValueError) as e:
+        print(f"❌ Erro na leitura: {e}")
+        return None
+    print(f"✅ {len(df):,} de {fonte.count_rows():,} linhas e {len(df.columns)} colunas carregadas "
+          f"em {time.perf_counter() - inicio:.2f}s")
+    return df
+
+# =============================================== #
+# ================ MODO EM LOTE ================ #
+FORMATOS_TABELA = ('csv', 'json', 'parquet')
+
+@dataclass
+class ResultadoLote:
+    """Tabela de uma análise em lote, com figura opcional e detalhes para o resumo"""
+    tabela: pd.DataFrame
+    figura: object = None
+    detalhes: dict = field(default_factory=dict)
+
+def _figura(job, largura=10, altura=6):
+    """Figura e eixo no tamanho pedido pela análise (ou no padrão do gráfico interativo)"""
+    return plt.subplots(figsize=(job.get('largura', largura), job.get('altura', altura)))
+
+def _lote_estatisticas(df, job):
+    """Tabela de estatísticas das colunas numéricas (ou das `colunas` pedidas)"""
+    return ResultadoLote(tabela_estatisticas(df, job.get('colunas')))
+
+def _lote_comparacao(df, job):
+    """Coeficiente entre os dois `campos`: correlação se numéricos, V de Cramér se categóricos"""
+    campo1, campo2 = job['campos']
+    resultado = calcular_correlacao(df, campo1, campo2, job.get('metodo', 'pearson'))
+    return ResultadoLote(resultado.tabela())
+
+def _lote_correlacao(df, job):
+    """Matriz de correlação das colunas numéricas; com `pares`, só a lista dos pares acima de `minimo`"""
+    metodo = job.get('metodo', 'pearson')
+    if metodo not in ('pearson', 'spearman', 'kendall'):
+        raise ValueError(f"Método de correlação desconhecido: {metodo}")
+    matriz = matriz_correlacao(df, job.get('colunas'), metodo, job.get('processos'))
+    figura = None
+    if job.get('figura'):
+        figura, ax = _figura(job, 10, 8)
+        desenhar_matriz_correlacao(ax, matriz, metodo)
+    if job.get('pares'):
+        tabela = pares_mais_fortes(matriz, job.get('minimo', 0.0))
+    else:
+        tabela = matriz.rename_axis('Coluna').reset_index()
+    return ResultadoLote(tabela, figura, {'colunas': len(matriz)})
+
+def _lote_faixas(df, job):
+    """Contagem por faixas de `coluna`: modo intervalo (padrão), quantis ou bordas"""
+    parametros = {chave: job[chave] for chave in ('modo', 'minimo', 'maximo', 'intervalo', 'faixas', 'bordas', 'ultima_aberta')
+                  if chave in job}
+    tabela = calcular_faixas(df, job['coluna'], **parametros)
+    figura = None
+    if job.get('figura'):
+        figura, ax = _figura(job, 12, 6)
+        desenhar_faixas(ax, tabela, job['coluna'])
+    return ResultadoLote(tabela, figura)
+
+def _lote_distintos(df, job):
+    """Valores distintos de `coluna`: modo exato (top-k), hll ou frequentes (Misra-Gries)"""
+    contagem = contar_valores(df, job['coluna'], job.get('modo', 'exato'), job.get('k', TOP_K_PADRAO))
+    if contagem.modo == 'hll':
+        tabela = pd.DataFrame([{
+            'Coluna': job['coluna'],
+            'Distintos (aprox.)': contagem.distintos,
+            'Erro padrão (%)': contagem.erro * 100,
+            'Nulos': contagem.nulos,
+        }])
+        return ResultadoLote(tabela)
+    detalhes = {'distintos': contagem.distintos} if contagem.modo == 'exato' else \
+        {'erro_maximo': contagem.erro, 'total': contagem.total, 'nulos': contagem.nulos}
+    return ResultadoLote(contagem.tabela, detalhes=detalhes)
+
+def _lote_histograma(df, job):
+    """Histograma de `coluna` (tabela de faixas + figura), derivado da base fina em cache"""
+    resultado = calcular_histograma(df, job['coluna'], job.get('bins', 10), job.get('minimo'), job.get('maximo'),
+                                    job.get('log_x', False))
+    figura, ax = _figura(job, 12, 8)
+    desenhar_histograma(ax, resultado, job.get('cor', 'blue'), job.get('densidade', False),
+                        job.get('acumulado', False), job.get('log_y', False))
+    return ResultadoLote(resultado.tabela(), figura, {'fora_do_intervalo': resultado.fora})
+
+def _lote_boxplot(df, job):
+    """Resumo do boxplot de `coluna` (quartis, bigodes, outliers) + figura"""
+    resultado = calcular_boxplot(df, job['coluna'], job.get('fator', 1.5), job.get('minimo'), job.get('maximo'),
+                                 job.get('aproximado', False))
+    figura, ax = _figura(job)
+    desenhar_boxplot(ax, resultado, job.get('orientacao', 'v'), job.get('visualizacao', '1'))
+    return ResultadoLote(resultado.tabela(), figura, {'erro_posto': resultado.erro_posto})
+
+def _lote_dispersao(df, job):
+    """Mapa de densidade de `x` contra `y` com a reta de regressão; a tabela traz o ajuste"""
+    log = job.get('log', False)
+    figura, ax = _figura(job)
+    largura, altura = figura.get_size_inches()
+    resultado = calcular_dispersao(df, job['x'], job['y'],
+                                   (int(largura * CELULAS_POR_POLEGADA), int(altura * CELULAS_POR_POLEGADA)), log)
+    desenhar_densidade(ax, resultado)
+    if log:
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+    if resultado.ajuste is not None:
+        desenhar_regressao(ax, resultado.ajuste, log)
+    ax.set_title(f"Dispersão: {job['x']} vs {job['y']}", fontsize=14)
+    ax.set_xlabel(job['x'] + (" (escala log)" if log else ""))
+    ax.set_ylabel(job['y'] + (" (escala log)" if log else ""))
+    return ResultadoLote(resultado.tabela(), figura)
+
+ANALISES_LOTE = {
+    'estatisticas': _lote_estatisticas,
+    'comparacao': _lote_comparacao,
+    'correlacao': _lote_correlacao,
+    'faixas': _lote_faixas,
+    'distintos': _lote_distintos,
+    'histograma': _lote_histograma,
+    'boxplot': _lote_boxplot,
+    'dispersao': _lote_dispersao,
+}
+
+def gravar_tabela(tabela, destino, formato='csv'):
+    """Grava a tabela de resultado em CSV, JSON (lista de registros) ou Parquet"""
+    destino = Path(f"{destino}.{formato}")
+    if formato == 'csv':
+        tabela.to_csv(destino, index=False)
+    elif formato == 'json':
+        tabela.to_json(destino, orient='records', force_ascii=False, indent=2)
+    else:
+        tabela.to_parquet(destino, index=False)
+    return destino
+
+def carregar_jobs(caminho):
+    """Lê o arquivo de análises; retorna (jobs, opções)"""
+    conteudo = json.loads(Path(caminho).read_text(encoding='utf-8'))
+    if isinstance(conteudo, list):
+        return conteudo, {}
+    return conteudo['analises'], {k: v for k, v in conteudo.items() if k != 'analises'}
+
+def executar_lote(jobs, dados=ARQUIVO_CSV, saida=DIRETORIO_RESULTADOS, formato='csv',
+                  colunas=None, filtros=None, intervalo=None):
+    """Roda as análises sem interação e grava tabelas, figuras e resumo.json"""
+    if formato not in FORMATOS_TABELA:
+        raise ValueError(f"Formato de tabela desconhecido: {formato}")
+    plt.switch_backend('Agg')  # Sem janelas: as figuras só são salvas
+    sns.set_style("whitegrid")
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+
+    inicio = time.perf_counter()
+    df = abrir_dados(dados, colunas, filtros, tuple(intervalo) if intervalo else None)
+    carga = time.perf_counter() - inicio
+    print(f"📂 {dados}: {len(df):,} linhas e {len(df.columns)} colunas em {carga:.2f}s")
+
+    registros = []
+    for i, job in enumerate(jobs, 1):
+        analise = job.get('analise')
+        nome = re.sub(r'[^\w-]+', '_', str(job.get('nome') or f"{i:02d}_{analise}"))
+        registro = {'nome': nome, 'analise': analise, 'parametros': job}
+        inicio = time.perf_counter()
+        try:
+            if analise not in ANALISES_LOTE:
+                raise ValueError(f"Análise desconhecida: {analise} (opções: {', '.join(ANALISES_LOTE)})")
+            resultado = ANALISES_LOTE[analise](df, job)
+            registro['tabela'] = gravar_tabela(resultado.tabela, saida / nome, formato).name
+            if resultado.figura is not None:
+                caminho_figura = saida / f"{nome}.png"
+                resultado.figura.savefig(caminho_figura, dpi=job.get('dpi', DPI_FIGURAS_LOTE), bbox_inches='tight')
+                registro['figura'] = caminho_figura.name
+            registro.update(status='ok', linhas=len(resultado.tabela), detalhes=resultado.detalhes)
+        except Exception as e:
+            registro.update(status='erro', erro=f"{type(e).__name__}: {e}")
+        finally:
+            plt.close('all')
+        registro['segundos'] = round(time.perf_counter() - inicio, 4)
+        registros.append(registro)
+        if registro['status'] == 'ok':
+            print(f"✅ {nome}: {registro['tabela']}" + (f" + {registro['figura']}" if 'figura' in registro else "")
+                  + f" ({registro['segundos']:.2f}s)")
+        else:
+            print(f"❌ {nome}: {registro['erro']}")
+
+    resumo = {
+        'dados': str(dados),
+        'linhas': len(df),
+        'carga_segundos': round(carga, 4),
+        'formato': formato,
+        'analises': registros,
+    }
+    (saida / 'resumo.json').write_text(json.dumps(resumo, indent=2, ensure_ascii=False), encoding='utf-8')
+    falhas = sum(r['status'] != 'ok' for r in registros)
+    print(f"\n📝 {len(registros) - falhas} de {len(registros)} análises concluídas; resumo em {saida / 'resumo.json'}")
+    return resumo
+
+# =============================================== #
+# ================= BENCHMARK ================== #
+FABRICANTES_SINTETICOS = (
+    'ford', 'chevrolet', 'toyota', 'honda', 'jeep', 'nissan', 'ram', 'gmc', 'bmw', 'dodge',
+    'mercedes-benz', 'hyundai', 'subaru', 'volkswagen', 'kia', 'lexus', 'audi', 'cadillac',
+    'chrysler', 'acura', 'buick', 'mazda', 'infiniti', 'lincoln', 'volvo', 'mitsubishi', 'mini',
+    'pontiac', 'rover', 'jaguar', 'porsche', 'mercury', 'saturn', 'alfa-romeo', 'tesla', 'fiat',
+    'harley-davidson', 'ferrari', 'datsun', 'aston-martin', 'land rover', 'morgan',
+)
+ESTADOS_SINTETICOS = (
+    'ca', 'fl', 'tx', 'ny', 'oh', 'or', 'mi', 'nc', 'wa', 'pa', 'wi', 'co', 'tn', 'va', 'il', 'nj',
+    'id', 'az', 'ia', 'ma', 'mn', 'ga', 'ok', 'sc', 'mt', 'ks', 'in', 'ct', 'al', 'md', 'nm', 'mo',
+    'ky', 'ar', 'ak', 'la', 'nv', 'nh', 'dc', 'me', 'hi', 'vt', 'ri', 'sd', 'ut', 'wv', 'ms', 'ne',
+    'de', 'wy', 'nd',
+)
+# Coluna categórica: (valores em ordem de frequência, fração de nulos)
+CATEGORIAS_SINTETICAS = {
+    'manufacturer': (FABRICANTES_SINTETICOS, 0.04),
+    'model': (tuple(f"modelo {i}" for i in range(20_000)), 0.01),  # Acima de LIMITE_CATEGORIAS: fica texto
+    'condition': (('good', 'excellent', 'like new', 'fair', 'new', 'salvage'), 0.41),
+    'cylinders': (('6 cylinders', '4 cylinders', '8 cylinders', '5 cylinders', '10 cylinders',
+                   'other', '3 cylinders', '12 cylinders'), 0.42),
+    'fuel': (('gas', 'other', 'diesel', 'hybrid', 'electric'), 0.01),
+    'title_status': (('clean', 'rebuilt', 'salvage', 'lien', 'missing', 'parts only'), 0.02),
+    'transmission': (('automatic', 'other', 'manual'), 0.01),
+    'drive': (('4wd', 'fwd', 'rwd'), 0.31),
+    'type': (('sedan', 'SUV', 'pickup', 'truck', 'other', 'coupe', 'hatchback', 'wagon', 'van',
+              'convertible', 'mini-van', 'offroad', 'bus'), 0.22),
+    'paint_color': (('white', 'black', 'silver', 'blue', 'red', 'grey', 'green', 'custom', 'brown',
+                     'yellow', 'orange', 'purple'), 0.31),
+    'state': (ESTADOS_SINTETICOS, 0.0),
+}
+
+def _categoria_sintetica(rng, n, valores, fracao_nulos):
+    """Categórica com frequências de cauda longa (Zipf) e nulos"""
+    pesos = 1 / np.arange(1, len(valores) + 1) ** 1.1
+    codigos = rng.choice(len(valores), size=n, p=pesos / pesos.sum())
+    codigos[rng.random(n) < fracao_nulos] = -1
+    return pd.Categorical.from_codes(codigos, categories=list(valores))
+
+def dataset_sintetico(n, semente=0, inicio=0):
+    """Bloco de `n` linhas sintéticas no formato do vehicles.csv"""
+    rng = np.random.default_rng([semente, inicio])
+    preco = np.round(rng.lognormal(9.6, 0.9, n))
+    preco[rng.random(n) < 0.08] = 0
+    absurdos = rng.random(n) < 0.0005
+    preco[absurdos] = np.round((rng.pareto(0.8, absurdos.sum()) + 1) * 100_000)
+
+    ano = np.maximum(2022 - rng.geometric(0.12, n) + 1, 1900).astype('float64')
+    ano[rng.random(n) < 0.003] = np.nan
+
+    odometro = np.round(rng.lognormal(11.4, 0.9, n))
+    odometro[rng.random(n) < 0.001] = 0
+    odometro[rng.random(n) < 0.0001] = 9_999_999
+    odometro[rng.random(n) < 0.01] = np.nan
+
+    sem_local = rng.random(n) < 0.015
+    lat = np.where(sem_local, np.nan, rng.uniform(25, 49, n))
+    long = np.where(sem_local, np.nan, rng.uniform(-124, -67, n))
+
+    categoricas = {c: _categoria_sintetica(rng, n, valores, nulos)
+                   for c, (valores, nulos) in CATEGORIAS_SINTETICAS.items()}
+    colunas = {
+        'id': np.arange(7_000_000_000 + inicio, 7_000_000_000 + inicio + n, dtype='int64'),
+        'price': preco.astype('int64'),
+        'year': ano,
+        **{c: categoricas[c] for c in ('manufacturer', 'model', 'condition', 'cylinders', 'fuel')},
+        'odometer': odometro,
+        **{c: categoricas[c] for c in ('title_status', 'transmission', 'drive', 'type', 'paint_color', 'state')},
+        'lat': lat,
+        'long': long,
+    }
+    return pd.DataFrame(colunas)
+
+def gerar_csv_sintetico(destino, linhas, semente=0, tamanho_chunk=TAMANHO_CHUNK_CSV):
+    """Grava o dataset sintético em CSV bloco a bloco (memória limitada a um bloco)"""
+    escritor = None
+    try:
+        for inicio in range(0, linhas, tamanho_chunk):
+            bloco = dataset_sintetico(min(tamanho_chunk, linhas - inicio), semente, inicio)
+            lote = pa.RecordBatch.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                schema = schema_texto(lote.schema)
+                escritor = pa_csv.CSVWriter(destino, schema)
+            escritor.write_batch(lote.cast(schema))
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return destino
+
+def _rss_maximo_mb():
+    """Pico de memória residente do processo desde o início (None fora do Unix)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1024**2 if sys.platform == 'darwin' else 1024), 1)  # macOS em bytes, Linux em KB
+
+def _medir(etapas, etapa, funcao, rastrear=False):
+    """Executa `funcao()` a frio: cronometrada, ou sob tracemalloc (pico de memória, sem tempo) com `rastrear`"""
+    _cache_estatisticas.clear()
+    gc.collect()
+    if rastrear:
+        tracemalloc.start()
+        try:
+            return funcao()
+        finally:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            etapas.append({'etapa': etapa, 'pico_python_mb': round(pico / 1024**2, 2)})
+            print(f"   🧠 {etapa:<30} pico Python {pico / 1024**2:9.1f} MB")
+    inicio = time.perf_counter()
+    try:
+        return funcao()
+    finally:
+        segundos = time.perf_counter() - inicio
+        etapas.append({
+            'etapa': etapa,
+            'segundos': round(segundos, 4),
+            'arrow_mb': round(pa.total_allocated_bytes() / 1024**2, 2),
+            'rss_max_mb': _rss_maximo_mb(),
+        })
+        print(f"   ⏱️ {etapa:<30} {segundos:9.3f}s")
+
+def _benchmark_escala(escala, semente, rastrear=False):
+    """Etapas medidas para uma escala; roda no diretório atual (isolado pelo chamador)"""
+    def medir(etapa, funcao):
+        return _medir(escala['etapas'], etapa, funcao, rastrear)
+
+    csv = medir('gerar_csv', lambda: gerar_csv_sintetico('sintetico.csv', escala['linhas'], semente))
+    escala['tamanho_csv_mb'] = round(Path(csv).stat().st_size / 1024**2, 1)
+
+    caminho = medir('carga_csv', lambda: obter_feather_cache(csv))
+    medir('carga_cache', lambda: obter_feather_cache(csv))
+    df = DatasetColunar(caminho)
+    medir('leitura_colunas', lambda: [df[c] for c in df.columns])
+
+    numericas = df.select_dtypes(include='number').columns.tolist()
+    medir('estatisticas_colunas', lambda: tabela_estatisticas(df, numericas))
+    for metodo in ('pearson', 'spearman', 'kendall'):
+        medir(f'correlacao_{metodo}', lambda: matriz_correlacao(df, numericas, metodo))
+    medir('faixas_intervalo',
+           lambda: calcular_faixas(df, 'price', 'intervalo', 0, 100_000, 5_000, ultima_aberta=True))
+    medir('faixas_quantis', lambda: calcular_faixas(df, 'price', 'quantis', faixas=10))
+
+    sessao = SessaoLimpeza(df)
+    operacoes = {
+        'limpeza_filtro_nulos': {'tipo': 'filtro', 'coluna': 'odometer', 'criterio': 'nulos'},
+        'limpeza_filtro_acima': {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'acima', 'limite': 250_000},
+        'limpeza_filtro_iqr': {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'iqr', 'fator': 1.5},
+        'limpeza_preencher_mediana': {'tipo': 'preencher', 'coluna': 'year', 'metodo': 'mediana'},
+        'limpeza_preencher_moda_grupo': {'tipo': 'preencher', 'coluna': 'condition', 'metodo': 'moda',
+                                         'grupo': 'manufacturer'},
+        'limpeza_tipo': {'tipo': 'tipo', 'coluna': 'year', 'novo_tipo': 'int64'},
+        'limpeza_remover_colunas': {'tipo': 'remover_colunas', 'colunas': ['lat', 'long']},
+    }
+    for etapa, operacao in operacoes.items():
+        medir(etapa, lambda: sessao.aplicar(operacao))
+
+    def otimizar():
+        proposta = sessao.propor_tipos()
+        return sessao.aplicar({'tipo': 'otimizar_tipos',
+                               'tipos': dict(zip(proposta['Coluna'], proposta['Tipo proposto']))})
+
+    medir('limpeza_otimizar_tipos', otimizar)
+    limpo = medir('limpeza_materializar', sessao.materializar)
+    escala['linhas_finais'] = len(limpo)
+
+    for formato in ('feather', 'parquet', 'csv'):
+        medir(f'gravar_{formato}', lambda: gravar_dataset(limpo, f'limpo.{formato}'))
+
+def _passada_benchmark(pasta, escala, semente, rastrear):
+    """Roda as etapas de uma escala dentro de `pasta` (o cache de feather, relativo, fica nela)"""
+    pasta.mkdir(parents=True, exist_ok=True)
+    original = Path.cwd()
+    os.chdir(pasta)
+    try:
+        _benchmark_escala(escala, semente, rastrear)
+    finally:
+        os.chdir(original)
+
+def benchmark_escalas(escalas=ESCALAS_BENCHMARK, saida=None, diretorio=None, semente=0, memoria=True):
+    """Mede as etapas principais em datasets sintéticos de cada tamanho e grava o resultado em JSON"""
+    saida = Path(saida or f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json").resolve()
+    base = Path(diretorio).resolve() if diretorio else Path(tempfile.mkdtemp(prefix='benchmark_'))
+    resultado = {
+        'versao': VERSAO_FORMATO_BENCHMARK,
+        'criado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ambiente': {
+            'python': platform.python_version(), 'plataforma': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'pyarrow': pa.__version__,
+        },
+        'semente': semente,
+        'escalas': [],
+    }
+    try:
+        for linhas in escalas:
+            print(f"\n⏱️ BENCHMARK: {linhas:,} linhas")
+            escala = {'linhas': linhas, 'etapas': []}
+            resultado['escalas'].append(escala)
+            pasta = base / f"escala_{linhas}"
+            try:
+                # Tempos sem tracemalloc; o pico de memória sai de uma segunda passada rastreada
+                _passada_benchmark(pasta / 'tempo', escala, semente, rastrear=False)
+                if not diretorio:
+                    shutil.rmtree(pasta / 'tempo', ignore_errors=True)  # Libera o disco antes da segunda passada
+                if memoria:
+                    print("   🧠 Passada de memória (tracemalloc):")
+                    rastreada = {'linhas': linhas, 'etapas': []}
+                    _passada_benchmark(pasta / 'memoria', rastreada, semente, rastrear=True)
+                    picos = {e['etapa']: e['pico_python_mb'] for e in rastreada['etapas']}
+                    for etapa in escala['etapas']:
+                        etapa['pico_python_mb'] = picos.get(etapa['etapa'])
+            except MemoryError:
+                escala['erro'] = 'MemoryError'
+                print(f"❌ Memória insuficiente com {linhas:,} linhas; escalas maiores não serão medidas.")
+            finally:
+                if not diretorio:
+                    shutil.rmtree(pasta, ignore_errors=True)
+                saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding='utf-8')
+            if 'erro' in escala:
+                break
+    finally:
+        if not diretorio:
+            shutil.rmtree(base, ignore_errors=True)
+    print(f"\n📝 Resultados do benchmark em {saida}")
+    return resultado
+
+def _tabela_benchmark(caminho):
+    """Linhas (escala, etapa, tempo, pico) de um JSON do benchmark"""
+    dados = json.loads(Path(caminho).read_text(encoding='utf-8'))
+    if dados.get('versao') != VERSAO_FORMATO_BENCHMARK:
+        raise ValueError(f"{caminho}: formato de benchmark não suportado ({dados.get('versao')})")
+    return pd.DataFrame([{'Linhas': escala['linhas'], 'Etapa': etapa['etapa'],
+                          'Segundos': etapa['segundos'], 'Pico (MB)': etapa.get('pico_python_mb')}
+                         for escala in dados['escalas'] for etapa in escala['etapas']],
+                        columns=['Linhas', 'Etapa', 'Segundos', 'Pico (MB)'])
+
+def comparar_benchmarks(anterior, atual):
+    """Compara duas execuções do benchmark por escala e etapa (aceleração > 1: ficou mais rápido)"""
+    tabela = _tabela_benchmark(anterior).merge(_tabela_benchmark(atual), on=['Linhas', 'Etapa'],
+                                               suffixes=(' antes', ' agora'))
+    tabela['Aceleração'] = tabela['Segundos antes'] / tabela['Segundos agora']
+    print(f"\n📊 BENCHMARK: {Path(anterior).name} x {Path(atual).name}")
+    print(tabela.to_string(index=False, float_format='{:,.3f}'.format))
+    return tabela
+
 # =============================================== #
 # ================== MENU ====================== #
 def mostrar_menu():
@@ -1128,13 +4062,97 @@ def mostrar_menu():
     print("5. Valores distintos de uma coluna")
     print("6. Gráfico de dispersão")
     print("7. Histograma de contagem")
-    print("8. Agrupamento por faixas de valores")  # NOVA OPÇÃO
+    print("8. Agrupamento por faixas de valores")
+    print("9. Matriz de correlação (todas as colunas numéricas)")
+    print("10. Carregar dataset salvo com filtros na leitura")
     print("0. Sair")
     return input("▶ Escolha uma opção: ")
 
 # =============================================== #
 # ================== MAIN ======================= #
+def _job_json(texto):
+    """Tipo do argparse para --job: um objeto JSON com a chave 'analise'"""
+    try:
+        job = json.loads(texto)
+    except json.JSONDecodeError as e:
+        raise argparse.ArgumentTypeError(f"JSON inválido: {e}")
+    if not isinstance(job, dict) or 'analise' not in job:
+        raise argparse.ArgumentTypeError("o job deve ser um objeto JSON com a chave 'analise'")
+    return job
+
+def _linhas_benchmark(texto):
+    """Tipo do argparse para as escalas do benchmark: 10000, 10k, 1M, 100M"""
+    multiplicadores = {'k': 1_000, 'm': 1_000_000}
+    valor = texto.strip().lower().replace('_', '')
+    try:
+        linhas = int(float(valor[:-1]) * multiplicadores[valor[-1]]) if valor[-1:] in multiplicadores else int(valor)
+    except ValueError:
+        linhas = 0
+    if linhas <= 0:
+        raise argparse.ArgumentTypeError(f"escala inválida: {texto} (ex.: 10000, 10k, 1M, 100M)")
+    return linhas
+
+def ler_argumentos(argv=None):
+    """Argumentos da linha de comando; sem --jobs/--job o programa abre o menu interativo"""
+    parser = argparse.ArgumentParser(
+        description="Análise estatística do dataset de veículos: menu interativo ou análises em lote (sem perguntas)",
+        epilog=f"Análises em lote: {', '.join(ANALISES_LOTE)}. "
+               "Exemplo: --job '{\"analise\": \"faixas\", \"coluna\": \"price\", \"modo\": \"quantis\", \"faixas\": 10}'")
+    parser.add_argument('--dados', help=f"CSV, feather, Parquet ou diretório particionado (padrão: {ARQUIVO_CSV})")
+    parser.add_argument('--jobs', metavar='ARQUIVO',
+                        help="JSON com a lista de análises, ou objeto com 'analises' e opções (dados, saida, formato, colunas, filtros, intervalo)")
+    parser.add_argument('--job', action='append', default=[], type=_job_json, metavar='JSON',
+                        help="Uma análise em JSON (pode repetir; somada às de --jobs)")
+    parser.add_argument('--saida', help=f"Diretório dos resultados do lote (padrão: {DIRETORIO_RESULTADOS})")
+    parser.add_argument('--formato', choices=FORMATOS_TABELA, help="Formato das tabelas do lote (padrão: csv)")
+    parser.add_argument('--aplicar-receita', nargs='+', metavar='ARQUIVO',
+                        help="RECEITA ENTRADA [SAIDA]: reaplica uma receita de limpeza sem interação")
+    parser.add_argument('--benchmark-kendall', action='store_true', help="Compara o Kendall O(n log n) com o do pandas")
+    benchmark = parser.add_argument_group('benchmark')
+    benchmark.add_argument('--benchmark', nargs='*', type=_linhas_benchmark, metavar='LINHAS',
+                           help="Mede as etapas principais em datasets sintéticos "
+                                f"(padrão: {' '.join(f'{n:_}' for n in ESCALAS_BENCHMARK)}; aceita 10k, 1M, 100M)")
+    benchmark.add_argument('--benchmark-saida', metavar='ARQUIVO',
+                           help="JSON dos resultados (padrão: benchmark_<data>.json)")
+    benchmark.add_argument('--benchmark-dir', metavar='DIRETORIO',
+                           help="Onde gerar os arquivos sintéticos (mantidos ao final; padrão: temporário)")
+    benchmark.add_argument('--comparar-benchmarks', nargs=2, metavar=('ANTERIOR', 'ATUAL'),
+                           help="Compara dois JSONs do benchmark etapa a etapa")
+    benchmark.add_argument('--benchmark-sem-memoria', action='store_true',
+                           help="Só os tempos: pula a segunda passada, com tracemalloc, que mede o pico de memória")
+    args = parser.parse_args(argv)
+    if args.aplicar_receita is not None and len(args.aplicar_receita) not in (2, 3):
+        parser.error("--aplicar-receita espera RECEITA ENTRADA [SAIDA]")
+    return args
+
 if __name__ == "__main__":
+    args = ler_argumentos()
+    if args.benchmark_kendall:
+        benchmark_kendall()
+        sys.exit()
+    if args.benchmark is not None:
+        benchmark_escalas(args.benchmark or ESCALAS_BENCHMARK, args.benchmark_saida, args.benchmark_dir,
+                          memoria=not args.benchmark_sem_memoria)
+        sys.exit()
+    if args.comparar_benchmarks:
+        comparar_benchmarks(*args.comparar_benchmarks)
+        sys.exit()
+    if args.aplicar_receita:
+        aplicar_receita(*args.aplicar_receita)
+        sys.exit()
+    if args.jobs or args.job:
+        jobs, opcoes = carregar_jobs(args.jobs) if args.jobs else ([], {})
+        resumo = executar_lote(
+            jobs + args.job,
+            dados=args.dados or opcoes.get('dados', ARQUIVO_CSV),
+            saida=args.saida or opcoes.get('saida', DIRETORIO_RESULTADOS),
+            formato=args.formato or opcoes.get('formato', 'csv'),
+            colunas=opcoes.get('colunas'),
+            filtros=opcoes.get('filtros'),
+            intervalo=opcoes.get('intervalo'))
+        sys.exit(1 if any(r['status'] != 'ok' for r in resumo['analises']) else 0)
+    
+    df = carregar_dados(args.dados or ARQUIVO_CSV)
     while True:
         opcao = mostrar_menu()
         
@@ -1159,5 +4177,11 @@ if __name__ == "__main__":
             plotar_histograma(df)
         elif opcao == '8':
             agrupar_por_faixas(df)
+        elif opcao == '9':
+            correlacao_todas_colunas(df)
+        elif opcao == '10':
+            resultado = carregar_dataset_filtrado()
+            if resultado is not None:
+                df = resultado
         else:
             print("❌ Opção inválida!")
\ No newline at end of file
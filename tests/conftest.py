@@ -0,0 +1,26 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('MPLBACKEND', 'Agg')  # Sem janelas ao importar o pyplot
+
+SCRIPT = Path(__file__).resolve().parents[1] / '02_Estatisticas.py'
+
+
+@pytest.fixture(scope='session')
+def est():
+    """O script começa com dígito e não pode ser importado pelo nome: carrega pelo caminho"""
+    spec = importlib.util.spec_from_file_location('estatisticas', SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules['estatisticas'] = modulo  # Pool de processos precisa achar o módulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
@@ -0,0 +1,17 @@
+import json
+
+
+def test_benchmark_grava_tempos_e_picos(est, tmp_path):
+    saida = tmp_path / 'benchmark.json'
+    resultado = est.benchmark_escalas([2_000], saida=saida, diretorio=tmp_path / 'trabalho')
+    assert json.loads(saida.read_text(encoding='utf-8')) == resultado
+
+    escala, = resultado['escalas']
+    etapas = {e['etapa']: e for e in escala['etapas']}
+    assert {'carga_csv', 'correlacao_kendall', 'limpeza_materializar', 'gravar_parquet'} <= set(etapas)
+    assert all(e['segundos'] >= 0 and e['pico_python_mb'] is not None for e in etapas.values())
+    assert 0 < escala['linhas_finais'] <= 2_000
+
+    tabela = est.comparar_benchmarks(saida, saida)
+    assert len(tabela) == len(etapas)
+    assert tabela['Segundos antes'].equals(tabela['Segundos agora'])
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cache(est, tmp_path, monkeypatch):
+    """Cache isolado em tmp_path (o padrão é relativo ao diretório atual)"""
+    diretorio = tmp_path / 'cache'
+    monkeypatch.setattr(est, 'DIRETORIO_CACHE', diretorio)
+    monkeypatch.setattr(est, 'MANIFESTO_CACHE', diretorio / 'manifesto.json')
+    return diretorio
+
+
+def _gravar_csv(caminho, precos):
+    pd.DataFrame({'price': precos, 'year': [2010 + i for i in range(len(precos))]}).to_csv(caminho, index=False)
+    return caminho
+
+
+def test_feather_reaproveitado_enquanto_o_conteudo_nao_muda(est, cache, tmp_path):
+    csv = _gravar_csv(tmp_path / 'veiculos.csv', [1000, 2500, 4000])
+    feather = est.obter_feather_cache(csv)
+    pd.testing.assert_frame_equal(pd.read_feather(feather), pd.read_csv(csv), check_dtype=False)
+    criado = feather.stat().st_mtime_ns
+
+    assert est.obter_feather_cache(csv) == feather  # Mesmo tamanho e mtime
+    info = csv.stat()
+    os.utime(csv, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))  # Só o mtime muda: o hash confirma
+    assert est.obter_feather_cache(csv) == feather
+    assert feather.stat().st_mtime_ns == criado  # Nenhuma das chamadas recriou o feather
+
+    _gravar_csv(csv, [1000, 2500, 40_000])
+    novo = est.obter_feather_cache(csv)
+    assert novo != feather
+    assert pd.read_feather(novo)['price'].tolist() == [1000, 2500, 40_000]
+
+
+def test_lru_remove_a_versao_menos_usada(est, cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(est, 'MAX_VERSOES_CACHE', 2)
+    csvs = [_gravar_csv(tmp_path / f'v{i}.csv', [1000 * (i + 1)] * (i + 1)) for i in range(3)]
+    primeiro, segundo = (est.obter_feather_cache(c) for c in csvs[:2])
+    est.obter_feather_cache(csvs[0])  # A primeira versão volta a ser a mais recente
+    terceiro = est.obter_feather_cache(csvs[2])
+
+    assert primeiro.exists() and terceiro.exists()
+    assert not segundo.exists()
+    manifesto = est._ler_manifesto()
+    assert sorted(e['arquivo'] for e in manifesto['versoes'].values()) == sorted([primeiro.name, terceiro.name])
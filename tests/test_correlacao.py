@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _kendall_scipy(x, y):
+    stats = pytest.importorskip('scipy.stats')
+    validos = ~(np.isnan(x) | np.isnan(y))
+    return stats.kendalltau(x[validos], y[validos], variant='b').statistic
+
+
+def test_contar_inversoes_igual_forca_bruta(est, rng):
+    for n, maximo in ((1, 10), (2, 10), (7, 10), (100, 10), (1023, 10), (400, 5000)):
+        seq = rng.integers(0, maximo, n)
+        esperado = sum(int(seq[i] > seq[j]) for i in range(n) for j in range(i + 1, n))
+        assert est._contar_inversoes(seq) == esperado
+
+
+def test_kendall_com_empates(est, rng):
+    x = rng.integers(0, 50, 5000).astype('float64')
+    y = x + rng.integers(-20, 20, 5000)
+    assert est.kendall_tau_b(x, y) == pytest.approx(_kendall_scipy(x, y), abs=1e-12)
+
+
+def test_kendall_com_nulos(est, rng):
+    x = rng.integers(0, 30, 3000).astype('float64')
+    y = -x + rng.normal(0, 10, 3000)
+    x[rng.random(3000) < 0.05] = np.nan
+    y[rng.random(3000) < 0.05] = np.nan
+    assert est.kendall_tau_b(x, y) == pytest.approx(_kendall_scipy(x, y), abs=1e-12)
+
+
+def test_kendall_todos_empatados_e_nan(est):
+    assert np.isnan(est.kendall_tau_b(np.ones(100), np.arange(100.0)))
+    assert np.isnan(est.kendall_tau_b([1.0], [2.0]))
+
+
+def test_kendall_concordante_e_discordante(est):
+    x = np.arange(1000.0)
+    assert est.kendall_tau_b(x, x ** 2) == pytest.approx(1.0)
+    assert est.kendall_tau_b(x, -x) == pytest.approx(-1.0)
+
+
+def test_kendall_aceita_series_pandas(est, rng):
+    x = pd.Series(rng.integers(0, 10, 500), dtype='Int64')
+    y = pd.Series(rng.normal(size=500))
+    x[::17] = pd.NA
+    esperado = _kendall_scipy(x.astype('float64').to_numpy(), y.to_numpy())
+    assert est.kendall_tau_b(x, y) == pytest.approx(esperado, abs=1e-12)
+
+
+def _dados_com_nulos(rng, n=4000):
+    base = rng.normal(size=n)
+    dados = pd.DataFrame({
+        'a': base,
+        'b': 2 * base + rng.normal(size=n),
+        'c': rng.integers(0, 5, n).astype('float64'),  # Com empates
+        'd': 1e6 + base ** 3,
+    })
+    dados.loc[rng.random(n) < 0.1, 'a'] = np.nan
+    dados.loc[rng.random(n) < 0.05, 'c'] = np.nan
+    return dados
+
+
+@pytest.mark.parametrize('metodo', ['pearson', 'spearman'])
+def test_matriz_igual_pandas_com_nulos_par_a_par(est, rng, metodo):
+    dados = _dados_com_nulos(rng)
+    obtida = est.matriz_correlacao(dados, metodo=metodo, tamanho_bloco=333)  # Vários blocos
+    pd.testing.assert_frame_equal(obtida, dados.corr(method=metodo), atol=1e-10)
+
+
+def test_matriz_kendall_igual_pandas(est, rng):
+    pytest.importorskip('scipy')
+    dados = _dados_com_nulos(rng, n=1500)
+    pd.testing.assert_frame_equal(est.matriz_correlacao(dados, metodo='kendall'),
+                                  dados.corr(method='kendall'), atol=1e-12)
+
+
+def test_regressao_streaming_igual_polyfit(est, rng):
+    x = pd.Series(1e5 + rng.normal(0, 10, 10_000))
+    y = 3 * x - 7 + rng.normal(0, 5, 10_000)
+    y[::11] = np.nan
+    ajuste = est.regressao_linear_streaming(x, y, tamanho_chunk=999)
+    validos = y.notna()
+    inclinacao, intercepto = np.polyfit(x[validos], y[validos], 1)
+    assert ajuste.n == validos.sum()
+    assert ajuste.inclinacao == pytest.approx(inclinacao, rel=1e-9)
+    assert ajuste.intercepto == pytest.approx(intercepto, rel=1e-6)
+    assert ajuste.r2 == pytest.approx(x[validos].corr(y[validos]) ** 2, rel=1e-9)
+
+
+def test_regressao_sem_variacao_em_x(est):
+    assert est.regressao_linear_streaming(np.ones(10), np.arange(10.0)) is None
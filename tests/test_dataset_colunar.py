@@ -0,0 +1,27 @@
+import pandas as pd
+
+
+def test_le_so_as_colunas_pedidas_e_as_reutiliza(est, tmp_path):
+    caminho = tmp_path / 'veiculos.feather'
+    df = pd.DataFrame({
+        'price': [1000, 2500, 4000],
+        'year': [2010.0, None, 2015.0],
+        'manufacturer': pd.Categorical(['ford', 'honda', None]),
+    })
+    df.to_feather(caminho)
+
+    dataset = est.DatasetColunar(caminho)
+    assert len(dataset) == 3 and list(dataset.columns) == list(df.columns)
+    # Tipos vindos só do schema: as categorias só são conhecidas ao ler a coluna
+    assert dict(dataset.dtypes[['price', 'year']]) == dict(df.dtypes[['price', 'year']])
+    assert isinstance(dataset.dtypes['manufacturer'], pd.CategoricalDtype)
+    assert dataset._cache['series'] == {}
+
+    pd.testing.assert_series_equal(dataset['price'], df['price'])
+    assert list(dataset._cache['series']) == ['price']
+    assert dataset['price'] is dataset['price']  # Lida uma vez e reutilizada
+
+    numericas = dataset.select_dtypes(include='number')
+    assert list(numericas.columns) == ['price', 'year']
+    assert numericas['price'] is dataset['price']  # A visão compartilha o cache
+    pd.testing.assert_frame_equal(dataset.copy(), df)
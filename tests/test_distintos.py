@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('tipo', ['numerico', 'texto'])
+def test_hll_erro_relativo(est, rng, tipo):
+    valores = rng.integers(0, 200_000, 400_000)
+    serie = pd.Series(valores if tipo == 'numerico' else [f"modelo {v}" for v in valores])
+    hll = est.hll_serie(serie, tamanho_chunk=50_000)
+    real = serie.nunique()
+    assert abs(hll.estimar() - real) / real <= 4 * hll.erro_padrao
+
+
+def test_hll_cardinalidade_pequena_e_nulos(est):
+    serie = pd.Series([1.0, 2.0, 3.0, np.nan] * 1000)
+    assert est.hll_serie(serie).estimar() == 3
+    assert est.HyperLogLog().estimar() == 0
+
+
+def test_hll_mesclar_metades_igual_ao_todo(est, rng):
+    serie = pd.Series(rng.integers(0, 10**9, 100_000))
+    metade = len(serie) // 2
+    mesclado = est.HyperLogLog().atualizar(serie.iloc[:metade]).mesclar(est.HyperLogLog().atualizar(serie.iloc[metade:]))
+    assert np.array_equal(mesclado.registradores, est.HyperLogLog().atualizar(serie).registradores)
+
+
+def test_misra_gries_mesclar_metades(est, rng):
+    n, m = 100_000, 50
+    serie = pd.Series(rng.zipf(1.3, n) % 5_000)
+    serie[rng.random(n) < 0.02] = np.nan
+    metade = n // 2
+    contador = est.ContadorFrequentes(m).atualizar(serie.iloc[:metade])
+    contador.mesclar(est.ContadorFrequentes(m).atualizar(serie.iloc[metade:]))
+    reais = serie.value_counts()
+
+    assert contador.total == n and contador.nulos == serie.isna().sum()
+    assert len(contador.contadores) <= m
+    assert contador.erro <= serie.notna().sum() / (m + 1)  # Limite do resumo mesclável
+    # Todo valor mais frequente que o erro está no resumo, com a contagem real dentro dos limites
+    assert set(reais[reais > contador.erro].index) <= set(contador.contadores.index)
+    itens = contador.itens(10)
+    for valor, minima, maxima in zip(itens['Valor'], itens['Contagem mínima'], itens['Contagem máxima']):
+        assert minima <= reais[valor] <= maxima
+    assert list(itens['Valor'][:3]) == list(reais.index[:3])
+
+
+def test_misra_gries_exato_com_poucos_valores(est):
+    serie = pd.Series(list('aaabbc') * 100)
+    contador = est.frequentes_serie(serie, m=10, tamanho_chunk=7)
+    assert contador.erro == 0
+    assert contador.itens(3)['Contagem mínima'].tolist() == [300, 200, 100]
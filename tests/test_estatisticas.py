@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_resumo_igual_describe_do_pandas(est, rng):
+    serie = pd.Series(rng.lognormal(10, 2, 10_001), name='price')
+    serie[rng.random(len(serie)) < 0.1] = np.nan
+    resumo = est.resumir_coluna(serie, tamanho_bloco=997)  # Vários blocos, o último incompleto
+    esperado = serie.describe()
+    assert resumo.contagem == esperado['count']
+    assert resumo.nulos == serie.isna().sum()
+    assert resumo.soma == pytest.approx(serie.sum(), rel=1e-12)
+    for campo, chave in (('media', 'mean'), ('desvio_padrao', 'std'), ('minimo', 'min'),
+                         ('q1', '25%'), ('mediana', '50%'), ('q3', '75%'), ('maximo', 'max')):
+        assert getattr(resumo, campo) == pytest.approx(esperado[chave], rel=1e-12), campo
+
+
+def test_variancia_estavel_com_deslocamento_grande(est, rng):
+    serie = pd.Series(1e9 + rng.normal(0, 1, 50_000))
+    assert est.resumir_coluna(serie, tamanho_bloco=1000).desvio_padrao == pytest.approx(serie.std(), rel=1e-6)
+
+
+def test_resumo_de_tipos_anulaveis_e_coluna_vazia(est):
+    resumo = est.resumir_coluna(pd.Series([1, None, 3], dtype='Int64'))
+    assert (resumo.contagem, resumo.nulos, resumo.media, resumo.mediana) == (2, 1, 2.0, 2.0)
+    vazio = est.resumir_coluna(pd.Series([np.nan, np.nan]))
+    assert vazio.contagem == 0 and vazio.nulos == 2
+    assert np.isnan(vazio.media) and np.isnan(vazio.desvio_padrao) and np.isnan(vazio.q1)
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+
+def test_contagem_igual_np_histogram(est, rng):
+    serie = pd.Series(rng.normal(50, 20, 20_000))
+    serie[::13] = np.nan
+    bordas = est.bordas_por_intervalo(0, 100, 7)  # Última faixa truncada no máximo
+    tabela = est.contar_por_faixas(serie, bordas)
+    esperado, _ = np.histogram(serie.dropna(), bins=bordas)  # [início, fim), última fechada
+    assert tabela['Contagem'].tolist() == esperado.tolist()
+
+
+def test_bordas_exatas_e_ultima_aberta(est):
+    serie = pd.Series([0.0, 10.0, 20.0, 30.0, 30.5, np.nan, -1.0])
+    tabela = est.contar_por_faixas(serie, [0, 10, 20, 30], ultima_aberta=True)
+    assert tabela['Contagem'].tolist() == [1, 1, 2, 1]  # 30 cai na última fechada; 30.5 na aberta
+    assert tabela['Faixa'].iloc[-1] == 'acima de 30'
+    assert tabela['Porcentagem (%)'].sum() < 100  # Nulo e valor abaixo do mínimo ficam de fora
+
+
+def test_quantis_dividem_em_faixas_iguais(est, rng):
+    serie = pd.Series(rng.permutation(10_000).astype('float64'))
+    tabela = est.contar_por_faixas(serie, est.bordas_por_quantis(serie, 4))
+    assert tabela['Contagem'].sum() == len(serie)
+    assert tabela['Contagem'].max() - tabela['Contagem'].min() <= 1
@@ -0,0 +1,47 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+
+@pytest.fixture
+def veiculos():
+    return pd.DataFrame({
+        'price': [1000, 2500, 4000, 0, 15_500],
+        'odometer': [12_000.5, None, 80_000.0, 5.0, 130_000.0],
+        'model': ['civic', 'f-150, xlt', None, 'corolla "le"', 'civic'],
+        'state': pd.Categorical(['ca', 'tx', 'ca', 'ny', 'tx']),
+    })
+
+
+@pytest.mark.parametrize('formato', ['feather', 'parquet'])
+def test_ida_e_volta_em_lotes(est, veiculos, tmp_path, formato):
+    destino = est.gravar_dataset(veiculos, tmp_path / f'limpo.{formato}', tamanho_lote=2)
+    lido = pd.read_feather(destino) if formato == 'feather' else pd.read_parquet(destino)
+    pd.testing.assert_frame_equal(lido, veiculos)
+
+
+def test_parquet_comprimido_por_padrao(est, veiculos, tmp_path):
+    padrao = est.gravar_dataset(veiculos, tmp_path / 'padrao.parquet')
+    assert pq.ParquetFile(padrao).metadata.row_group(0).column(0).compression == 'SNAPPY'
+    sem = est.gravar_dataset(veiculos, tmp_path / 'sem.parquet', compressao='none')
+    assert pq.ParquetFile(sem).metadata.row_group(0).column(0).compression == 'UNCOMPRESSED'
+
+
+def test_csv_igual_ao_to_csv(est, veiculos, tmp_path):
+    destino = est.gravar_dataset(veiculos, tmp_path / 'limpo.csv', tamanho_lote=2)
+    assert destino.read_text(encoding='utf-8') == veiculos.to_csv(index=False)
+
+
+def test_particionado_so_sobrescreve_quando_pedido(est, veiculos, tmp_path):
+    destino = tmp_path / 'particionado'
+    est.gravar_dataset(veiculos, destino, formato='parquet', particao='state')
+    assert sorted(p.name for p in destino.iterdir()) == ['state=ca', 'state=ny', 'state=tx']
+    with pytest.raises(pa.ArrowInvalid):
+        est.gravar_dataset(veiculos, destino, formato='parquet', particao='state')
+
+    # Só as partições regravadas são substituídas; state=ny continua
+    est.gravar_dataset(veiculos.iloc[:2], destino, formato='parquet', particao='state', sobrescrever=True)
+    lido = ds.dataset(destino, format='parquet', partitioning='hive').to_table().to_pandas()
+    assert sorted(lido['price']) == [0, 1000, 2500]
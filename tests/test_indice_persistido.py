@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _decodificar(codigos, valores):
+    return [None if c < 0 else valores[c] for c in codigos]
+
+
+def test_indice_gravado_reaberto_e_refeito(est, tmp_path):
+    caminho = tmp_path / 'veiculos.feather'
+    pd.DataFrame({'manufacturer': ['ford', None, 'honda', 'ford']}).to_feather(caminho)
+    codigos, valores = est._indice_persistido(est.DatasetColunar(caminho), 'manufacturer')
+    assert _decodificar(codigos, valores) == ['ford', None, 'honda', 'ford']
+    assert est._diretorio_indices(caminho).is_dir()
+
+    reaberto, valores_reabertos = est._indice_persistido(est.DatasetColunar(caminho), 'manufacturer')
+    assert isinstance(reaberto, np.memmap)  # Lido do disco, sem recodificar a coluna
+    np.testing.assert_array_equal(reaberto, codigos)
+    assert list(valores_reabertos) == list(valores)
+
+    pd.DataFrame({'manufacturer': ['toyota', 'toyota', None]}).to_feather(caminho)
+    info = caminho.stat()
+    os.utime(caminho, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+    codigos, valores = est._indice_persistido(est.DatasetColunar(caminho), 'manufacturer')
+    assert _decodificar(codigos, valores) == ['toyota', 'toyota', None]
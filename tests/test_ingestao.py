@@ -0,0 +1,40 @@
+import pandas as pd
+
+
+def _valores(serie):
+    return [None if pd.isna(v) else v for v in serie.astype(object)]
+
+
+def test_tipos_inferidos_preservam_os_valores_entre_blocos(est, tmp_path, monkeypatch):
+    monkeypatch.setattr(est, 'LIMITE_CATEGORIAS', 3)
+    n = 10
+    csv = tmp_path / 'dados.csv'
+    pd.DataFrame({
+        'pequeno': range(n),
+        'grande': [2**40 + i for i in range(n)],
+        'sem_sinal': [2**64 - 1] + list(range(n - 1)),
+        'enorme': ['1e20'] + ['1'] * (n - 1),
+        'decimal': [i / 2 for i in range(n)],
+        'preciso': [i / 10 for i in range(n)],
+        'inteiro_nulo': [None] + list(range(n - 1)),
+        'logico': [True, False] * (n // 2),
+        'logico_bloco_nulo': [None] * 4 + [True, False] * 3,  # Primeiro bloco inteiramente nulo
+        'logico_nulo': [True, None] * (n // 2),
+        'categoria': ['a', 'b', None, 'c', 'a'] * 2,
+        'texto': list('abcdefghij'),
+        'vazio': [None] * n,
+    }).to_csv(csv, index=False)
+
+    destino = tmp_path / 'dados.feather'
+    tipos = est.converter_csv_streaming(csv, destino, tamanho_chunk=4)  # Três blocos
+    assert {c: str(t) for c, t in tipos.items() if c not in ('categoria', 'texto')} == {
+        'pequeno': 'int8', 'grande': 'int64', 'sem_sinal': 'uint64', 'enorme': 'float64',
+        'decimal': 'float32', 'preciso': 'float64', 'inteiro_nulo': 'float32', 'logico': 'bool',
+        'logico_bloco_nulo': 'boolean', 'logico_nulo': 'boolean', 'vazio': 'float32',
+    }
+    assert isinstance(tipos['categoria'], pd.CategoricalDtype) and tipos['texto'] is str
+
+    lido, esperado = pd.read_feather(destino), pd.read_csv(csv)
+    assert list(lido.columns) == list(esperado.columns)
+    for coluna in esperado.columns:
+        assert _valores(lido[coluna]) == _valores(esperado[coluna]), coluna
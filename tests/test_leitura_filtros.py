@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+def test_leitura_filtrada_igual_filtrar_com_pandas(est, tmp_path, rng):
+    n = 3_000
+    df = pd.DataFrame({
+        'price': np.round(rng.lognormal(9.5, 1.0, n)),
+        'year': rng.integers(1990, 2023, n).astype('float64'),
+        'state': pd.Categorical(rng.choice(['ca', 'tx', 'ny'], n)),
+    })
+    df.loc[rng.random(n) < 0.05, 'year'] = np.nan
+    destino = est.gravar_dataset(df, tmp_path / 'particionado', formato='parquet', particao='state',
+                                 tamanho_lote=500)
+    filtros = [{'tipo': 'filtro', 'coluna': 'year', 'criterio': 'nulos'},
+               {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'acima', 'limite': 20_000}]
+
+    lido = est.ler_com_filtros(destino, ['price', 'year'], filtros, intervalo=('year', 2000, 2015))
+    manter = df['year'].notna() & ~(df['price'] > 20_000) & df['year'].between(2000, 2015)
+    assert list(lido.columns) == ['price', 'year']
+    assert sorted(map(tuple, lido.to_numpy())) == sorted(map(tuple, df.loc[manter, ['price', 'year']].to_numpy()))
+
+
+def test_abrir_dados_sem_filtros_e_sob_demanda(est, tmp_path):
+    caminho = tmp_path / 'veiculos.feather'
+    pd.DataFrame({'price': [1000.0, None, 4000.0], 'year': [2010, 2012, 2015]}).to_feather(caminho)
+    assert isinstance(est.abrir_dados(caminho), est.DatasetColunar)
+    filtrado = est.abrir_dados(caminho, filtros=[{'tipo': 'filtro', 'coluna': 'price', 'criterio': 'nulos'}])
+    assert filtrado['year'].tolist() == [2010, 2015]
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_lote_grava_tabelas_figuras_e_resumo(est, tmp_path, rng):
+    n = 500
+    dados = tmp_path / 'veiculos.feather'
+    pd.DataFrame({
+        'price': np.round(rng.lognormal(9.5, 1.0, n)),
+        'year': rng.integers(1990, 2023, n),
+        'manufacturer': rng.choice(['ford', 'toyota', 'honda'], n),
+    }).to_feather(dados)
+    saida = tmp_path / 'saida'
+    arquivo_jobs = tmp_path / 'jobs.json'
+    arquivo_jobs.write_text(json.dumps({'saida': str(saida), 'analises': [
+        {'analise': 'estatisticas'},
+        {'analise': 'faixas', 'coluna': 'price', 'modo': 'quantis', 'faixas': 4},
+        {'analise': 'boxplot', 'coluna': 'price', 'nome': 'caixa'},
+        {'analise': 'inexistente'},
+    ]}), encoding='utf-8')
+
+    args = est.ler_argumentos(['--jobs', str(arquivo_jobs), '--dados', str(dados), '--formato', 'json',
+                               '--job', '{"analise": "distintos", "coluna": "manufacturer"}'])
+    jobs, opcoes = est.carregar_jobs(args.jobs)
+    resumo = est.executar_lote(jobs + args.job, dados=args.dados, saida=opcoes['saida'], formato=args.formato)
+
+    assert [r['status'] for r in resumo['analises']] == ['ok', 'ok', 'ok', 'erro', 'ok']  # Um erro não para o lote
+    assert json.loads((saida / 'resumo.json').read_text(encoding='utf-8'))['linhas'] == n
+    assert (saida / 'caixa.png').exists()
+    for registro in resumo['analises']:
+        if registro['status'] == 'ok':
+            assert (saida / registro['tabela']).suffix == '.json' and (saida / registro['tabela']).exists()
+
+
+def test_job_sem_analise_recusado_pelo_argparse(est):
+    with pytest.raises(SystemExit):
+        est.ler_argumentos(['--job', '{"coluna": "price"}'])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+OPERACOES = [
+    {'tipo': 'filtro', 'coluna': 'odometer', 'criterio': 'nulos'},
+    {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'acima', 'limite': 60_000},
+    {'tipo': 'remover_colunas', 'colunas': ['long']},
+    {'tipo': 'preencher', 'coluna': 'year'},
+    {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'iqr', 'fator': 1.5},
+]
+
+
+@pytest.fixture
+def arquivo_veiculos(tmp_path, rng):
+    n = 2_000
+    df = pd.DataFrame({
+        'price': np.round(rng.lognormal(9.5, 1.0, n)),
+        'year': rng.integers(1990, 2023, n).astype('float64'),
+        'manufacturer': rng.choice(['ford', 'toyota', 'honda'], n),
+        'odometer': rng.lognormal(11, 0.8, n),
+        'long': rng.uniform(-124, -67, n),
+    })
+    for coluna in ('year', 'odometer'):
+        df.loc[rng.random(n) < 0.05, coluna] = np.nan
+    caminho = tmp_path / 'veiculos.feather'
+    df.to_feather(caminho)
+    return caminho
+
+
+def test_receita_exportada_reproduz_a_sessao(est, arquivo_veiculos, tmp_path):
+    sessao = est.SessaoLimpeza(pd.read_feather(arquivo_veiculos))
+    for operacao in OPERACOES:
+        sessao.aplicar(operacao)
+    receita = est.exportar_receita(sessao.operacoes, tmp_path / 'limpeza.receita.json', origem='veiculos.csv')
+    assert est.carregar_receita(receita) == OPERACOES
+
+    destino = est.aplicar_receita(receita, arquivo_veiculos, tmp_path / 'limpo.feather')
+    pd.testing.assert_frame_equal(pd.read_feather(destino), sessao.materializar())
+
+
+def test_coluna_ausente_recusada(est, arquivo_veiculos, tmp_path):
+    receita = est.exportar_receita([{'tipo': 'preencher', 'coluna': 'cylinders'}], tmp_path / 'r.json')
+    with pytest.raises(ValueError, match='cylinders'):
+        est.aplicar_receita(receita, arquivo_veiculos, tmp_path / 'limpo.feather')
+
+
+def test_coluna_otimizada_ausente_recusada(est, arquivo_veiculos, tmp_path):
+    operacoes = [{'tipo': 'otimizar_tipos', 'tipos': {'year': 'float32', 'cylinders': 'category'}}]
+    receita = est.exportar_receita(operacoes, tmp_path / 'r.json')
+    with pytest.raises(ValueError, match='cylinders'):
+        est.aplicar_receita(receita, arquivo_veiculos, tmp_path / 'limpo.feather')
+
+
+def test_filtros_iniciais_vao_para_a_leitura(est):
+    empurrados, restantes = est.separar_filtros_empurraveis(OPERACOES)
+    assert empurrados == OPERACOES[:2]  # A exclusão de colunas não bloqueia os filtros
+    assert restantes == OPERACOES[2:]
+
+
+def test_coluna_otimizada_e_depois_removida(est, arquivo_veiculos, tmp_path):
+    operacoes = [{'tipo': 'otimizar_tipos', 'tipos': {'year': 'float32', 'long': 'float32'}},
+                 {'tipo': 'remover_colunas', 'colunas': ['long']}]
+    receita = est.exportar_receita(operacoes, tmp_path / 'r.json')
+    limpo = pd.read_feather(est.aplicar_receita(receita, arquivo_veiculos, tmp_path / 'limpo.feather'))
+    assert 'long' not in limpo.columns and limpo['year'].dtype == 'float32'
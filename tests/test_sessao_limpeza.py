@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+OPERACOES = [
+    {'tipo': 'filtro', 'coluna': 'odometer', 'criterio': 'nulos'},
+    {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'acima', 'limite': 60_000},
+    {'tipo': 'filtro', 'coluna': 'price', 'criterio': 'iqr', 'fator': 1.5},
+    {'tipo': 'preencher', 'coluna': 'year', 'metodo': 'mediana'},
+    {'tipo': 'preencher', 'coluna': 'condition', 'metodo': 'moda'},
+    {'tipo': 'preencher', 'coluna': 'lat', 'metodo': 'media', 'grupo': 'manufacturer'},
+    {'tipo': 'tipo', 'coluna': 'year', 'novo_tipo': 'int64'},
+    {'tipo': 'remover_colunas', 'colunas': ['long']},
+]
+
+
+@pytest.fixture
+def veiculos(rng):
+    n = 5_000
+    df = pd.DataFrame({
+        'price': np.round(rng.lognormal(9.5, 1.0, n)),
+        'year': rng.integers(1990, 2023, n).astype('float64'),
+        'manufacturer': pd.Categorical(rng.choice(['ford', 'toyota', 'honda', None], n)),
+        'condition': pd.Categorical(rng.choice(['good', 'excellent', 'fair', None], n, p=[0.4, 0.2, 0.1, 0.3])),
+        'odometer': rng.lognormal(11, 0.8, n),
+        'lat': rng.uniform(25, 49, n),
+        'long': rng.uniform(-124, -67, n),
+    })
+    for coluna, fracao in (('year', 0.05), ('odometer', 0.03), ('lat', 0.1)):
+        df.loc[rng.random(n) < fracao, coluna] = np.nan
+    return df
+
+
+def _aplicar_com_pandas(df, operacoes):
+    """Referência: as mesmas operações feitas de forma imediata, com cópias"""
+    df = df.copy()
+    for op in operacoes:
+        coluna = op.get('coluna')
+        if op['tipo'] == 'filtro':
+            if op['criterio'] == 'nulos':
+                df = df[df[coluna].notna()]
+            elif op['criterio'] == 'acima':
+                df = df[~(df[coluna] > op['limite'])]
+            else:
+                q1, q3 = df[coluna].quantile([0.25, 0.75])
+                fora = (df[coluna] < q1 - op['fator'] * (q3 - q1)) | (df[coluna] > q3 + op['fator'] * (q3 - q1))
+                df = df[~fora]
+        elif op['tipo'] == 'preencher' and 'grupo' in op:
+            por_grupo = df.groupby(op['grupo'], observed=True)[coluna].transform('mean')
+            df[coluna] = df[coluna].fillna(por_grupo).fillna(df[coluna].mean())
+        elif op['tipo'] == 'preencher':
+            valor = df[coluna].median() if op['metodo'] == 'mediana' else df[coluna].mode()[0]
+            df[coluna] = df[coluna].fillna(valor)
+        elif op['tipo'] == 'tipo':
+            df[coluna] = df[coluna].astype(op['novo_tipo'])
+        elif op['tipo'] == 'remover_colunas':
+            df = df.drop(columns=op['colunas'])
+    return df.reset_index(drop=True)
+
+
+def _confere(sessao, original, operacoes):
+    pd.testing.assert_frame_equal(sessao.materializar(), _aplicar_com_pandas(original, operacoes))
+
+
+def test_plano_igual_pandas_imediato(est, veiculos):
+    sessao = est.SessaoLimpeza(veiculos)
+    for i, operacao in enumerate(OPERACOES, 1):
+        sessao.aplicar(operacao)
+        _confere(sessao, veiculos, OPERACOES[:i])
+    assert len(sessao) == len(_aplicar_com_pandas(veiculos, OPERACOES))
+
+
+def test_desfazer_e_refazer(est, veiculos):
+    copia = veiculos.copy()
+    sessao = est.SessaoLimpeza(veiculos)
+    for operacao in OPERACOES:
+        sessao.aplicar(operacao)
+    versao_final = sessao.attrs['versao_dataset']
+
+    for i in range(len(OPERACOES), 0, -1):
+        assert sessao.desfazer() == OPERACOES[i - 1]
+        _confere(sessao, veiculos, OPERACOES[:i - 1])
+    assert sessao.desfazer() is None
+    pd.testing.assert_frame_equal(sessao.materializar(), veiculos)
+
+    for i in range(1, len(OPERACOES) + 1):
+        assert sessao.refazer() == OPERACOES[i - 1]
+        _confere(sessao, veiculos, OPERACOES[:i])
+    assert sessao.refazer() is None
+    assert sessao.attrs['versao_dataset'] == versao_final  # Estatísticas em cache voltam a valer
+    pd.testing.assert_frame_equal(veiculos, copia)  # O original nunca é alterado
+
+
+def test_nova_operacao_descarta_refazer(est, veiculos):
+    sessao = est.SessaoLimpeza(veiculos)
+    sessao.aplicar(OPERACOES[0])
+    sessao.aplicar(OPERACOES[1])
+    sessao.desfazer()
+    sessao.aplicar(OPERACOES[3])
+    assert sessao.refazer() is None
+    _confere(sessao, veiculos, [OPERACOES[0], OPERACOES[3]])
+
+
+def test_aplicar_lote_igual_aplicar_um_a_um(est, veiculos):
+    em_lote = est.SessaoLimpeza(veiculos)
+    em_lote.aplicar_lote(OPERACOES)
+    _confere(em_lote, veiculos, OPERACOES)
+
+
+@pytest.mark.parametrize('grupo', [None, 'marca'])
+def test_media_em_coluna_inteira_anulavel(est, grupo):
+    df = pd.DataFrame({'ano': pd.array([2010, None, 2013, None, 2020, 2011], dtype='Int64'),
+                       'marca': ['a', 'a', 'b', 'b', 'b', None]})
+    operacao = {'tipo': 'preencher', 'coluna': 'ano', 'metodo': 'media'}
+    if grupo:
+        operacao['grupo'] = grupo
+    sessao = est.SessaoLimpeza(df)
+    sessao.aplicar(operacao)
+    # Média fracionária: a coluna passa a float64 em vez de quebrar no Int64
+    esperado = [2010, 2010, 2013, 2016.5, 2020, 2011] if grupo else [2010, 2013.5, 2013, 2013.5, 2020, 2011]
+    pd.testing.assert_series_equal(sessao.materializar()['ano'], pd.Series(esperado, dtype='float64', name='ano'))
+
+
+def test_moda_em_coluna_inteira_anulavel_mantem_o_tipo(est):
+    df = pd.DataFrame({'ano': pd.array([2010, None, 2013, 2013], dtype='Int64')})
+    sessao = est.SessaoLimpeza(df)
+    sessao.aplicar({'tipo': 'preencher', 'coluna': 'ano', 'metodo': 'moda'})
+    esperado = pd.Series([2010, 2013, 2013, 2013], dtype='Int64', name='ano')
+    pd.testing.assert_series_equal(sessao.materializar()['ano'], esperado)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+QUANTIS = np.linspace(0.01, 0.99, 99)
+
+
+def _erro_de_posto(ordenados, valor, q):
+    """Distância entre q e o intervalo de postos (normalizados) ocupado por `valor`"""
+    n = len(ordenados)
+    abaixo = np.searchsorted(ordenados, valor, side='left') / n
+    ate = np.searchsorted(ordenados, valor, side='right') / n
+    return max(abaixo - q, q - ate, 0.0)
+
+
+def _sketch_de_fluxos(est, valores, k, cortes):
+    """Um sketch por fluxo (alimentado em lotes), mesclados ao final"""
+    final = est.SketchQuantis(k)
+    for semente, fluxo in enumerate(np.split(valores, cortes)):
+        parcial = est.SketchQuantis(k, semente=semente)
+        for lote in np.array_split(fluxo, 5):
+            parcial.atualizar(lote)
+        final.mesclar(parcial)
+    return final
+
+
+@pytest.mark.parametrize('distribuicao', ['lognormal', 'inteiros'])
+def test_erro_de_posto_dentro_do_limite_apos_mesclar(est, rng, distribuicao):
+    n = 200_000
+    valores = rng.lognormal(10, 1.5, n) if distribuicao == 'lognormal' else rng.integers(0, 50, n).astype('float64')
+    sketch = _sketch_de_fluxos(est, valores, k=64, cortes=[1_000, 70_000, 71_000, 150_000])
+    ordenados = np.sort(valores)
+
+    assert sketch.contagem == n
+    assert 0 < sketch.erro_rank < 0.1  # Houve compactação, mas o limite ainda é útil
+    erros = [_erro_de_posto(ordenados, v, q) for v, q in zip(sketch.quantis(QUANTIS), QUANTIS)]
+    assert max(erros) <= sketch.erro_rank + 1 / n
+
+
+def test_momentos_e_extremos_exatos(est, rng):
+    valores = rng.normal(100, 15, 50_000)
+    valores[::97] = np.nan
+    sketch = _sketch_de_fluxos(est, valores, k=32, cortes=[10_000, 10_001])
+    validos = pd.Series(valores).dropna()
+    assert sketch.contagem == len(validos)
+    assert sketch.media == pytest.approx(validos.mean(), rel=1e-12)
+    assert np.sqrt(sketch.m2 / (sketch.contagem - 1)) == pytest.approx(validos.std(), rel=1e-9)
+    assert sketch.quantis([0, 1]) == [validos.min(), validos.max()]
+
+
+def test_sem_compactacao_quantis_exatos(est, rng):
+    valores = rng.normal(size=500)
+    sketch = est.SketchQuantis(k=1000).atualizar(valores)
+    assert sketch.erro_rank == 0
+    ordenados = np.sort(valores)
+    for v, q in zip(sketch.quantis(QUANTIS), QUANTIS):
+        assert _erro_de_posto(ordenados, v, q) <= 1 / len(valores)
+
+
+def test_sketch_serie_em_blocos(est, rng):
+    serie = pd.Series(rng.exponential(5, 30_000))
+    sketch = est.sketch_serie(serie, k=128, tamanho_chunk=4_000)
+    ordenados = np.sort(serie.to_numpy())
+    erros = [_erro_de_posto(ordenados, v, q) for v, q in zip(sketch.quantis(QUANTIS), QUANTIS)]
+    assert max(erros) <= sketch.erro_rank + 1 / len(serie)
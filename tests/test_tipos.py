@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('serie, esperado', [
+    (pd.Series([0, 5, 120]), 'int8'),
+    (pd.Series([0.0, np.nan, 40_000.0]), 'Int32'),
+    (pd.Series([2**64 - 1, 0], dtype='uint64'), 'uint64'),
+    (pd.Series([1e20, 1.0]), 'float64'),
+    (pd.Series([0.5, 1.25, np.nan]), 'float32'),
+    (pd.Series([0.1, 0.2]), 'float64'),
+    (pd.Series([True, None, False]), 'boolean'),
+    (pd.Series(['gas', 'diesel', None, 'gas']), 'category'),
+    (pd.Series([None, None], dtype=object), None),
+])
+def test_tipo_otimizado(est, serie, esperado):
+    assert est.tipo_otimizado(serie)[0] == esperado
+
+
+def test_texto_de_alta_cardinalidade_vira_texto_arrow(est, monkeypatch):
+    monkeypatch.setattr(est, 'LIMITE_CATEGORIAS', 2)
+    assert est.tipo_otimizado(pd.Series(['a', 'b', 'c']))[0] == 'string[pyarrow]'
+
+
+def test_tipos_otimizados_aceitam_preenchimento_pela_media(est):
+    df = pd.DataFrame({'year': [2010.0, np.nan, 2013.0, 2020.0], 'price': [1000.0, 2500.0, 4000.0, 0.0]})
+    sessao = est.SessaoLimpeza(df)
+    proposta = sessao.propor_tipos()
+    tipos = dict(zip(proposta['Coluna'], proposta['Tipo proposto']))
+    assert tipos == {'year': 'Int16', 'price': 'int16'}
+
+    sessao.aplicar({'tipo': 'otimizar_tipos', 'tipos': tipos})
+    assert sessao.materializar().dtypes.astype(str).to_dict() == tipos
+    sessao.aplicar({'tipo': 'preencher', 'coluna': 'year', 'metodo': 'media'})
+    assert sessao.materializar()['year'].tolist() == pytest.approx([2010, 6043 / 3, 2013, 2020])